@@ -5,10 +5,10 @@
 See official documentation for further details."""
 
 import argparse
-import threading
 import time
 import os
 from ho_report_makers import HOReport
+from root_csv_engine import RootCSVEngine
 
 #parse arguments here
 parser = argparse.ArgumentParser()
@@ -23,38 +23,14 @@ def main():
 	ho_report_directory_name = createDirectory()
 
 	if args.verbose:
-		print("Started Multi-threading for HOReporter.py", "\n")
-
-	thread_lock = threading.Lock()
-	threads = []
-
-	ho_report1 = HOReport.HOReport("Uplink" , args.root_csv, ho_report_directory_name)
-	ho_report2 = HOReport.HOReport("Downlink" , args.root_csv, ho_report_directory_name)
-	ho_report3 = HOReport.HOReport("Lite_Data_Test" , args.root_csv, ho_report_directory_name)
-	ho_report4 = HOReport.HOReport("Lite_Data_Secure_Test" , args.root_csv, ho_report_directory_name)
-
-	ho_report1.start()
-	ho_report2.start()
-	ho_report3.start()
-	ho_report4.start()
-
-	threads.append(ho_report1)
-	threads.append(ho_report2)
-	threads.append(ho_report3)
-	threads.append(ho_report4)
-
-	#wait for all threads to complete
-	#TODO better way to wait for threads, currently a blocking call
-	if args.verbose:
-		print("HOReporter.py Main thread is waiting for other threads.")
-
-	for t in threads:
-		thread_name = t.name
-		print("Waiting on ", thread_name)
-		t.join()
-		print("Finished waiting for ", thread_name)
-
-	print("Exiting HOReporter.py Main Thread", "\n")
+		print("Reading the root csv file once for all HOReporter reports.", "\n")
+
+	engine = RootCSVEngine.RootCSVEngine(args.root_csv, args.verbose)
+	engine.addReport(HOReport.HOReport("Uplink", args.root_csv, ho_report_directory_name))
+	engine.addReport(HOReport.HOReport("Downlink", args.root_csv, ho_report_directory_name))
+	engine.addReport(HOReport.HOReport("Lite_Data_Test", args.root_csv, ho_report_directory_name))
+	engine.addReport(HOReport.HOReport("Lite_Data_Secure_Test", args.root_csv, ho_report_directory_name))
+	engine.run()
 
 	end = time.time()
 	print("HOReporter.py Elapsed Time: ", (end - start), " s\n")
@@ -5,10 +5,10 @@
 See official documentation for further details."""
 
 import argparse
-import threading
 import time
 import os
 from ran_report_makers import RANReport
+from root_csv_engine import RootCSVEngine
 
 #parse arguments here
 parser = argparse.ArgumentParser()
@@ -23,41 +23,15 @@ def main():
 	ran_report_directory_name = createDirectory()
 
 	if args.verbose:
-		print("Started Multi-threading for RANReporter")
-
-	thread_lock = threading.Lock()
-	threads = []
-
-	ran_report1 = RANReport.RANReport("ALL",args.root_csv, ran_report_directory_name)
-	ran_report2 = RANReport.RANReport("Uplink",args.root_csv, ran_report_directory_name)
-	ran_report3 = RANReport.RANReport("Downlink",args.root_csv, ran_report_directory_name)
-	ran_report4 = RANReport.RANReport("Lite_Data_Test",args.root_csv, ran_report_directory_name)
-	ran_report5 = RANReport.RANReport("Lite_Data_Secure_Test",args.root_csv, ran_report_directory_name)
-
-	ran_report1.start()
-	ran_report2.start()
-	ran_report3.start()
-	ran_report4.start()
-	ran_report5.start()
-
-	threads.append(ran_report1)
-	threads.append(ran_report2)
-	threads.append(ran_report3)
-	threads.append(ran_report4)
-	threads.append(ran_report5)
-
-	#wait for all threads to complete
-	#TODO better way to wait for threads, currently a blocking call
-	if args.verbose:
-		print("RANReporter.py Main thread is waiting for other threads.")
-
-	for t in  threads:
-		thread_name = t.name
-		print("Waiting on ", thread_name)
-		t.join()
-		print("Finished waiting for ", thread_name)
-
-	print("Exiting RANReporter.py Main Thread", "\n")
+		print("Reading the root csv file once for all RANReporter reports.", "\n")
+
+	engine = RootCSVEngine.RootCSVEngine(args.root_csv, args.verbose)
+	engine.addReport(RANReport.RANReport("ALL", args.root_csv, ran_report_directory_name))
+	engine.addReport(RANReport.RANReport("Uplink", args.root_csv, ran_report_directory_name))
+	engine.addReport(RANReport.RANReport("Downlink", args.root_csv, ran_report_directory_name))
+	engine.addReport(RANReport.RANReport("Lite_Data_Test", args.root_csv, ran_report_directory_name))
+	engine.addReport(RANReport.RANReport("Lite_Data_Secure_Test", args.root_csv, ran_report_directory_name))
+	engine.run()
 
 	end = time.time()
 	print("RANReporter.py Elapsed Time: ", (end - start), " s\n")
@@ -0,0 +1,66 @@
+#usage: python3 RootReporter.py <filename.csv> -v
+#Author: Conard James B. Faraon
+
+"""This generates the RF#1, RF#2, RF#3, HO and RAN reports from a single pass over the root csv file.
+See official documentation for further details."""
+
+import argparse
+import time
+import os
+from rf_report_makers import RFReport1
+from rf_report_makers import RFReport2
+from rf_report_makers import RFReport3
+from ho_report_makers import HOReport
+from ran_report_makers import RANReport
+from root_csv_engine import RootCSVEngine
+
+#parse arguments here
+parser = argparse.ArgumentParser()
+parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
+parser.add_argument("root_csv", help="Root Metrics CSV File.")
+args = parser.parse_args()
+
+TEST_TYPES = ["Uplink", "Downlink", "Lite_Data_Test", "Lite_Data_Secure_Test"]
+
+def main():
+	start = time.time()
+	print("Generating RF, HO and RAN reports based from ", args.root_csv, "\n")
+
+	rf1_dirname = createDirectory("_RFReport#1")
+	if not os.path.exists(rf1_dirname + "/records"):
+		if args.verbose:
+			print("Making a directory for ", rf1_dirname + "/records")
+		os.makedirs(rf1_dirname + "/records")
+
+	rf2_dirname = createDirectory("_RFReport#2")
+	rf3_dirname = createDirectory("_RFReport#3")
+	ho_report_directory_name = createDirectory("_HOReport")
+	ran_report_directory_name = createDirectory("_RANReport")
+
+	engine = RootCSVEngine.RootCSVEngine(args.root_csv, args.verbose)
+
+	for test_type in TEST_TYPES:
+		engine.addReport(RFReport1.RFReport1(test_type, args.root_csv, rf1_dirname))
+		engine.addReport(RFReport2.RFReport2(test_type, args.root_csv, rf2_dirname))
+		engine.addReport(RFReport3.RFReport3(test_type, args.root_csv, rf3_dirname))
+		engine.addReport(HOReport.HOReport(test_type, args.root_csv, ho_report_directory_name))
+
+	engine.addReport(RANReport.RANReport("ALL", args.root_csv, ran_report_directory_name))
+	for test_type in TEST_TYPES:
+		engine.addReport(RANReport.RANReport(test_type, args.root_csv, ran_report_directory_name))
+
+	engine.run()
+
+	end = time.time()
+	print("RootReporter.py Elapsed Time: ", (end - start), " s\n")
+
+def createDirectory(extension):
+	dirname = args.root_csv[:-4] + extension
+	if not os.path.exists(dirname):
+		if args.verbose:
+			print("Making a directory for ", dirname)
+		os.makedirs(dirname)
+
+	return dirname
+
+main()
@@ -0,0 +1,197 @@
+#usage: python3 benchmark_tsg.py -n <number of segments> -r <repeat> -k -v
+#Author: Conard James B. Faraon
+
+"""Measures the time to draw the time sequence graph of a long upload with one Line2D per segment, like the xpl files were drawn before,
+and with tsg_engine/TimeSequenceRenderer.py, as pdf and png images, with and without decimation.
+The upload is a synthetic pcap file of one TCP connection with a lost and retransmitted segment every LOSS_INTERVAL segments and SACK blocks.
+See official documentation for more details."""
+
+import argparse
+import os
+import time
+import random
+import shutil
+import struct
+import tempfile
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from pcap_engine import TimeSequenceAnalyzer
+from tsg_engine import TimeSequenceRenderer
+
+#parse arguments here
+parser = argparse.ArgumentParser()
+parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
+parser.add_argument("-n", "--num_segments", help="Number of data segments of the upload.", type=int, default=50000)
+parser.add_argument("-r", "--repeat", help="Best of this many runs is reported.", type=int, default=1)
+parser.add_argument("-k", "--keep", help="Keeps the pcap file and the graphs to compare them.", action="store_true")
+args = parser.parse_args()
+
+#the upload
+CLIENT = bytes([10, 0, 0, 1])
+SERVER = bytes([10, 0, 0, 2])
+CLIENT_PORT = 50000
+SERVER_PORT = 80
+CLIENT_ISN = 0xfff00000 #the sequence numbers wrap during the upload
+SERVER_ISN = 5000
+MSS = 1448
+SEGMENT_GAP = 0.0002 #seconds between segments, about 58 Mbit/s
+RTT = 0.04
+LOSS_INTERVAL = 500
+WINDOW_SCALE = 7
+WINDOW = 1024 #4 MB scaled
+
+#tcp flags
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_PSH = 0x08
+TCP_ACK = 0x10
+
+def main():
+	work_dir = tempfile.mkdtemp(prefix="benchmark_tsg_")
+	try:
+		pcap_path = os.path.join(work_dir, "upload.pcap")
+		makeUpload(pcap_path)
+
+		start = time.time()
+		time_sequences = TimeSequenceAnalyzer.TimeSequenceAnalyzer(pcap_path, args.verbose).analyze().getTimeSequences()
+		analyze_time = time.time() - start
+		name, title, time_sequence = time_sequences[0]
+
+		print("Segments = ", args.num_segments, ", pcap file = ", os.path.getsize(pcap_path), " B, analyzed in ", analyze_time, " s")
+
+		for output_format in TimeSequenceRenderer.FORMATS:
+			line2d_path = os.path.join(work_dir, "line2d." + output_format)
+			line2d_time, values = measure(lambda: drawLine2Ds(time_sequence, title, line2d_path, output_format))
+			print(output_format, " one Line2D per segment = ", line2d_time, " s, ", os.path.getsize(line2d_path), " B")
+
+			for decimate in [False, True]:
+				renderer_path = os.path.join(work_dir, ("decimated." if decimate else "renderer.") + output_format)
+				renderer_time, artists = measure(lambda: drawRenderer(time_sequence, title, renderer_path, output_format, decimate))
+				label = "TimeSequenceRenderer decimated" if decimate else "TimeSequenceRenderer"
+				print(output_format, " ", label, " = ", renderer_time, " s, ", line2d_time / renderer_time, "x, ",
+					os.path.getsize(renderer_path), " B, ", artists[1], " lines and markers")
+
+	finally:
+		if args.keep:
+			print("Kept the pcap file and graphs in ", work_dir)
+		else:
+			shutil.rmtree(work_dir, ignore_errors=True)
+
+def measure(function):
+	best_time = None
+	for i in range(args.repeat):
+		start = time.time()
+		values = function()
+		elapsed = time.time() - start
+		if best_time is None or elapsed < best_time:
+			best_time = elapsed
+
+	return best_time, values
+
+def makePacket(src, dst, src_port, dst_port, seq, ack, flags, payload_length, options=b""):
+	#the options are padded to 4 bytes with NOPs
+	options += b"\x01" * (-len(options) % 4)
+	tcp = struct.pack(">HHIIBBHHH", src_port, dst_port, seq & 0xffffffff, ack & 0xffffffff, (5 + len(options) // 4) << 4, flags, WINDOW, 0, 0) + options + bytes(payload_length)
+	ip = struct.pack(">BBHHHBBH4s4s", 0x45, 0, 20 + len(tcp), 0, 0, 64, 6, 0, src, dst)
+	return bytes(12) + b"\x08\x00" + ip + tcp
+
+def makeUpload(pcap_path):
+	random.seed(0)
+	packets = []
+	upload = lambda time, seq, ack, flags, payload_length, options=b"": packets.append((time, makePacket(CLIENT, SERVER, CLIENT_PORT, SERVER_PORT, seq, ack, flags, payload_length, options)))
+	download = lambda time, seq, ack, flags, options=b"": packets.append((time, makePacket(SERVER, CLIENT, SERVER_PORT, CLIENT_PORT, seq, ack, flags, 0, options)))
+	window_scale = bytes([3, 3, WINDOW_SCALE])
+
+	upload(0.0, CLIENT_ISN, 0, TCP_SYN, 0, window_scale)
+	download(RTT, SERVER_ISN, CLIENT_ISN + 1, TCP_SYN | TCP_ACK, window_scale)
+	upload(RTT, CLIENT_ISN + 1, SERVER_ISN + 1, TCP_ACK, 0)
+
+	first_seq = CLIENT_ISN + 1
+	lost = None
+	for segment in range(args.num_segments):
+		time = RTT + (segment + 1) * SEGMENT_GAP + random.uniform(0, SEGMENT_GAP / 2)
+		seq = first_seq + segment * MSS
+		upload(time, seq, SERVER_ISN + 1, TCP_PSH | TCP_ACK, MSS)
+
+		#the lost segment is SACKed around until it is retransmitted LOSS_INTERVAL / 10 segments later
+		if segment % LOSS_INTERVAL == LOSS_INTERVAL // 2:
+			lost = seq
+		acked = lost if lost is not None else seq + MSS
+		options = b""
+		if lost is not None:
+			options = b"\x01\x01" + struct.pack(">BBII", 5, 10, (lost + MSS) & 0xffffffff, (seq + MSS) & 0xffffffff)
+		if segment % 2 == 1 or lost is not None:
+			download(time + RTT, SERVER_ISN + 1, acked, TCP_ACK, options)
+		if lost is not None and segment % LOSS_INTERVAL == LOSS_INTERVAL // 2 + LOSS_INTERVAL // 10:
+			upload(time + SEGMENT_GAP / 4, lost, SERVER_ISN + 1, TCP_PSH | TCP_ACK, MSS)
+			lost = None
+
+	end = RTT + (args.num_segments + 1) * SEGMENT_GAP
+	upload(end, first_seq + args.num_segments * MSS, SERVER_ISN + 1, TCP_FIN | TCP_ACK, 0)
+	download(end + RTT, SERVER_ISN + 1, first_seq + args.num_segments * MSS + 1, TCP_FIN | TCP_ACK)
+
+	packets.sort(key=lambda packet: packet[0])
+	try:
+		pcap_file = open(pcap_path, "wb")
+		pcap_file.write(struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+		for time, data in packets:
+			microseconds = int(round(time * 1e6))
+			pcap_file.write(struct.pack("<IIII", microseconds // 1000000, microseconds % 1000000, len(data), len(data)) + data)
+	finally:
+		pcap_file.close()
+
+	if args.verbose:
+		print("Wrote ", len(packets), " packets to ", pcap_path)
+
+#the graphs tsg.py drew from the xpl files before tsg_engine, one Line2D per segment and per step of the ACK and window lines
+def drawLine2Ds(time_sequence, title, save_path, output_format):
+	figure = Figure()
+	FigureCanvasAgg(figure)
+	ax = figure.add_subplot(111)
+	figure.suptitle(title, fontsize=9)
+
+	ack_times = time_sequence[TimeSequenceAnalyzer.ACK_TIMES].tolist()
+	for name, colour in [(TimeSequenceAnalyzer.ACKS, "green"), (TimeSequenceAnalyzer.WINDOWS, "yellow")]:
+		values = time_sequence[name].tolist()
+		for i in range(len(ack_times) - 1):
+			ax.plot([ack_times[i], ack_times[i + 1], ack_times[i + 1]], [values[i], values[i], values[i + 1]], lw=1, c=TimeSequenceRenderer.COLOURS[colour])
+
+	markers = {}
+	retransmits = time_sequence[TimeSequenceAnalyzer.SEGMENT_RETRANSMITS].tolist()
+	starts = time_sequence[TimeSequenceAnalyzer.SEGMENT_STARTS].tolist()
+	ends = time_sequence[TimeSequenceAnalyzer.SEGMENT_ENDS].tolist()
+	for x, start, end, retransmit in zip(time_sequence[TimeSequenceAnalyzer.SEGMENT_TIMES].tolist(), starts, ends, retransmits):
+		colour = "red" if retransmit else "white"
+		ax.plot([x, x], [start, end], lw=1, c=TimeSequenceRenderer.COLOURS[colour])
+		for marker, y in [('uarrow', end), ('darrow', start)]:
+			points = markers.setdefault((colour, TimeSequenceRenderer.MARKERS[marker]), ([], []))
+			points[0].append(x)
+			points[1].append(y)
+
+	for x, start, end in zip(time_sequence[TimeSequenceAnalyzer.SACK_TIMES].tolist(), time_sequence[TimeSequenceAnalyzer.SACK_STARTS].tolist(), time_sequence[TimeSequenceAnalyzer.SACK_ENDS].tolist()):
+		ax.plot([x, x], [start, end], lw=1, c=TimeSequenceRenderer.COLOURS["purple"])
+
+	for (colour, marker), (x, y) in markers.items():
+		ax.plot(x, y, ls="", marker=marker, markeredgecolor=TimeSequenceRenderer.COLOURS[colour], markerfacecolor='none', markersize=2)
+
+	figure.savefig(save_path, format=output_format, dpi=TimeSequenceRenderer.PNG_DPI, bbox_inches="tight")
+
+def drawRenderer(time_sequence, title, save_path, output_format, decimate):
+	renderer = TimeSequenceRenderer.TimeSequenceRenderer(output_format, decimate, args.verbose)
+	ack_times = time_sequence[TimeSequenceAnalyzer.ACK_TIMES]
+	renderer.addSteps("green", ack_times, time_sequence[TimeSequenceAnalyzer.ACKS])
+	renderer.addSteps("yellow", ack_times, time_sequence[TimeSequenceAnalyzer.WINDOWS])
+
+	retransmits = time_sequence[TimeSequenceAnalyzer.SEGMENT_RETRANSMITS]
+	for colour, selected in [("white", ~retransmits), ("red", retransmits)]:
+		times = time_sequence[TimeSequenceAnalyzer.SEGMENT_TIMES][selected]
+		starts = time_sequence[TimeSequenceAnalyzer.SEGMENT_STARTS][selected]
+		ends = time_sequence[TimeSequenceAnalyzer.SEGMENT_ENDS][selected]
+		renderer.addVerticalLines(colour, times, starts, ends)
+		renderer.addMarkers(colour, TimeSequenceRenderer.MARKERS['uarrow'], times, ends)
+		renderer.addMarkers(colour, TimeSequenceRenderer.MARKERS['darrow'], times, starts)
+
+	renderer.addVerticalLines("purple", time_sequence[TimeSequenceAnalyzer.SACK_TIMES], time_sequence[TimeSequenceAnalyzer.SACK_STARTS], time_sequence[TimeSequenceAnalyzer.SACK_ENDS])
+	return renderer.render(save_path, title, "Time (s)", "Sequence number (B)")
+
+main()
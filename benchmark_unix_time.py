@@ -0,0 +1,76 @@
+#usage: python3 benchmark_unix_time.py -n <number of timestamps> -v
+#Author: Conard James B. Faraon
+
+"""Measures the time to convert tshark -t ud timestamps into unix time with strptime, with time_engine/UnixTime.py one at a time, and with a whole column at once.
+See official documentation for more details."""
+
+import argparse
+import os
+import time
+import random
+import decimal
+from datetime import datetime
+from time_engine import UnixTime
+
+#parse arguments here
+parser = argparse.ArgumentParser()
+parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
+parser.add_argument("-n", "--num_timestamps", help="Number of timestamps to convert.", type=int, default=200000)
+parser.add_argument("-r", "--repeat", help="Best of this many runs is reported.", type=int, default=3)
+args = parser.parse_args()
+
+#a week of drive tests starting on 2017-05-01
+START_TIME = 1493596800
+DURATION = 7 * 86400
+
+def main():
+	#strftime("%s") gives local time, the timestamps are UTC
+	os.environ["TZ"] = "UTC"
+	time.tzset()
+
+	date_strings = makeTimestamps()
+	if args.verbose:
+		print("First timestamps = ", date_strings[:3], "\n")
+
+	strptime_time, strptime_values = measure(lambda: [strptimeToUnixTime(date_string) for date_string in date_strings])
+	parse_time, parse_values = measure(lambda: [UnixTime.dateToUnixTime(date_string) for date_string in date_strings])
+	batch_time, batch_values = measure(lambda: UnixTime.datesToUnixTime(date_strings))
+
+	print("Timestamps = ", len(date_strings))
+	print("strptime, strftime and Decimal = ", strptime_time, " s")
+	print("UnixTime.dateToUnixTime = ", parse_time, " s, ", strptime_time / parse_time, "x")
+	print("UnixTime.datesToUnixTime = ", batch_time, " s, ", strptime_time / batch_time, "x")
+	print("Same values = ", strptime_values == parse_values and strptime_values == list(batch_values))
+
+def makeTimestamps():
+	random.seed(0)
+	date_strings = []
+	for i in range(args.num_timestamps):
+		date_string = datetime.utcfromtimestamp(START_TIME + random.uniform(0, DURATION)).strftime('%Y-%m-%d %H:%M:%S.%f')
+		date_strings.append(date_string)
+
+	return date_strings
+
+def measure(function):
+	best_time = None
+	for i in range(args.repeat):
+		start = time.time()
+		values = function()
+		elapsed = time.time() - start
+		if best_time is None or elapsed < best_time:
+			best_time = elapsed
+
+	return best_time, values
+
+#the conversion the scripts used before time_engine
+def strptimeToUnixTime(date_string):
+	date_object = datetime.strptime(date_string,'%Y-%m-%d %H:%M:%S.%f')
+	epoch = float(date_object.strftime("%s"))
+
+	decimal.getcontext().prec = 6
+	date_string_decimal = float(date_string.split(':')[-1])
+	date_string_whole_number = float(date_string.split(':')[-1].split('.')[0])
+	date_string_decimal = decimal.Decimal(date_string_decimal) - decimal.Decimal(date_string_whole_number)
+	return epoch + float(date_string_decimal)
+
+main()
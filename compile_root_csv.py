@@ -0,0 +1,31 @@
+#usage: python3 compile_root_csv.py <Root file.csv> -v -f
+#Author: Conard James B. Faraon
+
+"""This compiles the Root csv file into the columnar cache read by process_root_csv.py and the reporters.
+The cache is compiled on first use anyway, this only does it ahead of time.
+See official documentation for more details."""
+
+import argparse
+import time
+from root_csv_engine import RootCSVCache
+
+#parse arguments here
+parser = argparse.ArgumentParser()
+parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
+parser.add_argument("-f", "--force", help="Compiles even if the cache is up to date.", action="store_true")
+parser.add_argument("csv_file", help="Root Metrics CSV File.")
+args = parser.parse_args()
+
+def main():
+	start = time.time()
+
+	root_csv_cache = RootCSVCache.RootCSVCache(args.csv_file, args.verbose)
+	if args.force or not root_csv_cache.isValid():
+		root_csv_cache.compile()
+	else:
+		print("Columnar cache ", root_csv_cache.getCacheDirectory(), " is up to date.")
+
+	end = time.time()
+	print("Completed compile_root_csv.py Elapsed Time: ", (end - start), "s\n")
+
+main()
@@ -1,26 +1,31 @@
-#usage: python3 dupack.py <directory name> -v -p -n
+#usage: python3 dupack.py <directory name> -v -p -n -D -j <number of jobs>
 #Author: Conard James B. Faraon
 
 """Generate DUPACK3 Reports using data generated from previous data processing scripts. 
 A new folder is generated for this reports.
+Every pcap file is read once by its own job and its report rows and summary totals flow back as a partial result,
+the passed, failed and combined reports are assembled from the partial results without writing anything to disk twice or reading it back.
 See official documentations for more details."""
 
 import os
 import glob
+import subprocess
+import multiprocessing
 import argparse
 import re
 import time
 import csv
-import sys
-import decimal
 import copy
-from datetime import datetime
+from time_engine import UnixTime
+from dupack_engine import SequenceTable
 
 #parse arguments here
 parser = argparse.ArgumentParser()
 parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
-parser.add_argument("-n", "--no_tshark", help="Disables Tshark for processing pcaps files.", action="store_true")
+parser.add_argument("-n", "--no_tshark", help="Disables Tshark for processing pcaps files, the data files of a previous run with -D are read instead.", action="store_true")
 parser.add_argument("-p", "--pause", help="Pausing for each row of data processing.", action="store_true")
+parser.add_argument("-D", "--debug", help="Writes the intermediate Data1, Data2 and Packets txt files of every pcap file.", action="store_true")
+parser.add_argument("-j", "--jobs", help="Number of pcap files processed at the same time, pausing always uses one.", type=int, default=1)
 parser.add_argument("dir", help="Directory name of small Uplink Throughput pcap files generated from previous data processing scripts.")
 args = parser.parse_args()
 
@@ -49,9 +54,17 @@ LE1 = 13
 LE2 = 14
 LE3 = 15
 OOO = 16
-#data2.txt indices
-TIME = 0
-SEQ = 1
+
+#report rows yielded by processULPcap
+FIRST_REPORT = 0
+EMPTY_FIRST_REPORT = 1
+SECOND_REPORT = 2
+
+#the TCP packets of the pcap file being processed
+sequence_tables = {}
+
+#the pcap files of every test status, set before the jobs are forked
+ul_pcap_lists = {}
 
 #dirname
 FIRST_REPORT_DIR = args.dir + "_UL_DUPACK_Reports/" + args.dir
@@ -85,17 +98,15 @@ def main():
 
 	makeDupAckReportDir()
 
-	#generates data for report#1 using Tshark
-	passed_ul_data_path = processULPcaps(passed_ul_pcap_list, PASSED)
-	failed_ul_data_path = processULPcaps(failed_ul_pcap_list, FAILED)
-	combined_ul_data_path = passed_ul_data_path + failed_ul_data_path
-
 	if args.verbose:
+		passed_ul_data_path = [getData1Path(e, PASSED) for e in passed_ul_pcap_list]
+		failed_ul_data_path = [getData1Path(e, FAILED) for e in failed_ul_pcap_list]
+		combined_ul_data_path = passed_ul_data_path + failed_ul_data_path
+
 		print("Number of combined UL Tests = ", len(combined_ul_data_path))
 		print("Number of passed UL Tests = ", len(passed_ul_data_path))
 		print("Number of failed UL Tests = ", len(failed_ul_data_path), "\n")
-	
-	if args.verbose:
+
 		print("Entries for combined_ul_data:")
 		for e in combined_ul_data_path:
 			print(e)
@@ -111,16 +122,12 @@ def main():
 			print(e)
 		print()
 
-	#process data for report#1
-	passed_pcap_without_dupack3 = getDataForFirstReport(passed_ul_data_path, passed_ul_pcap_list, PASSED)
-	failed_pcap_without_dupack3 = getDataForFirstReport(failed_ul_data_path, failed_ul_pcap_list, FAILED)
-	combined_pcap_without_dupack3 = getDataForFirstReport(combined_ul_data_path, combined_ul_pcap_list, COMBINED)
-	generateFirstReportSummary(passed_pcap_without_dupack3, failed_pcap_without_dupack3, combined_pcap_without_dupack3)
-
-	#process data for report#2
-	getDataForSecondReport(passed_ul_data_path, passed_ul_pcap_list, PASSED)
-	getDataForSecondReport(failed_ul_data_path, failed_ul_pcap_list, FAILED)
-	concatPassedAndFailedSecondReport()
+	#report#1, report#2 and the totals of summary#1 in one pass over the pcap files
+	ul_pcap_lists[PASSED] = passed_ul_pcap_list
+	ul_pcap_lists[FAILED] = failed_ul_pcap_list
+	jobs = [(e, PASSED) for e in passed_ul_pcap_list] + [(e, FAILED) for e in failed_ul_pcap_list]
+	summaries = generateReports(jobs)
+	generateFirstReportSummary(summaries)
 
 	end = time.time()
 	print("dupack.py Elapsed Time: ", (end - start), " s\n")
@@ -143,55 +150,139 @@ def makeDupAckReportDir():
 			print("Making a directory for ", dirname)
 		os.makedirs(dirname)
 
-def processULPcaps(pcap_path_list, test_status):
-	tmp = []
-	for e in pcap_path_list:
-		output = args.dir + "_UL_DUPACK_Reports/" + test_status + "/" + e.split('/')[-1][:-5] + "_UL_DUPACK_Data1.txt"
-		tmp.append(output)
-		cmd = "tshark -t ud -r " + e + " -Y \"(tcp.analysis.duplicate_ack_num == 3) && (eth.src == 00:00:00:00:00:01)\" -T fields "\
-		+ "-E separator=\"/t\" -e frame.number -e _ws.col.Time -e tcp.stream -e tcp.ack -e tcp.options.sack_le -e tcp.options.sack_re > " + output
-
-		if args.no_tshark is None or not args.no_tshark:
-			if args.verbose:
-				print(cmd, "\n")
-			os.system(cmd)
+def getData1Path(pcap_path, test_status):
+	return args.dir + "_UL_DUPACK_Reports/" + test_status + "/" + pcap_path.split('/')[-1][:-5] + "_UL_DUPACK_Data1.txt"
 
-	return tmp
+def getReportPath(test_status, report_number):
+	return FIRST_REPORT_DIR + "_" + test_status.upper() + "_UL_DUPACK_REPORT#" + report_number + ".csv"
 
-def getDataForFirstReport(data_paths, pcaps_path, test_status):
-	pcap_without_dupack3 = 0
+def generateReports(jobs):
+	"""Writes report#1 and report#2 of the passed, failed and combined pcap files and returns the totals of summary#1 of each."""
+	report_files = []
+	first_report_writers = {}
+	second_report_writers = {}
+	summaries = {}
 	try:
-		data = []
-		dirname = FIRST_REPORT_DIR + "_" + test_status.upper() + "_UL_DUPACK_REPORT#1.csv"
-		report_file = open(dirname,'w')
-		report_writer = csv.writer(report_file, delimiter=",")
-		writeHeaderForFirstReport(report_writer)
-		for e in data_paths:
-			if os.stat(e).st_size == 0:
-				pcap_without_dupack3 += 1
-				processEmptyDataForFirstReport(e, pcaps_path, report_writer)
-				continue
-			else:
-				try:
-					data_file = open(e,'r')
-
-					if args.verbose:
-						print("filename = ", e, "\n")
-					for line in data_file:
-						if args.verbose:	
-							print("=====================================================================================")
-							print("For Report# 1")
-							print("Grabbing data from line = ", line)
-
-						processForFirstReport(e, line, pcaps_path, report_writer)
-
-				finally:
-					data_file.close()
+		for test_status in [PASSED, FAILED, COMBINED]:
+			first_report_file = open(getReportPath(test_status, "1"), 'w')
+			report_files.append(first_report_file)
+			first_report_writers[test_status] = csv.writer(first_report_file, delimiter=",")
+			writeHeaderForFirstReport(first_report_writers[test_status])
+
+			second_report_file = open(getReportPath(test_status, "2"), 'w')
+			report_files.append(second_report_file)
+			second_report_writers[test_status] = csv.writer(second_report_file, delimiter=",")
+			writeHeaderForSecondReport(second_report_writers[test_status])
+
+			summaries[test_status] = newSummary()
+
+		#the partial results come back in the order of the jobs, so the combined reports list the passed pcap files first
+		for (pcap_path, test_status), (rows, summary) in zip(jobs, processULPcaps(jobs)):
+			for report, row in rows:
+				if report == SECOND_REPORT:
+					second_report_writers[test_status].writerow(row)
+					second_report_writers[COMBINED].writerow(row)
+				else:
+					first_report_writers[test_status].writerow(row)
+					first_report_writers[COMBINED].writerow(row)
+
+			mergeSummary(summaries[test_status], summary)
+			mergeSummary(summaries[COMBINED], summary)
 
 	finally:
-		report_file.close()
+		for report_file in report_files:
+			report_file.close()
+
+	return summaries
 
-	return pcap_without_dupack3
+def processULPcaps(jobs):
+	"""Yields the partial result of every (pcap path, test status) job in order."""
+	if args.jobs <= 1 or args.pause:
+		for job in jobs:
+			yield analyzeULPcap(job)
+		return
+
+	print("Processing ", len(jobs), " pcap files with ", args.jobs, " jobs.\n")
+
+	#the scripts run main() when imported, so the workers have to be forked
+	pool = multiprocessing.get_context("fork").Pool(args.jobs)
+	try:
+		for result in pool.imap(analyzeULPcap, jobs, 1):
+			yield result
+	finally:
+		pool.close()
+		pool.join()
+
+def analyzeULPcap(job):
+	"""Returns the report rows of a pcap file and the totals of summary#1 they add up to."""
+	pcap_path, test_status = job
+	rows = []
+	summary = newSummary()
+	for report, row in processULPcap(pcap_path, test_status):
+		rows.append((report, row))
+		if report != SECOND_REPORT:
+			addToSummary(summary, report, row)
+
+	return rows, summary
+
+def processULPcap(pcap_path, test_status):
+	"""Yields (FIRST_REPORT, EMPTY_FIRST_REPORT or SECOND_REPORT, row) for every DUPACK#3 of the pcap file."""
+	pcap_path_list = ul_pcap_lists[test_status]
+	data1_filename = getData1Path(pcap_path, test_status)
+	if args.verbose:
+		print("filename = ", data1_filename, "\n")
+
+	hasDupAck3 = False
+	for line in readDupAck3(pcap_path, data1_filename):
+		hasDupAck3 = True
+		if args.verbose:
+			print("=====================================================================================")
+			print("For Report# 1")
+			print("Grabbing data from line = ", line)
+
+		yield FIRST_REPORT, makeFirstReportRow(data1_filename, line, pcap_path_list)
+
+		if args.verbose:
+			for row in makeSecondReportRows(data1_filename, line, pcap_path_list, test_status):
+				yield SECOND_REPORT, row
+
+	if not hasDupAck3:
+		yield EMPTY_FIRST_REPORT, makeEmptyFirstReportRow(data1_filename, pcap_path_list)
+		yield SECOND_REPORT, makeEmptySecondReportRow(data1_filename, pcap_path_list)
+
+	#the packets of a pcap file are only needed while its DUPACK#3 are processed
+	sequence_tables.clear()
+
+def readDupAck3(pcap_path, data1_filename):
+	"""Yields the tshark lines of the DUPACK#3 of a pcap file, the lines are also written to the data1 file with -D."""
+	if args.no_tshark:
+		try:
+			data1_file = open(data1_filename, 'r')
+			for line in data1_file:
+				yield line
+		finally:
+			data1_file.close()
+		return
+
+	cmd = ["tshark", "-t", "ud", "-r", pcap_path, "-Y", "(tcp.analysis.duplicate_ack_num == 3) && (eth.src == 00:00:00:00:00:01)", "-T", "fields",\
+	"-E", "separator=/t", "-e", "frame.number", "-e", "_ws.col.Time", "-e", "tcp.stream", "-e", "tcp.ack", "-e", "tcp.options.sack_le", "-e", "tcp.options.sack_re"]
+	if args.verbose:
+		print(' '.join(cmd), "\n")
+
+	#the lines are read before they are processed so tshark is not left waiting on a pause
+	tshark_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
+	lines = tshark_proc.stdout.readlines()
+	tshark_proc.wait()
+
+	if args.debug:
+		try:
+			data1_file = open(data1_filename, 'w')
+			data1_file.writelines(lines)
+		finally:
+			data1_file.close()
+
+	for line in lines:
+		yield line
 
 def writeHeaderForFirstReport(report_writer):
 	tmp = []
@@ -214,7 +305,7 @@ def writeHeaderForFirstReport(report_writer):
 	tmp.append("Out_of_Ordering")
 	report_writer.writerow(tmp)
 
-def processEmptyDataForFirstReport(filename, pcaps_path, report_writer):
+def makeEmptyFirstReportRow(filename, pcaps_path):
 	print("Processing empty data for First Report with filename = ", filename)
 	row = []
 	driver_kit = getDriverKit(filename)
@@ -229,9 +320,9 @@ def processEmptyDataForFirstReport(filename, pcaps_path, report_writer):
 		row.append(NA)
 		count += 1
 
-	report_writer.writerow(row)
+	return row
 
-def processForFirstReport(filename, line, pcaps_path, report_writer):
+def makeFirstReportRow(filename, line, pcaps_path):
 	row = []
 	driver_kit = getDriverKit(filename)
 	row.append(driver_kit)
@@ -275,14 +366,13 @@ def processForFirstReport(filename, line, pcaps_path, report_writer):
 	else:
 		row.append(NO)
 
-	#write to disk
-	report_writer.writerow(row)
-
 	if args.pause:
 		print("STOP!")
 		wait = input("PRESS ENTER TO CONTINUE.")
 		print("RESUME!")
 
+	return row
+
 def getDriverKit(filename):
 	regex = re.compile(r"\/A-\d_\d")
 	driver_kit = re.search(r"\/A-\d_\d", filename).group(0).strip('/')
@@ -420,17 +510,46 @@ def calculateNumberMissingPackets(tcp_ack, sack_le,sack_re):
 
 	return block1,block2,block3,ooo_flag
 
-def generateFirstReportSummary(passed_pcap_without_dupack3, failed_pcap_without_dupack3, combined_pcap_without_dupack3):
-	generateFirstSummary(COMBINED, combined_pcap_without_dupack3)
-	generateFirstSummary(FAILED, failed_pcap_without_dupack3)
-	generateFirstSummary(PASSED, passed_pcap_without_dupack3)
+def newSummary():
+	summary = {}
+	summary[LE1] = 0
+	summary[LE2] = 0
+	summary[LE3] = 0
+	summary[OOO] = 0
+	summary[EMPTY_FIRST_REPORT] = 0
+	return summary
+
+def addToSummary(summary, report, row):
+	if report == EMPTY_FIRST_REPORT:
+		summary[EMPTY_FIRST_REPORT] += 1
 
-def generateFirstSummary(test_status, pcap_without_dupack3):
 	try:
-		report_name = FIRST_REPORT_DIR + "_" + test_status.upper() + "_UL_DUPACK_REPORT#1.csv"
-		report_file = open(report_name,'r')
-		report_reader = csv.reader(report_file, delimiter=',')
+		summary[LE1] += int(row[LE1])
+		summary[LE2] += int(row[LE2])
+		summary[LE3] += int(row[LE3])
+
+		if row[OOO] == YES:
+			summary[OOO] += 1
+	except ValueError:
+		print("Skipping Packets Lost and OOO")
+
+def mergeSummary(summary, partial_summary):
+	for key in summary:
+		summary[key] += partial_summary[key]
+
+def generateFirstReportSummary(summaries):
+	generateFirstSummary(COMBINED, summaries[COMBINED])
+	generateFirstSummary(FAILED, summaries[FAILED])
+	generateFirstSummary(PASSED, summaries[PASSED])
+
+def generateFirstSummary(test_status, summary):
+	total_le1 = summary[LE1]
+	total_le2 = summary[LE2]
+	total_le3 = summary[LE3]
+	total_ooo = summary[OOO]
+	pcap_without_dupack3 = summary[EMPTY_FIRST_REPORT]
 
+	try:
 		summary_name = FIRST_REPORT_DIR + "_" + test_status.upper() + "_UL_DUPACK_SUMMARY#1.csv"
 		summary_file = open(summary_name,'w')
 		summary_writer = csv.writer(summary_file, delimiter=',')
@@ -443,27 +562,6 @@ def generateFirstSummary(test_status, pcap_without_dupack3):
 		row.append("Estimated_Out-Of-Ordering_Packets")
 		row.append("Total_PCAP_Without_DUPACK3")
 		summary_writer.writerow(row)
-		del row[:]
-
-		total_le1 = 0
-		total_le2 = 0
-		total_le3 = 0
-		total_ooo = 0
-
-		first_round = True
-		for data_row in report_reader:
-			if first_round:
-				first_round = False;
-				continue
-			try:
-				total_le1 += int(data_row[LE1])
-				total_le2 += int(data_row[LE2])
-				total_le3 += int(data_row[LE3])
-
-				if data_row[OOO] == 'YES':
-					total_ooo += 1
-			except ValueError:
-				print("Skipping Packets Lost and OOO")
 
 		data = []
 		data.append(total_le1)
@@ -483,61 +581,8 @@ def generateFirstSummary(test_status, pcap_without_dupack3):
 			print(test_status.upper(), "Summary of of Total PCAP file without DUPACK3 = ", pcap_without_dupack3, "\n")
 
 	finally:
-		report_file.close()
 		summary_file.close()
 
-def concatPassedAndFailedSecondReport():
-	try:
-		combined_filename = FIRST_REPORT_DIR + "_COMBINED_UL_DUPACK_REPORT#2.csv"
-		passed_filename = FIRST_REPORT_DIR + "_PASSED_UL_DUPACK_REPORT#2.csv"
-		failed_filename = FIRST_REPORT_DIR + "_FAILED_UL_DUPACK_REPORT#2.csv"
-
-		combined_file = open(combined_filename,'w')
-		passed_file = open(passed_filename,'r')
-		failed_file = open(failed_filename,'r')
-
-		for line in passed_file:
-			combined_file.write(line)
-
-		isFirstRound = True
-		for line in failed_file:
-			if isFirstRound:
-				isFirstRound = False
-				continue
-			combined_file.write(line)
-
-	finally:
-		combined_file.close()
-		passed_file.close()
-		failed_file.close()
-
-def getDataForSecondReport(data_paths, pcaps_path, test_status):
-	try:
-		data = []
-		dirname = FIRST_REPORT_DIR + "_" + test_status.upper() + "_UL_DUPACK_REPORT#2.csv"
-		report_file = open(dirname,'w')
-		report_writer = csv.writer(report_file, delimiter=",")
-		writeHeaderForSecondReport(report_writer)
-
-		for data1_filename in data_paths:
-			if args.verbose:
-					print("Processing data from ", data1_filename, "\n")
-
-			if os.stat(data1_filename).st_size == 0:
-				processEmptyDataForSecondReport(data1_filename, pcaps_path, report_writer)
-				continue
-			else:
-				try:
-					data1_file = open(data1_filename,'r')
-					for line_from_data1_file in data1_file:
-						if args.verbose:
-							processForSecondReport(data1_filename, line_from_data1_file, pcaps_path, report_writer, test_status)
-				finally:
-						data1_file.close()
-
-	finally:
-		report_file.close()
-
 def writeHeaderForSecondReport(report_writer):
 	tmp = []
 	tmp.append("Driver_Kit")
@@ -555,7 +600,7 @@ def writeHeaderForSecondReport(report_writer):
 	tmp.append("Delta_Time_(s)")
 	report_writer.writerow(tmp)
 
-def processEmptyDataForSecondReport(data1_filename, pcaps_path, report_writer):
+def makeEmptySecondReportRow(data1_filename, pcaps_path):
 	print("Processing empty data for Second Report with filename = ", data1_filename)
 	#driver kit 
 	row = []
@@ -585,9 +630,9 @@ def processEmptyDataForSecondReport(data1_filename, pcaps_path, report_writer):
 		row.append(NA)
 		count += 1
 
-	report_writer.writerow(row)
+	return row
 
-def processForSecondReport(data1_filename, line_from_data1_file, pcaps_path, report_writer, test_status):
+def makeSecondReportRows(data1_filename, line_from_data1_file, pcaps_path, test_status):
 	print("=====================================================================================")
 	print("For Report# 2")
 	print("Grabbing data from line = ", line_from_data1_file)
@@ -598,16 +643,20 @@ def processForSecondReport(data1_filename, line_from_data1_file, pcaps_path, rep
 	sack_le = getSackLE(line_from_data1_file)
 	sack_re = getSackRE(line_from_data1_file)
 	tcp_seq_list = getTcpSeq(tcp_stream, tcp_ack, sack_le, sack_re)
-	found_seq, path_to_data2_file = findSeq(data1_filename, pcaps_path, tcp_stream, tcp_seq_list, test_status, timestamp)
+	#a DUPACK#3 without SACK blocks has no sequence numbers to look up
+	if tcp_seq_list is None:
+		return
+
+	findSeq(data1_filename, pcaps_path, tcp_stream, tcp_seq_list, test_status, timestamp)
 
 	for seq in tcp_seq_list:
-		writeForSecondReport(seq, timestamp, data1_filename, pcaps_path, tcp_seq_list, report_writer, test_status, tcp_stream)
+		yield makeSecondReportRow(seq, timestamp, data1_filename, pcaps_path, tcp_seq_list, test_status, tcp_stream)
 		if args.pause:
 				print("STOP!")
 				wait = input("PRESS ENTER TO CONTINUE.")
 				print("RESUME!")
 
-def writeForSecondReport(seq, timestamp, data1_filename, pcaps_path, tcp_seq_list, report_writer, test_status, tcp_stream):
+def makeSecondReportRow(seq, timestamp, data1_filename, pcaps_path, tcp_seq_list, test_status, tcp_stream):
 	row = []
 
 	#driver kit
@@ -624,7 +673,7 @@ def writeForSecondReport(seq, timestamp, data1_filename, pcaps_path, tcp_seq_lis
 
 	#timestamp
 	if args.verbose:
-		print("Unix time stamp = ", dateToUnixTime(timestamp), "\n")
+		print("Unix time stamp = ", UnixTime.dateToUnixSeconds(timestamp), "\n")
 	row.append(timestamp)
 
 	#tcp stream
@@ -649,14 +698,16 @@ def writeForSecondReport(seq, timestamp, data1_filename, pcaps_path, tcp_seq_lis
 		#data 2
 		row.append(data2_from)
 
-		initial_transmission_count, initial_transmission_date = findInitialTransmission(seq, data1_filename, timestamp, tcp_stream)
+		sequence_table = getSequenceTable(pcap_filename, test_status)
+
+		initial_transmission_count, initial_transmission_date = findInitialTransmission(seq, timestamp, tcp_stream, sequence_table)
 		if initial_transmission_date is None:
 			row.append(NA)
 		else:
 			row.append(initial_transmission_date)
 		row.append(initial_transmission_count)
 
-		first_retransmission_date, delta = findFirstRetransmission(seq, data1_filename, timestamp, tcp_stream)
+		first_retransmission_date, delta = findFirstRetransmission(seq, timestamp, tcp_stream, sequence_table)
 		if first_retransmission_date is None:
 			row.append(NA)
 		else:
@@ -666,42 +717,14 @@ def writeForSecondReport(seq, timestamp, data1_filename, pcaps_path, tcp_seq_lis
 		else:
 			row.append(delta)
 
-	#write to disk
-	report_writer.writerow(row)
+	return row
 
-def findFirstRetransmission(seq, data1_filename, timestamp, tcp_stream):
-	data2_filename = data1_filename[:-19] + str(int(dateToUnixTime(timestamp))) + "_" + tcp_stream + "_" + timestamp.split(':')[-1].replace('.','_')  + "_UL_DUPACK_Data2.txt"
+def findFirstRetransmission(seq, timestamp, tcp_stream, sequence_table):
 	if args.verbose:
-		print("Finding first retransmission from filename = ", data2_filename)
+		print("Finding first retransmission of seq = ", seq, " in tcp_stream = ", tcp_stream)
 		print("DUPACK3 timestamp = ", timestamp)
 
-	dupack3_time = dateToUnixTime(timestamp)
-	dupack3_ms_time = float(timestamp.split(':')[-1])
-	retransmision_date = None
-	sec_delta = sys.maxsize
-	ms_delta = sys.maxsize
-
-	try:
-		data2_file = open(data2_filename,'r')
-		data2_reader = csv.reader(data2_file, delimiter='\t')
-
-		seq_buffer = []
-		for row in data2_reader:
-			if int(row[SEQ]) == seq:
-				seq_buffer.append(row)
-
-		for row in seq_buffer:
-			row_time = dateToUnixTime(row[TIME])
-			row_ms_time = float(row[TIME].split(':')[-1])
-
-			if row_time >= dupack3_time and row_ms_time >= dupack3_ms_time:
-				if (row_time - dupack3_time) <= sec_delta and (row_ms_time - dupack3_ms_time) <= ms_delta:
-					sec_delta = row_time - dupack3_time
-					ms_delta = row_ms_time - dupack3_ms_time
-					retransmision_date = row[TIME]
-	finally:
-		data2_file.close()
-
+	retransmision_date, ms_delta = sequence_table.findFirstRetransmission(int(tcp_stream), seq, timestamp)
 	if retransmision_date is None:
 		if args.verbose:
 			print("First Recorded Retransmission Time NOT Found!\n")
@@ -713,52 +736,12 @@ def findFirstRetransmission(seq, data1_filename, timestamp, tcp_stream):
 			print("Time delta between DUPACK#3 timestamp and First Recorded Retransmission Time = ", ms_delta, " s\n")
 		return retransmision_date, ms_delta
 
-def findInitialTransmission(seq, data1_filename, timestamp, tcp_stream):
-	data2_filename = data1_filename[:-19] + str(int(dateToUnixTime(timestamp))) + "_" + tcp_stream + "_" + timestamp.split(':')[-1].replace('.','_')  +"_UL_DUPACK_Data2.txt"
-	
+def findInitialTransmission(seq, timestamp, tcp_stream, sequence_table):
 	if args.verbose:
-		print("Finding initial transmission from filename = ", data2_filename)
+		print("Finding initial transmission of seq = ", seq, " in tcp_stream = ", tcp_stream)
 		print("DUPACK3 timestamp = ", timestamp)
 
-	dupack3_time_epoch = dateToUnixTime(timestamp)
-	dupack3_time = dateToUnixMs(dupack3_time_epoch, timestamp)
-	print("dupack3_time_epoch = ", dupack3_time_epoch)
-	print("dupack3_time = ", dupack3_time)
-
-	count_initial_transmission = 0
-	initial_transmission_date = ''
-	delta = None
-
-	try:
-		data2_file = open(data2_filename,'r')
-		data2_reader = csv.reader(data2_file, delimiter='\t')
-
-		seq_buffer = []
-		for row in data2_reader:
-			if int(row[SEQ]) == seq:
-				seq_buffer.append(row)
-		
-		for row in seq_buffer:
-			row_time_epoch = dateToUnixTime(row[TIME])
-			row_time = dateToUnixMs(row_time_epoch, row[TIME])
-			print("row[TIME] = ", row[TIME])
-			print("row_time = ", row_time)
-
-			if row_time < dupack3_time:
-				count_initial_transmission += 1
-
-				if delta is None:
-					delta = dupack3_time - row_time
-					initial_transmission_date = row[TIME]
-				else:
-					tmp = dupack3_time - row_time
-					if tmp > delta:
-						delta = dupack3_time - row_time
-						initial_transmission_date = row[TIME]
-
-	finally:
-		data2_file.close()
-
+	count_initial_transmission, initial_transmission_date = sequence_table.findInitialTransmission(int(tcp_stream), seq, timestamp)
 	if count_initial_transmission == 0:
 		if args.verbose:
 			print("Initial Transmission Count = ", count_initial_transmission)
@@ -773,7 +756,7 @@ def findInitialTransmission(seq, data1_filename, timestamp, tcp_stream):
 		return count_initial_transmission, initial_transmission_date
 
 def getData2Path(data1_filename, timestamp, tcp_stream):
-	data2_filename = data1_filename[:-19] + str(int(dateToUnixTime(timestamp))) + "_" + tcp_stream + "_" + timestamp.split(':')[-1].replace('.','_') + "_UL_DUPACK_Data2.txt"
+	data2_filename = data1_filename[:-19] + str(int(UnixTime.dateToUnixSeconds(timestamp))) + "_" + tcp_stream + "_" + timestamp.split(':')[-1].replace('.','_') + "_UL_DUPACK_Data2.txt"
 	print("data2_filename = ", data2_filename)
 	return data2_filename
 
@@ -824,42 +807,27 @@ def findSeq(filename, pcaps_path, tcp_stream, tcp_seq, test_status, timestamp):
 	if args.verbose:
 		print("Finding seq from tcp_stream = ", tcp_stream, " in ", pcap_path)
 
-	cmd = "tshark -t ud -r " + pcap_path + " -Y \"tcp.stream == "+ tcp_stream + "  && ("
-	output = args.dir + "_UL_DUPACK_Reports/" + pcap_path.split('/')[3] + "/" + pcap_path.split('/')[-1][:-5] + "_" + str(int(dateToUnixTime(timestamp))) \
+	output = args.dir + "_UL_DUPACK_Reports/" + pcap_path.split('/')[3] + "/" + pcap_path.split('/')[-1][:-5] + "_" + str(int(UnixTime.dateToUnixSeconds(timestamp))) \
 	+ "_" + tcp_stream + "_" + timestamp.split(':')[-1].replace('.','_')  + "_UL_DUPACK_Data2.txt"
 
-	tail = ")\" -T fields -E separator=\"/t\" -e _ws.col.Time -e tcp.seq -e frame.number -e tcp.stream > " + output
-
-	isFirstRound = True
-	for seq in tcp_seq:
-		if not isFirstRound:
-			cmd += " || "
-		else:
-			isFirstRound = False
-
-		cmd += "tcp.seq == " + str(seq)
-
-	cmd += tail
-
-	if args.no_tshark is None or not args.no_tshark:
-		if args.verbose:
-			print("\n", cmd, "\n")
-		os.system(cmd)
+	#the data 2 file is only kept for debugging, the transmissions are found in the packets extracted once for the pcap file
+	if args.debug:
+		getSequenceTable(pcap_path, test_status).writeSequences(int(tcp_stream), tcp_seq, output)
 
 	return True, output
 
-def dateToUnixTime(date_string):
-	date_object = datetime.strptime(date_string,'%Y-%m-%d %H:%M:%S.%f')
-	unix_timestamp = date_object.strftime("%s")
-	return float(unix_timestamp)
+def getSequenceTable(pcap_path, test_status):
+	if pcap_path not in sequence_tables:
+		table_path = args.dir + "_UL_DUPACK_Reports/" + test_status + "/" + pcap_path.split('/')[-1][:-5] + "_UL_DUPACK_Packets.txt"
+		sequence_table = SequenceTable.SequenceTable(pcap_path, args.verbose)
+		if args.no_tshark:
+			sequence_table.load(table_path)
+		elif args.debug:
+			sequence_table.extract(table_path)
+		else:
+			sequence_table.extract()
+		sequence_tables[pcap_path] = sequence_table
 
-def dateToUnixMs(epoch, date_string):
-	decimal.getcontext().prec = 6
-	date_string_decimal = float(date_string.split(':')[-1])
-	date_string_whole_number = float(date_string.split(':')[-1].split('.')[0])
-	date_string_decimal = decimal.Decimal(date_string_decimal) - decimal.Decimal(date_string_whole_number)
-	unix_time_ms = epoch + float(date_string_decimal)
-	return unix_time_ms
+	return sequence_tables[pcap_path]
 
 main()
-
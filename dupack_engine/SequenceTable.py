@@ -0,0 +1,169 @@
+#Author: Conard James Faraon
+
+"""This extracts the time, tcp stream and sequence number of every TCP packet of an Uplink pcap file with a single tshark pass, read straight from its output.
+The packets are kept in NumPy arrays sorted by stream and sequence number, so the transmissions of a sequence number are found with a binary search
+instead of running tshark again for every DUPACK#3.
+See official documentation for more details."""
+
+import sys
+import subprocess
+import numpy as np
+from time_engine import UnixTime
+
+#table file indices
+TIME = 0
+STREAM = 1
+SEQ = 2
+FRAME_NUMBER = 3
+
+class SequenceTable:
+
+	FIELDS = ["_ws.col.Time", "tcp.stream", "tcp.seq", "frame.number"]
+
+	def __init__(self, pcap_path, verbose=False):
+		self.__pcap_path = pcap_path
+		self.__verbose = verbose
+		self.__times = None
+		self.__unix_times = None
+		self.__unix_seconds = None
+		self.__second_fields = None
+		self.__streams = None
+		self.__seqs = None
+		self.__frame_numbers = None
+
+	def getTsharkCmd(self):
+		cmd = ["tshark", "-t", "ud", "-r", self.__pcap_path, "-Y", "tcp", "-T", "fields", "-E", "separator=/t"]
+		for field in SequenceTable.FIELDS:
+			cmd += ["-e", field]
+
+		return cmd
+
+	def extract(self, table_path=None):
+		"""Runs tshark once over the pcap file and keeps its output in memory, the output is also written to table_path if given."""
+		cmd = self.getTsharkCmd()
+		if self.__verbose:
+			print(' '.join(cmd), "\n")
+
+		table_file = None
+		lines = []
+		try:
+			if table_path is not None:
+				table_file = open(table_path, 'w')
+
+			tshark_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
+			for line in tshark_proc.stdout:
+				lines.append(line)
+				if table_file is not None:
+					table_file.write(line)
+
+			tshark_proc.wait()
+
+		finally:
+			if table_file is not None:
+				table_file.close()
+
+		return self.__build(lines)
+
+	def load(self, table_path):
+		"""Reads the table file written by a previous extract()."""
+		try:
+			table_file = open(table_path, 'r')
+			self.__build(table_file)
+		finally:
+			table_file.close()
+
+		if self.__verbose:
+			print("Loaded the TCP packets from ", table_path)
+
+		return self
+
+	def __build(self, lines):
+		times = []
+		streams = []
+		seqs = []
+		frame_numbers = []
+
+		for line in lines:
+			row = line.rstrip('\n').split('\t')
+			try:
+				stream, seq, frame_number = int(row[STREAM]), int(row[SEQ]), int(row[FRAME_NUMBER])
+			except (IndexError, ValueError):
+				continue
+
+			times.append(row[TIME])
+			streams.append(stream)
+			seqs.append(seq)
+			frame_numbers.append(frame_number)
+
+		#packets of the same stream and sequence number stay in capture order
+		streams = np.array(streams, dtype=np.int64)
+		seqs = np.array(seqs, dtype=np.int64)
+		frame_numbers = np.array(frame_numbers, dtype=np.int64)
+		order = np.lexsort((frame_numbers, seqs, streams))
+
+		self.__times = np.array(times, dtype=object)[order]
+		seconds, fractions = UnixTime.parseDates(self.__times)
+		self.__unix_times = seconds + fractions
+		self.__unix_seconds = seconds.astype(np.float64)
+		self.__second_fields = np.array([float(time.split(':')[-1]) for time in self.__times], dtype=np.float64)
+		self.__streams = streams[order]
+		self.__seqs = seqs[order]
+		self.__frame_numbers = frame_numbers[order]
+
+		if self.__verbose:
+			print("Found ", len(self.__times), " TCP packets in ", self.__pcap_path)
+
+		return self
+
+	def getRows(self, stream, seq):
+		"""Indices of the packets of a stream with the sequence number, in capture order."""
+		first = np.searchsorted(self.__streams, stream, side='left')
+		last = np.searchsorted(self.__streams, stream, side='right')
+		stream_seqs = self.__seqs[first:last]
+		return np.arange(first + np.searchsorted(stream_seqs, seq, side='left'), first + np.searchsorted(stream_seqs, seq, side='right'))
+
+	def writeSequences(self, stream, seqs, output_path):
+		"""Writes the packets of a stream with any of the sequence numbers like tshark -e _ws.col.Time -e tcp.seq -e frame.number -e tcp.stream."""
+		rows = np.concatenate([self.getRows(stream, seq) for seq in set(seqs)] + [np.zeros(0, dtype=np.int64)])
+		rows = rows[np.argsort(self.__frame_numbers[rows], kind='stable')]
+
+		try:
+			output_file = open(output_path, 'w')
+			for row in rows:
+				output_file.write('\t'.join([self.__times[row], str(self.__seqs[row]), str(self.__frame_numbers[row]), str(self.__streams[row])]) + '\n')
+		finally:
+			output_file.close()
+
+	def findInitialTransmission(self, stream, seq, timestamp):
+		"""Returns the number of transmissions of seq before timestamp and the time of the earliest one, or None."""
+		rows = self.getRows(stream, seq)
+		unix_times = self.__unix_times[rows]
+		isBefore = unix_times < UnixTime.dateToUnixTime(timestamp)
+		count = int(isBefore.sum())
+		if count == 0:
+			return count, None
+
+		#argmin keeps the first of equal times like the report always did
+		return count, self.__times[rows[isBefore][np.argmin(unix_times[isBefore])]]
+
+	def findFirstRetransmission(self, stream, seq, timestamp):
+		"""Returns the time of the first retransmission of seq at or after timestamp and its delta in seconds, or (None, None).
+		The whole seconds and the seconds field are compared separately, as the report always did."""
+		dupack3_time = UnixTime.dateToUnixSeconds(timestamp)
+		dupack3_ms_time = float(timestamp.split(':')[-1])
+		retransmission_date = None
+		sec_delta = sys.maxsize
+		ms_delta = sys.maxsize
+
+		rows = self.getRows(stream, seq)
+		for row, row_time, row_ms_time in zip(rows.tolist(), self.__unix_seconds[rows].tolist(), self.__second_fields[rows].tolist()):
+			if row_time >= dupack3_time and row_ms_time >= dupack3_ms_time:
+				if (row_time - dupack3_time) <= sec_delta and (row_ms_time - dupack3_ms_time) <= ms_delta:
+					sec_delta = row_time - dupack3_time
+					ms_delta = row_ms_time - dupack3_ms_time
+					retransmission_date = self.__times[row]
+
+		if retransmission_date is None:
+			return None, None
+
+		return retransmission_date, ms_delta
@@ -3,11 +3,11 @@
 """This processes the ho report summary of the rootmetrics test summary.
 See official documentation for more details."""
 
-import threading
 import csv
 import glob
+from root_csv_engine import RootCSVEngine
 
-class HOReport(threading.Thread):
+class HOReport:
 
 	UL = "Uplink"
 	DL = "Downlink"
@@ -21,7 +21,6 @@ class HOReport(threading.Thread):
 
 	def __init__(self, test_type, root_csv, ho_report_directory):
 		print("Constructed HOReport.")
-		threading.Thread.__init__(self, name=test_type)
 		self.__test_type = test_type
 		self.__root_csv = root_csv
 		self.__ho_report_directory = ho_report_directory
@@ -53,73 +52,23 @@ class HOReport(threading.Thread):
 
 		return driver_kit_paths
 
-	def run(self):
-		print("Starting thread for HOReport of type = ", self.__test_type, ", using the file ", self.__root_csv)
-		self.__setupTestReport()
-		self.__generateTestReport()
-
-	def __setupTestReport(self):
-		try:
-			root_csv_file = open(self.__root_csv,'r')
-			root_csv_reader = csv.reader(root_csv_file)
-
-			#setup indices
-			self.__setupColumnIndicesForAllTestReport(root_csv_reader)
-
-			data_network_buffer = []
-			eci_buffer = []
-			enodebid_buffer = []
-			isGatheringDataForATest = False
-			current_test_type = ''
-
-			for row in root_csv_reader:
-				for substring in self.__globList:
-					if '' in current_test_type and substring in row[self.__test] and "Start" in row[self.__test]:
-						current_test_type = substring
-						isGatheringDataForATest = True
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						if row[self.__lte_eci] not in eci_buffer and row[self.__lte_eci] != '':
-							eci_buffer.append(row[self.__lte_eci])
-
-						if row[self.__lte_enb_id] not in enodebid_buffer and row[self.__lte_enb_id] != '':
-							enodebid_buffer.append(row[self.__lte_enb_id])
+	def getGlobList(self):
+		return self.__globList
 
-					elif substring in current_test_type and substring in row[self.__test] and "End" in row[self.__test]:
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
+	def beginReport(self, header):
+		print("Starting HOReport of type = ", self.__test_type, ", using the file ", self.__root_csv)
+		self.__setupColumnIndicesForAllTestReport(header)
 
-						if row[self.__lte_eci] not in eci_buffer and row[self.__lte_eci] != '':
-							eci_buffer.append(row[self.__lte_eci])
+	def processTest(self, test_rows):
+		data_network_buffer = RootCSVEngine.getUniqueColumnValues(test_rows, self.__data_network_type)
+		eci_buffer = RootCSVEngine.getUniqueColumnValues(test_rows, self.__lte_eci)
+		enodebid_buffer = RootCSVEngine.getUniqueColumnValues(test_rows, self.__lte_enb_id)
+		self.__analyzeTest(test_rows[-1], data_network_buffer, eci_buffer, enodebid_buffer)
 
-						if row[self.__lte_enb_id] not in enodebid_buffer and row[self.__lte_enb_id] != '':
-							enodebid_buffer.append(row[self.__lte_enb_id])
-
-						if "Complete" in row[self.__message]:
-							self.__analyzeTest(row, data_network_buffer, eci_buffer, enodebid_buffer)
-
-						del data_network_buffer[:]
-						del eci_buffer[:]
-						del enodebid_buffer[:]
-						isGatheringDataForATest = False
-						current_test_type = ''
-
-					elif substring in current_test_type and isGatheringDataForATest:
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						if row[self.__lte_eci] not in eci_buffer and row[self.__lte_eci] != '':
-							eci_buffer.append(row[self.__lte_eci])
-
-						if row[self.__lte_enb_id] not in enodebid_buffer and row[self.__lte_enb_id] != '':
-							enodebid_buffer.append(row[self.__lte_enb_id])
-
-		finally:
-			root_csv_file.close()
+	def endReport(self):
+		self.__generateTestReport()
 
-	def __setupColumnIndicesForAllTestReport(self, root_csv_reader):
-		first_row = next(root_csv_reader)
+	def __setupColumnIndicesForAllTestReport(self, first_row):
 		self.__test = first_row.index("Test")
 		self.__task_summary = first_row.index("Task_Summary")
 		self.__message = first_row.index("Message")
@@ -1,94 +1,183 @@
-#usage: python3 io_graph.py <test.pcap file> <ip_address> -v
+#usage: python3 io_graph.py <test.pcap file> <ip_address> [<test.pcap file> <ip_address> ...] -v -T -B -i <interval in seconds> -j <number of jobs>
 #Author: Conard James B. Faraon
 
 """Generate IO Graph similar to WireShark's.
+The Uplink and Downlink packets and bytes of every bin are counted from the pcap file directly, or by tshark io,stat as before,
+several test pcap files are graphed by the same process, or a small pool of them, and every process draws all its graphs on one Agg figure.
 A pdf image is save with the associated test folder.
 See official documentation for more details."""
 
 import argparse
-import os
+import sys
 import time
 import re
-import numpy as nps
-import matplotlib.pyplot as plt
+import subprocess
+import multiprocessing
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from pcap_engine import IOStat
 
 #parse arguments
 parser = argparse.ArgumentParser()
 parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
-parser.add_argument("pcap", help="Test PCAP filename.")
-parser.add_argument("ip_address", help="IP address associated with the test pcap.")
+parser.add_argument("-T", "--tshark", help="Counts the bins with tshark io,stat instead of reading the pcap files directly.", action="store_true")
+parser.add_argument("-B", "--bytes", help="Graphs the bytes of every bin instead of the packets.", action="store_true")
+parser.add_argument("-i", "--interval", help="Width of the bins in seconds, 0.01 s to 10 s, 1 s by default.", type=float, default=1.0)
+parser.add_argument("-j", "--jobs", help="Number of test pcap files graphed at the same time.", type=int, default=1)
+parser.add_argument("captures", help="Test PCAP filename followed by the IP address associated with the test pcap, for every test pcap.", nargs="+")
 args = parser.parse_args()
 
 #constants
-FILENAME = args.pcap.replace('.pcap','') + "_IO1sbins.txt" #data are delimited by pipes |
-PICNAME = args.pcap.replace('.pcap','') + "_IO1sbins.pdf"
+MIN_INTERVAL = 0.01
+MAX_INTERVAL = 10.0
 X_LABEL = "Time (s)"
-Y_LABEL = "Packets/ 1 sec"
 UL_TRAFFIC = "UL Traffic"
 DL_TRAFFIC = "DL Traffic"
 UL_PACKET = "UL Packets"
 DL_PACKET = "DL Packets"
-UL_BAR = 1
-DL_BAR = 3
-UL_LINE = 5
-DL_LINE = 7
+UL_BYTE = "UL Bytes"
+DL_BYTE = "DL Bytes"
+
+#rows of the intervals in the tshark io,stat table
+INTERVAL_REGEXP = re.compile(r"^.\s*[\d.]+\s*<")
+
+if len(args.captures) % 2 != 0:
+	parser.error("every test pcap needs its IP address")
+if not MIN_INTERVAL <= args.interval <= MAX_INTERVAL:
+	parser.error("the interval is from " + str(MIN_INTERVAL) + " s to " + str(MAX_INTERVAL) + " s")
+
+#the figure every graph of this process is drawn on, made by the first graph
+figure = None
 
 def main():
 
 	start = time.time()
 
+	captures = list(zip(args.captures[0::2], args.captures[1::2]))
+	timings = []
+	failures = []
+	for pcap, elapsed, error in processCaptures(captures):
+		if error is None:
+			print("Graphed ", pcap, " in ", elapsed, " s")
+			timings.append(elapsed)
+		else:
+			print("Failed to graph ", pcap, ": ", error)
+			failures.append(pcap)
+
+	if timings:
+		print("\nGraphed ", len(timings), " IO Graphs, ", sum(timings) / len(timings), " s on average, ", max(timings), " s at most.")
+	if failures:
+		print("Failed to graph ", len(failures), " IO Graphs.")
+
+	end = time.time()
+	print("io_graph.py Elapsed Time: ", (end - start), " s\n")
+
+	if failures:
+		sys.exit(1)
+
+def processCaptures(captures):
+	"""Yields (pcap, seconds, error or None) of every (pcap, ip address) capture in order."""
+	if args.jobs <= 1 or len(captures) <= 1:
+		for capture in captures:
+			yield timeGraphIO(capture)
+		return
+
+	print("Graphing ", len(captures), " IO Graphs with ", args.jobs, " jobs.\n")
+
+	#the scripts run main() when imported, so the workers have to be forked
+	pool = multiprocessing.get_context("fork").Pool(args.jobs)
+	try:
+		for result in pool.imap(timeGraphIO, captures, 1):
+			yield result
+	finally:
+		pool.close()
+		pool.join()
+
+def timeGraphIO(capture):
+	pcap, ip_address = capture
+	start = time.time()
+	try:
+		graphIO(pcap, ip_address)
+	except Exception as error:
+		#one bad pcap file does not stop the graphs of the others
+		return (pcap, time.time() - start, str(error))
+
+	return (pcap, time.time() - start, None)
+
+def graphIO(pcap, ip_address):
 	if args.verbose:
 		print("Processing Uplink Test IO Graph with the following arguments:")
-		print("\tpcap = ", args.pcap)
-		print("\tip_address = ", args.ip_address, "\n")
+		print("\tpcap = ", pcap)
+		print("\tip_address = ", ip_address, "\n")
 
-	make1secbins()
-	io_data = processFile()
-	x_axis = getXaxis(io_data)
+	if args.tshark:
+		io_bins = processFile(makeBins(pcap, ip_address))
+	else:
+		io_bins = IOStat.IOStat(pcap, ip_address, args.verbose).analyze().getBins(args.interval)
 
-	uplink_bar = getData(io_data, UL_BAR)
-	if args.verbose:
-		print("uplink_bar = ", uplink_bar)
+	x_axis = getXaxis(io_bins)
 
-	downlink_bar = getData(io_data, DL_BAR)
-	if args.verbose:
-		print("downlink_bar = ", downlink_bar)
+	if args.bytes:
+		columns = [IOStat.UL_BYTES, IOStat.DL_BYTES, IOStat.UL_ALL_BYTES, IOStat.DL_ALL_BYTES]
+	else:
+		columns = [IOStat.UL_PACKETS, IOStat.DL_PACKETS, IOStat.UL_ALL_PACKETS, IOStat.DL_ALL_PACKETS]
+	uplink_bar, downlink_bar, uplink_line, downlink_line = [io_bins[column].tolist() for column in columns]
 
-	uplink_line = getData(io_data, UL_LINE)
 	if args.verbose:
+		print("uplink_bar = ", uplink_bar)
+		print("downlink_bar = ", downlink_bar)
 		print("uplink_line = ", uplink_line)
-
-	downlink_line = getData(io_data, DL_LINE)
-	if args.verbose:
 		print("downlink_line = ", downlink_line)
 
-	makePlot(x_axis, uplink_bar, downlink_bar, uplink_line, downlink_line)
-	end = time.time()
-	print("io_graph.py Elapsed Time: ", (end - start), " s\n")
+	makePlot(getPicName(pcap), x_axis, uplink_bar, downlink_bar, uplink_line, downlink_line)
+
+def getIntervalName():
+	if args.interval >= 1:
+		return format(args.interval, "g") + "s"
+	return format(args.interval * 1000, "g") + "ms"
+
+def getYUnit():
+	if args.interval == 1:
+		return "1 sec"
+	return getIntervalName()
+
+def getFileName(pcap):
+	#data are delimited by pipes |
+	return pcap.replace('.pcap','') + "_IO" + getIntervalName() + "bins.txt"
 
-def make1secbins():
-	tshark_cmd = 'tshark -nn -r '+ args.pcap + ' -qz io,stat,1,"ip.src == '+ args.ip_address + \
-	' && !(tcp.analysis.flags), ip.dst == '+ args.ip_address + \
-	' && !(tcp.analysis.flags), ip.src == '+ args.ip_address + \
-	', ip.dst == '+ args.ip_address + '" > ' + FILENAME
+def getPicName(pcap):
+	return pcap.replace('.pcap','') + "_IO" + getIntervalName() + "bins.pdf"
+
+def makeBins(pcap, ip_address):
+	tshark_cmd = ["tshark", "-nn", "-r", pcap, "-qz", "io,stat," + format(args.interval, "g") + ",ip.src == " + ip_address + \
+	" && !(tcp.analysis.flags), ip.dst == " + ip_address + \
+	" && !(tcp.analysis.flags), ip.src == " + ip_address + \
+	", ip.dst == " + ip_address]
 
 	if args.verbose:
-		print(tshark_cmd)
+		print(' '.join(tshark_cmd))
 
-	os.system(tshark_cmd)
+	filename = getFileName(pcap)
+	try:
+		bin_file = open(filename, 'w')
+		subprocess.call(tshark_cmd, stdout=bin_file)
+	finally:
+		bin_file.close()
 
-def processFile():
+	return filename
+
+def processFile(filename):
 	io_data = []
 	try:
-		bin = open(FILENAME, 'r')
-		regexp = re.compile(r"^.\s*\d+\s*<")
+		bin = open(filename, 'r')
 
 		for line in bin:
-			if regexp.search(line):
+			if INTERVAL_REGEXP.search(line):
 				data = line.split("|")
 				data.remove('')
 				data.remove('\n')
-				io_data.append(data)
+				io_data.append([int(e.strip()) for e in data[1:IOStat.NUM_COLUMNS + 1]])
 	finally:
 		bin.close()
 
@@ -96,48 +185,48 @@ def processFile():
 		for e in io_data:
 			print(e)
 
-	return io_data
-
+	return np.array(io_data, dtype=np.int64).reshape(-1, IOStat.NUM_COLUMNS).T
 
-def getXaxis(io_data):
-	x_axis = []
-
-	maximima = len(io_data)
-
-	for i in range(maximima):
-		x_axis.append(i)
+def getXaxis(io_bins):
+	x_axis = np.round(np.arange(io_bins.shape[1]) * args.interval, 9).tolist()
 
 	if args.verbose:
 		print("x_axis = ", x_axis)
 
 	return x_axis
 
-def getData(io_data, index):
-	temp = []
-
-	for e in io_data:
-		temp.append(int(e[index].strip()))
-
-	return temp
-
-def makePlot(x_axis, uplink_bar, downlink_bar, uplink_line, downlink_line):
-	figure, ax = plt.subplots()
-	figure.set_size_inches(15, 10)
-	width = 0.6
+def getFigure():
+	global figure
+	if figure is None:
+		figure = Figure()
+		FigureCanvasAgg(figure)
+		figure.set_size_inches(15, 10)
+		figure.add_subplot(111)
+
+	return figure
+
+def makePlot(picname, x_axis, uplink_bar, downlink_bar, uplink_line, downlink_line):
+	figure = getFigure()
+	ax = figure.axes[0]
+	ax.clear()
+	width = 0.6 * args.interval
 	ax.set_axisbelow(True)
 	ax.grid(True)
-	p1 = plt.bar(x_axis, uplink_bar, width, color='#ffcc00', align='center')
-	p2 = plt.bar(x_axis, downlink_bar, width, color='#3399ff', align='center')
-	p3 = plt.plot(x_axis, uplink_line,linewidth=1.0, color='#2a6769')
-	p4 = plt.plot(x_axis, downlink_line,linewidth=1.0, color='#8b0a50')
-
-	plt.xlim(-1, max(x_axis)+1)
-	plt.xlabel(X_LABEL)
-	plt.ylabel(Y_LABEL)
-	tmp_title = PICNAME.split('/')
-	plt.title("IO Graph: " + tmp_title[-1])
-	plt.legend((p1[0], p2[0], p3[0], p4[0]), (UL_TRAFFIC, DL_TRAFFIC, UL_PACKET, DL_PACKET))
-	#plt.show()
-	figure.savefig(PICNAME, format='pdf')
+	p1 = ax.bar(x_axis, uplink_bar, width, color='#ffcc00', align='center')
+	p2 = ax.bar(x_axis, downlink_bar, width, color='#3399ff', align='center')
+	p3 = ax.plot(x_axis, uplink_line,linewidth=1.0, color='#2a6769')
+	p4 = ax.plot(x_axis, downlink_line,linewidth=1.0, color='#8b0a50')
+
+	ax.set_xlim(-args.interval, max(x_axis, default=0) + args.interval)
+	ax.set_xlabel(X_LABEL)
+	if args.bytes:
+		ax.set_ylabel("Bytes/ " + getYUnit())
+		ax.legend((p1[0], p2[0], p3[0], p4[0]), (UL_TRAFFIC, DL_TRAFFIC, UL_BYTE, DL_BYTE))
+	else:
+		ax.set_ylabel("Packets/ " + getYUnit())
+		ax.legend((p1[0], p2[0], p3[0], p4[0]), (UL_TRAFFIC, DL_TRAFFIC, UL_PACKET, DL_PACKET))
+	tmp_title = picname.split('/')
+	ax.set_title("IO Graph: " + tmp_title[-1])
+	figure.savefig(picname, format='pdf')
 
 main()
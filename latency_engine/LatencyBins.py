@@ -0,0 +1,51 @@
+#Author: Conard James Faraon
+
+"""This counts the ack_rtt samples of the latency graphs into bins, a sample falls in the first bin whose upper edge is above it
+and every sample at or above the last edge falls in the last bin. Samples of 0.0 s are intervals without any ack_rtt and are not counted.
+Whole arrays of samples are binned at once with NumPy.
+See official documentation for more details."""
+
+import numpy as np
+from collections import OrderedDict
+
+class LatencyBins:
+
+	#100 ms bins from 0.1 s to 2.0 s
+	DEFAULT_EDGES = [edge / 10 for edge in range(1, 21)]
+
+	def __init__(self, edges=None):
+		if edges is None:
+			edges = LatencyBins.DEFAULT_EDGES
+
+		self.__edges = np.unique(np.asarray(edges, dtype=np.float64))
+
+	def getEdges(self):
+		return self.__edges
+
+	def getNumBins(self):
+		return len(self.__edges) + 1
+
+	def getKeys(self):
+		"""The lower edge of every bin, the keys of the dictionaries the latency graphs are made of."""
+		return [0.0] + self.__edges.tolist()
+
+	def getLabels(self):
+		return ["< " + str(edge) for edge in self.__edges.tolist()] + [">= " + str(self.__edges[-1])]
+
+	def count(self, samples):
+		"""Number of samples in every bin as an int64 array."""
+		samples = np.asarray(samples, dtype=np.float64).ravel()
+		samples = samples[samples != 0.0]
+
+		#NaN sorts after every edge, into the last bin
+		return np.bincount(np.searchsorted(self.__edges, samples, side='right'), minlength=self.getNumBins())
+
+	def toDict(self, counts):
+		tmp_dict = OrderedDict()
+		for key, count in zip(self.getKeys(), counts.tolist()):
+			tmp_dict[key] = count
+
+		return tmp_dict
+
+	def mapSamples(self, samples):
+		return self.toDict(self.count(samples))
@@ -0,0 +1,187 @@
+#Author: Conard James Faraon
+
+"""This makes the latency graphs of the Uplink or Downlink Throughput Test pcap files of a market, the direction is a parameter.
+The average ACK round trip time of every 50 ms interval of a pcap file, or the round trip time of every ACK, is found by reading the pcap file
+directly, or by tshark io,stat as before, and the samples of the passed and failed tests are counted into the latency bins, logged and plotted side by side.
+The samples of every test are also kept in a quantile sketch file, so the quantiles of any markets or driver kits are found without the pcap files.
+See official documentation for more details."""
+
+import os
+import re
+import csv
+import glob
+import subprocess
+import numpy as np
+import matplotlib.pyplot as plt
+from pcap_engine import AckRttAnalyzer
+from pcap_engine import UTCMatcher
+from latency_engine import LatencySketch
+
+PASSED = "passed"
+FAILED = "failed"
+
+#rows of the intervals in the tshark io,stat table
+INTERVAL_REGEXP = re.compile(r"^.\s*\d\.\d*\s*<")
+
+class LatencyGraph:
+
+	DIRECTIONS = {"UL": "Uplink", "DL": "Downlink"}
+	MAX_SAMPLE = 200 #interval averages taken from the start of every pcap file
+	INTERVAL = 0.05
+
+	def __init__(self, market, direction, latency_bins, verbose=False):
+		self.__market = market
+		self.__direction = direction
+		self.__latency_bins = latency_bins
+		self.__verbose = verbose
+
+	def getDirection(self):
+		return self.__direction
+
+	def getGraphDir(self):
+		return self.__market + "_" + self.__direction + "_Latency_Graph/"
+
+	def makeGraphDir(self):
+		dirname = self.getGraphDir()[:-1]
+		if not os.path.exists(dirname):
+			if self.__verbose:
+				print("Making a directory for ", dirname)
+			os.makedirs(dirname)
+
+	def findPcaps(self, test_status):
+		glob_path = self.__market + "/*/*/" + test_status + "/*/*/*/*" + self.__direction + "#*.pcap"
+		return glob.glob(glob_path)
+
+	def getDataPath(self, pcap_path):
+		return self.getGraphDir() + pcap_path.split('/')[-1][:-5] + "_Latency_Data.txt"
+
+	def getSketchPath(self):
+		return self.getGraphDir() + self.__market + "_" + self.__direction + "_Latency_Sketches.csv"
+
+	def generateSketchFile(self, tests, sample_type):
+		"""One sketch row for every (test status, pcap path, sketch) test."""
+		rows = []
+		for test_status, pcap_path, sketch in tests:
+			rows.append([self.__market, self.__direction, test_status, getDriverKit(pcap_path), pcap_path.split('/')[-1][:-5], sample_type, sketch])
+
+		LatencySketch.writeSketchFile(self.getSketchPath(), rows)
+
+	def generateLogFile(self, passed_dict, failed_dict):
+		for test_status, tmp_dict in [("Passed", passed_dict), ("Failed", failed_dict)]:
+			filename = self.getGraphDir() + self.__market + "_" + self.__direction + "_Smple_Avg_Latency_" + test_status + "_Data.csv"
+			try:
+				log_file = open(filename, 'w')
+				log_writer = csv.writer(log_file, delimiter=',')
+				for k in list(tmp_dict.keys()):
+					tmp = []
+					tmp.append(k)
+					tmp.append(tmp_dict[k])
+					log_writer.writerow(tmp)
+			finally:
+				log_file.close()
+
+	def plotBarGraph(self, passed_dict, failed_dict):
+		"""Passed and failed bins side by side."""
+		ind = np.arange(self.__latency_bins.getNumBins())
+		width = 0.4
+
+		fig, ax = plt.subplots()
+		fig.set_size_inches(15, 10)
+		ax.set_axisbelow(True)
+		ax.grid(True)
+		rects1 = ax.bar(ind, list(passed_dict.values()), width, color='#ffcc00')
+		rects2 = ax.bar(ind + width, list(failed_dict.values()), width, color='#3399ff')
+		ax.legend((rects1[0], rects2[0]), ('Passed', 'Failed'))
+
+		self.__saveBarGraph(fig, ax, ind, width, self.__market + "_" + self.__direction + "_Smple_Avg_Latency")
+
+	def plotBar(self, data, test_status):
+		bar_color = '#3399ff'
+		if test_status == PASSED:
+			bar_color = '#ffcc00'
+
+		ind = np.arange(self.__latency_bins.getNumBins())
+		width = 0.5
+
+		fig, ax = plt.subplots()
+		fig.set_size_inches(15, 10)
+		ax.set_axisbelow(True)
+		ax.grid(True)
+		ax.bar(ind, list(data.values()), width, color=bar_color)
+
+		self.__saveBarGraph(fig, ax, ind, width, self.__market + "_" + self.__direction + "_Smple_Avg_Latency_" + test_status.upper())
+
+	def __saveBarGraph(self, fig, ax, ind, width, name):
+		picname = name + ".pdf"
+		imagename = name + ".png"
+		ax.set_xlabel("100 ms Bins", fontsize=18)
+		ax.set_ylabel("# of Instances", fontsize=18)
+		ax.set_title(picname, fontsize=18)
+
+		ax.tick_params(axis='x', which='major', pad=5, labelsize=9)
+		ax.set_xticks(ind + width / 2)
+		ax.set_xticklabels(self.__latency_bins.getLabels())
+
+		fig.savefig(self.getGraphDir() + picname)
+		fig.savefig(self.getGraphDir() + imagename)
+		plt.close(fig)
+
+def getDriverKit(pcap_path):
+	for kit_id, pcap_kit_id in UTCMatcher.UTCMatcher.DRIVER_KITS:
+		if kit_id in pcap_path or pcap_kit_id in pcap_path.split('/')[-1]:
+			return kit_id
+
+	return "Unknown"
+
+def getTsharkCmd(pcap_path):
+	return ["tshark", "-r", pcap_path, "-qz", "io,stat," + str(LatencyGraph.INTERVAL) + ",AVG(tcp.analysis.ack_rtt)tcp.analysis.ack_rtt"]
+
+def readLatencySamples(pcap_path, data_path, no_tshark=False, verbose=False, tshark=False, raw_rtt=False):
+	"""The first MAX_SAMPLE interval averages of a pcap file, read from the pcap file, from tshark or from the data file of an earlier tshark run.
+	With raw_rtt, the round trip time of every ACK of the pcap file instead."""
+	if no_tshark:
+		try:
+			data_file = open(data_path, 'r')
+			return parseLatencySamples(data_file)
+		finally:
+			data_file.close()
+
+	if tshark:
+		cmd = getTsharkCmd(pcap_path)
+		if verbose:
+			print(' '.join(cmd), "\n")
+
+		tshark_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
+		data = parseLatencySamples(tshark_proc.stdout.readlines())
+		tshark_proc.wait()
+
+		return data
+
+	try:
+		ack_rtt_analyzer = AckRttAnalyzer.AckRttAnalyzer(pcap_path, verbose).analyze()
+	except ValueError as error:
+		#like tshark, a file that is not a pcap file gives no samples
+		print(error)
+		return []
+
+	if raw_rtt:
+		return ack_rtt_analyzer.getAckRtts().tolist()
+
+	return ack_rtt_analyzer.getIntervalAverages(LatencyGraph.INTERVAL)[:LatencyGraph.MAX_SAMPLE].tolist()
+
+def parseLatencySamples(lines):
+	data = []
+	sample_count = 0
+	for line in lines:
+		if INTERVAL_REGEXP.search(line):
+			sample_count += 1
+			data_row = line.split("|")
+			data_row.remove('')
+			data_row.remove('\n')
+			latency = float(data_row[1])
+			data.append(latency)
+
+		if sample_count == LatencyGraph.MAX_SAMPLE:
+			break
+
+	return data
@@ -0,0 +1,68 @@
+#Author: Conard James Faraon
+
+"""This keeps a uniform random sample of at most size latency samples out of all the samples added to it, by reservoir sampling,
+so the fairness mode of the latency graphs holds size samples per test status instead of every sample.
+The reservoir skips ahead to the next sample it takes (Algorithm L), the random numbers come from the random.Random given, so a seeded
+random.Random gives the same samples run to run.
+See official documentation for more details."""
+
+import math
+
+class LatencyReservoir:
+
+	def __init__(self, size, rng):
+		if size < 1:
+			raise ValueError("The size of a reservoir is at least 1, not " + str(size))
+
+		self.__size = size
+		self.__rng = rng
+		self.__samples = []
+		self.__count = 0
+		self.__weight = 1.0
+		self.__next_index = size #no sample is replaced before the reservoir is full
+
+	def getCount(self):
+		"""Number of samples added."""
+		return self.__count
+
+	def getSamples(self):
+		return self.__samples
+
+	def add(self, samples):
+		samples = list(samples)
+		start = self.__count
+		end = start + len(samples)
+
+		#the first size samples fill the reservoir
+		if start < self.__size:
+			self.__samples.extend(samples[:self.__size - start])
+			if end >= self.__size:
+				self.__weight = math.exp(math.log(self.__random()) / self.__size)
+				self.__skip(self.__size - 1)
+
+		while self.__next_index < end:
+			self.__samples[self.__rng.randrange(self.__size)] = samples[self.__next_index - start]
+			self.__weight *= math.exp(math.log(self.__random()) / self.__size)
+			self.__skip(self.__next_index)
+
+		self.__count = end
+		return self
+
+	def sample(self, sample_size):
+		"""A uniform random sample of sample_size of all the samples added, at most the samples in the reservoir."""
+		if sample_size >= len(self.__samples):
+			return list(self.__samples)
+
+		return self.__rng.sample(self.__samples, sample_size)
+
+	def __skip(self, index):
+		"""The index of the next sample taken after the sample at index."""
+		self.__next_index = index + int(math.log(self.__random()) / math.log(1 - self.__weight)) + 1
+
+	def __random(self):
+		"""A random number in (0, 1), log(0) is undefined."""
+		value = self.__rng.random()
+		while value == 0.0:
+			value = self.__rng.random()
+
+		return value
@@ -0,0 +1,138 @@
+#Author: Conard James Faraon
+
+"""This keeps a mergeable quantile sketch of latency samples, a histogram of logarithmic buckets where every bucket spans a relative width,
+so any quantile of the samples is found within the relative accuracy of the sketch, and sketches of tests, drive kits or markets
+add up bucket by bucket into the sketch of all their samples without reading the pcap files again.
+Samples of 0.0 s are intervals without any ack_rtt and are not counted, samples below MIN_VALUE are counted as 0.0 s.
+See official documentation for more details."""
+
+import csv
+import math
+import numpy as np
+
+#columns of the sketch files of the latency graphs, one row per test
+SKETCH_HEADER = ["Market", "Direction", "Test_Status", "Driver_Kit", "Test", "Sample_Type", "Count", "Relative_Accuracy", "Zero_Count", "Buckets"]
+SKETCH_MARKET = 0
+SKETCH_DIRECTION = 1
+SKETCH_TEST_STATUS = 2
+SKETCH_DRIVER_KIT = 3
+SKETCH_TEST = 4
+SKETCH_SAMPLE_TYPE = 5
+SKETCH_COUNT = 6
+SKETCH_RELATIVE_ACCURACY = 7
+
+class LatencySketch:
+
+	DEFAULT_RELATIVE_ACCURACY = 0.01
+	MIN_VALUE = 0.000001 #1 us
+
+	def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+		if not 0 < relative_accuracy < 1:
+			raise ValueError("The relative accuracy of a sketch is between 0 and 1, not " + str(relative_accuracy))
+
+		self.__relative_accuracy = relative_accuracy
+		self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+		self.__log_gamma = math.log(self.__gamma)
+		self.__zero_count = 0
+		self.__buckets = {}
+
+	def getRelativeAccuracy(self):
+		return self.__relative_accuracy
+
+	def getCount(self):
+		return self.__zero_count + sum(self.__buckets.values())
+
+	def add(self, samples):
+		samples = np.asarray(samples, dtype=np.float64).ravel()
+		samples = samples[(samples != 0.0) & ~np.isnan(samples)]
+
+		isSmall = samples < LatencySketch.MIN_VALUE
+		self.__zero_count += int(isSmall.sum())
+
+		#bucket i holds the samples in (gamma^(i-1), gamma^i]
+		indices, counts = np.unique(np.ceil(np.log(samples[~isSmall]) / self.__log_gamma).astype(np.int64), return_counts=True)
+		for index, count in zip(indices.tolist(), counts.tolist()):
+			self.__buckets[index] = self.__buckets.get(index, 0) + count
+
+		return self
+
+	def merge(self, sketch):
+		if sketch.getRelativeAccuracy() != self.__relative_accuracy:
+			raise ValueError("Sketches of relative accuracy " + str(self.__relative_accuracy) + " and " + str(sketch.getRelativeAccuracy()) + " do not merge.")
+
+		zero_count, buckets = sketch.getBuckets()
+		return self.addBuckets(zero_count, buckets)
+
+	def addBuckets(self, zero_count, buckets):
+		"""Adds the counts of buckets of the same relative accuracy."""
+		self.__zero_count += zero_count
+		for index, count in buckets.items():
+			self.__buckets[index] = self.__buckets.get(index, 0) + count
+
+		return self
+
+	def getBuckets(self):
+		"""(count of the samples below MIN_VALUE, {bucket index: count})."""
+		return self.__zero_count, self.__buckets
+
+	def getQuantile(self, quantile):
+		"""The sample of rank quantile * (count - 1), within the relative accuracy, or None for an empty sketch."""
+		count = self.getCount()
+		if count == 0:
+			return None
+
+		rank = quantile * (count - 1)
+		cumulative_count = self.__zero_count
+		if cumulative_count > rank:
+			return 0.0
+
+		for index in sorted(self.__buckets):
+			cumulative_count += self.__buckets[index]
+			if cumulative_count > rank:
+				#the value with the same relative error to both edges of the bucket
+				return 2 * self.__gamma ** index / (self.__gamma + 1)
+
+		return 2 * self.__gamma ** max(self.__buckets) / (self.__gamma + 1)
+
+	def getQuantiles(self, quantiles):
+		return [self.getQuantile(quantile) for quantile in quantiles]
+
+	def serialize(self):
+		"""(relative accuracy, zero count, "index:count index:count ...") for a csv row."""
+		buckets = " ".join([str(index) + ":" + str(self.__buckets[index]) for index in sorted(self.__buckets)])
+		return (repr(self.__relative_accuracy), str(self.__zero_count), buckets)
+
+def parseSketch(relative_accuracy, zero_count, buckets):
+	"""The sketch of the fields of a serialize() row."""
+	sketch_buckets = {}
+	for bucket in buckets.split():
+		index, count = bucket.split(":")
+		sketch_buckets[int(index)] = int(count)
+
+	return LatencySketch(float(relative_accuracy)).addBuckets(int(zero_count), sketch_buckets)
+
+def writeSketchFile(sketch_path, rows):
+	"""rows of the first SKETCH_COUNT columns and the sketch of the test."""
+	try:
+		sketch_file = open(sketch_path, 'w', newline='')
+		sketch_writer = csv.writer(sketch_file, delimiter=',')
+		sketch_writer.writerow(SKETCH_HEADER)
+		for row in rows:
+			sketch = row[SKETCH_COUNT]
+			sketch_writer.writerow(list(row[:SKETCH_COUNT]) + [sketch.getCount()] + list(sketch.serialize()))
+	finally:
+		sketch_file.close()
+
+def readSketchFile(sketch_path):
+	"""The rows of a sketch file, the first SKETCH_COUNT columns and the sketch of the test."""
+	rows = []
+	try:
+		sketch_file = open(sketch_path, 'r', newline='')
+		sketch_reader = csv.reader(sketch_file, delimiter=',')
+		next(sketch_reader)
+		for row in sketch_reader:
+			rows.append(row[:SKETCH_COUNT] + [parseSketch(*row[SKETCH_RELATIVE_ACCURACY:])])
+	finally:
+		sketch_file.close()
+
+	return rows
@@ -0,0 +1,152 @@
+#usage: python3 latency_graph.py <directory name> -v -n -T -r -f -d UL DL -j <number of jobs> -b <bin edges in seconds> -a <relative accuracy> -k <reservoir size> -s <seed>
+#Author: Conard James B. Faraon
+
+"""Generate the latency graphs for each 100ms bins using the Uplink and Downlink Throughput Test pcap files.
+The pcap files of every direction are read by one pool of jobs, a new folder is generated for the reports of each direction.
+The samples of every test are kept in a mergeable quantile sketch file, latency_quantiles.py merges them across markets and driver kits.
+See official documentation for more details."""
+
+import argparse
+import random
+import time
+import multiprocessing
+from latency_engine import LatencyBins
+from latency_engine import LatencyGraph
+from latency_engine import LatencyReservoir
+from latency_engine import LatencySketch
+
+#parse arguments here
+parser = argparse.ArgumentParser()
+parser.add_argument("-v", "--verbose", help="Show various messages from debugging and processing.", action="store_true")
+parser.add_argument("-n", "--no_tshark", help="Disables Tshark for processing pcaps files, the latency data txt files are read instead.", action="store_true")
+parser.add_argument("-T", "--tshark", help="Reads the average ack_rtt with tshark io,stat instead of reading the pcap files directly.", action="store_true")
+parser.add_argument("-r", "--raw_rtt", help="Graphs the round trip time of every ACK instead of the 50 ms averages.", action="store_true")
+parser.add_argument("-f", "--fairness", help="Enables fairness for sampling and generating graphs.", action="store_true")
+parser.add_argument("-k", "--reservoir_size", help="Most samples kept per test status by the fairness mode, a uniform random sample of them all.", type=int, default=100000)
+parser.add_argument("-s", "--seed", help="Seed of the random sampling of the fairness mode, the same seed takes the same samples.", type=int)
+parser.add_argument("-d", "--direction", help="Throughput Test directions to graph.", nargs="+", choices=sorted(LatencyGraph.LatencyGraph.DIRECTIONS), default=["UL", "DL"])
+parser.add_argument("-j", "--jobs", help="Number of pcap files processed at the same time.", type=int, default=1)
+parser.add_argument("-b", "--bin_edges", help="Upper edges of the latency bins in seconds, 0.1 s to 2.0 s in 100 ms steps by default.", type=float, nargs="+")
+parser.add_argument("-a", "--relative_accuracy", help="Relative accuracy of the quantile sketches of the tests, 1%% by default.", type=float, default=LatencySketch.LatencySketch.DEFAULT_RELATIVE_ACCURACY)
+parser.add_argument("dir", help="Directory name of small Throughput pcap files generated from previous data processing scripts.")
+args = parser.parse_args()
+
+#constants
+PASSED = LatencyGraph.PASSED
+FAILED = LatencyGraph.FAILED
+SAMPLE_INTERVAL_AVERAGE = "ack_rtt_" + str(int(LatencyGraph.LatencyGraph.INTERVAL * 1000)) + "ms_avg"
+SAMPLE_ACK_RTT = "ack_rtt"
+
+def main():
+	start = time.time()
+
+	latency_bins = LatencyBins.LatencyBins(args.bin_edges)
+	graphs = [LatencyGraph.LatencyGraph(args.dir, direction, latency_bins, args.verbose) for direction in args.direction]
+
+	#the pcap files of every direction and test status go to the same pool
+	jobs = []
+	job_ranges = {}
+	for graph in graphs:
+		direction = graph.getDirection()
+		if args.verbose:
+			print("Generating ", direction, " Latency Graph for directory = ", args.dir, "\n")
+
+		graph.makeGraphDir()
+		for test_status in [PASSED, FAILED]:
+			pcap_list = graph.findPcaps(test_status)
+			if args.verbose:
+				print("Entries for " + test_status + "_" + direction.lower() + "_pcap_list:")
+				for e in pcap_list:
+					print(e)
+				print()
+
+			print("Number of ", test_status, " ", direction, " Tests = ", len(pcap_list), "\n")
+			job_ranges[(direction, test_status)] = (len(jobs), len(jobs) + len(pcap_list))
+			jobs += [(e, graph.getDataPath(e)) for e in pcap_list]
+
+	#every pcap file is counted as it is read, only the reservoirs of the fairness mode keep samples
+	rng = random.Random(args.seed)
+	counts = {}
+	reservoirs = {}
+	tests = {}
+	job_keys = [None] * len(jobs)
+	for graph in graphs:
+		direction = graph.getDirection()
+		tests[direction] = []
+		for test_status in [PASSED, FAILED]:
+			first, last = job_ranges[(direction, test_status)]
+			job_keys[first:last] = [(direction, test_status)] * (last - first)
+			counts[(direction, test_status)] = latency_bins.count([])
+			reservoirs[(direction, test_status)] = LatencyReservoir.LatencyReservoir(args.reservoir_size, rng)
+
+	for job, job_key, pcap_samples in zip(jobs, job_keys, processPcaps(jobs)):
+		direction, test_status = job_key
+		counts[job_key] += latency_bins.count(pcap_samples)
+		if args.fairness:
+			reservoirs[job_key].add(pcap_samples)
+		tests[direction].append((test_status, job[0], LatencySketch.LatencySketch(args.relative_accuracy).add(pcap_samples)))
+
+	for graph in graphs:
+		direction = graph.getDirection()
+		graph.generateSketchFile(tests[direction], getSampleType())
+
+		latency_dicts = {}
+		if args.fairness:
+			#a uniform sample of each reservoir, as many samples as the smaller one
+			sample_numbers = min(len(reservoirs[(direction, test_status)].getSamples()) for test_status in [PASSED, FAILED])
+			for test_status in [PASSED, FAILED]:
+				data = reservoirs[(direction, test_status)].sample(sample_numbers)
+				counts[(direction, test_status)] = latency_bins.count(data)
+				if args.verbose:
+					print("Data for " + test_status + "_" + direction.lower() + "_data:")
+					print(data, "\n")
+
+		for test_status in [PASSED, FAILED]:
+			latency_dicts[test_status] = latency_bins.toDict(counts[(direction, test_status)])
+			if args.verbose:
+				print("Samples binned = ", sum(latency_dicts[test_status].values()))
+				print("Dictionary for " + test_status + "_" + direction.lower() + "_dict:")
+				for k,v in latency_dicts[test_status].items():
+					print(k,v)
+				print()
+
+		graph.generateLogFile(latency_dicts[PASSED], latency_dicts[FAILED])
+
+		#plot a side by side bar graph
+		graph.plotBarGraph(latency_dicts[PASSED], latency_dicts[FAILED])
+
+		#plot separate bar graphs
+		graph.plotBar(latency_dicts[PASSED], PASSED)
+		graph.plotBar(latency_dicts[FAILED], FAILED)
+
+	end = time.time()
+	print("latency_graph.py Elapsed Time: ", (end - start), " s\n")
+
+def processPcaps(jobs):
+	"""Yields the latency samples of every (pcap path, data path) job in order."""
+	if args.jobs <= 1:
+		for job in jobs:
+			yield readLatencySamples(job)
+		return
+
+	print("Processing ", len(jobs), " pcap files with ", args.jobs, " jobs.\n")
+
+	#the scripts run main() when imported, so the workers have to be forked
+	pool = multiprocessing.get_context("fork").Pool(args.jobs)
+	try:
+		for samples in pool.imap(readLatencySamples, jobs, 1):
+			yield samples
+	finally:
+		pool.close()
+		pool.join()
+
+def getSampleType():
+	if args.raw_rtt and not args.tshark and not args.no_tshark:
+		return SAMPLE_ACK_RTT
+	return SAMPLE_INTERVAL_AVERAGE
+
+def readLatencySamples(job):
+	pcap_path, data_path = job
+	return LatencyGraph.readLatencySamples(pcap_path, data_path, args.no_tshark, args.verbose, args.tshark, args.raw_rtt)
+
+main()
@@ -0,0 +1,89 @@
+#usage: python3 latency_quantiles.py <directory names> -v -d UL DL -s passed failed -k <driver kits> -g <group by columns> -q <quantiles in percent> -o <output csv>
+#Author: Conard James B. Faraon
+
+"""Find the latency quantiles of any markets, driver kits or test statuses from the quantile sketch files of latency_graph.py.
+The sketches of the tests are merged bucket by bucket for every group, the pcap files are not read again.
+See official documentation for more details."""
+
+import os
+import csv
+import time
+import argparse
+from collections import OrderedDict
+from latency_engine import LatencyGraph
+from latency_engine import LatencySketch
+
+GROUP_COLUMNS = OrderedDict([("market", LatencySketch.SKETCH_MARKET), ("direction", LatencySketch.SKETCH_DIRECTION), ("test_status", LatencySketch.SKETCH_TEST_STATUS),
+	("driver_kit", LatencySketch.SKETCH_DRIVER_KIT), ("test", LatencySketch.SKETCH_TEST)])
+
+#parse arguments here
+parser = argparse.ArgumentParser()
+parser.add_argument("-v", "--verbose", help="Show various messages from debugging and processing.", action="store_true")
+parser.add_argument("-d", "--direction", help="Throughput Test directions to include.", nargs="+", choices=sorted(LatencyGraph.LatencyGraph.DIRECTIONS), default=["UL", "DL"])
+parser.add_argument("-s", "--test_status", help="Test statuses to include.", nargs="+", choices=[LatencyGraph.PASSED, LatencyGraph.FAILED], default=[LatencyGraph.PASSED, LatencyGraph.FAILED])
+parser.add_argument("-k", "--driver_kit", help="Driver kits to include, every driver kit by default.", nargs="+")
+parser.add_argument("-g", "--group_by", help="Columns the sketches are merged by, the quantiles of all the included tests together if none.", nargs="*", choices=list(GROUP_COLUMNS), default=["direction", "test_status"])
+parser.add_argument("-q", "--quantiles", help="Quantiles in percent.", type=float, nargs="+", default=[50, 90, 99])
+parser.add_argument("-o", "--output", help="Csv file the quantiles are written to.", default="Latency_Quantiles.csv")
+parser.add_argument("DIRECTORY", help="Directory names of the markets given to latency_graph.py.", nargs="+")
+args = parser.parse_args()
+
+def main():
+	start = time.time()
+
+	groups = mergeSketches(readSketches())
+	generateQuantileFile(groups)
+
+	end = time.time()
+	print("latency_quantiles.py Elapsed Time: ", (end - start), " s\n")
+
+def readSketches():
+	rows = []
+	for market in args.DIRECTORY:
+		for direction in args.direction:
+			sketch_path = LatencyGraph.LatencyGraph(market.strip('/'), direction, None).getSketchPath()
+			if not os.path.exists(sketch_path):
+				print("No sketch file ", sketch_path, ", run latency_graph.py first.")
+				continue
+
+			if args.verbose:
+				print("Reading ", sketch_path)
+			rows += LatencySketch.readSketchFile(sketch_path)
+
+	return [row for row in rows if row[LatencySketch.SKETCH_TEST_STATUS] in args.test_status
+		and (args.driver_kit is None or row[LatencySketch.SKETCH_DRIVER_KIT] in args.driver_kit)]
+
+def mergeSketches(rows):
+	"""{group key: merged sketch}, interval averages and ACK round trip times, and sketches of different relative accuracies, are never merged together."""
+	groups = OrderedDict()
+	for row in rows:
+		sketch = row[LatencySketch.SKETCH_COUNT]
+		key = tuple([row[GROUP_COLUMNS[column]] for column in args.group_by]) + (row[LatencySketch.SKETCH_SAMPLE_TYPE], sketch.getRelativeAccuracy())
+		if key in groups:
+			groups[key].merge(sketch)
+		else:
+			groups[key] = sketch
+
+	return groups
+
+def generateQuantileFile(groups):
+	header = [column.title() for column in args.group_by] + ["Sample_Type", "Relative_Accuracy", "Count"] + ["p" + format(quantile, "g") for quantile in args.quantiles]
+	try:
+		quantile_file = open(args.output, 'w', newline='')
+		quantile_writer = csv.writer(quantile_file, delimiter=',')
+		quantile_writer.writerow(header)
+		if args.verbose:
+			print(header)
+
+		for key in sorted(groups):
+			sketch = groups[key]
+			row = list(key) + [sketch.getCount()] + sketch.getQuantiles([quantile / 100 for quantile in args.quantiles])
+			quantile_writer.writerow(row)
+			if args.verbose:
+				print(row)
+	finally:
+		quantile_file.close()
+
+	print("Quantiles of ", len(groups), " groups written to ", args.output)
+
+main()
@@ -9,8 +9,7 @@ import os
 import time
 import csv
 import glob
-import decimal
-from datetime import datetime
+from time_engine import UnixTime
 
 
 #parse arguments here
@@ -343,8 +342,7 @@ def getDeltaTimeWithOk(ok_stream, ok_time, reader):
 		print("row_buffer = ", row_buffer)
 
 	if len(row_buffer) != 0:
-		ok_time_epoch = dateToUnixTime(ok_time)
-		ok_time_with_ms = dateToUnixMs(ok_time_epoch, ok_time)
+		ok_time_with_ms = UnixTime.dateToUnixTime(ok_time)
 		min_time_from_reader = ok_time_with_ms - getMinimumTime(row_buffer)
 
 	return min_time_from_reader
@@ -372,24 +370,7 @@ def getTimeDelta(ok_stream, a, b):
 	return a_buffer, b_buffer, delta_time
 
 def getMinimumTime(point_buffer):
-	row_time = []
-	for row in point_buffer:
-		row_time_s = dateToUnixTime(row[INDEX_TIME])
-		row_time_with_ms = dateToUnixMs(row_time_s, row[INDEX_TIME])
-		row_time.append(row_time_with_ms)
-	return min(row_time)
-
-def dateToUnixTime(date_string):
-	date_object = datetime.strptime(date_string,'%Y-%m-%d %H:%M:%S.%f')
-	unix_timestamp = date_object.strftime("%s")
-	return float(unix_timestamp)
-
-def dateToUnixMs(epoch, date_string):
-	decimal.getcontext().prec = 6
-	date_string_decimal = float(date_string.split(':')[-1])
-	date_string_whole_number = float(date_string.split(':')[-1].split('.')[0])
-	date_string_decimal = decimal.Decimal(date_string_decimal) - decimal.Decimal(date_string_whole_number)
-	unix_time_ms = epoch + float(date_string_decimal)
-	return unix_time_ms
+	row_time = UnixTime.datesToUnixTime([row[INDEX_TIME] for row in point_buffer])
+	return float(row_time.min())
 
 main()
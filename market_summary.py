@@ -12,6 +12,7 @@ import csv
 import argparse
 from openpyxl import Workbook
 from openpyxl.drawing.image import Image
+from latency_engine import LatencySketch
 
 #parse arguments here
 parser = argparse.ArgumentParser()
@@ -22,6 +23,7 @@ args = parser.parse_args()
 RAN_PAD = 4
 HO_PAD = 5
 RF_PAD = 4
+LATENCY_QUANTILES = [0.5, 0.9, 0.99]
 ALPHABET = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z']
 
 def main():
@@ -154,6 +156,37 @@ def processLatency(ws, glob_string):
 		writeLatency(ws, markets)
 		ws.append(['\n'])
 		ws.append(['\n'])
+	writeLatencyQuantiles(ws, glob_string)
+
+def writeLatencyQuantiles(ws, glob_string):
+	"""p50, p90 and p99 of every market and of all the markets together, merged from the sketch files of latency_graph.py."""
+	ws.append([glob_string + "_RTT_Quantiles"])
+	ws.append(["Market", "Test_Status", "Sample_Type", "Relative_Accuracy", "Count"] + ["p" + format(quantile * 100, "g") for quantile in LATENCY_QUANTILES])
+	all_markets = {}
+	for market_directory in args.DIRECTORY:
+		sketch_paths = glob.glob(market_directory + "*" + glob_string + "*/*_Sketches.csv")
+		if args.verbose:
+			print(sketch_paths, "\n")
+
+		market = {}
+		for sketch_path in sketch_paths:
+			for row in LatencySketch.readSketchFile(sketch_path):
+				sketch = row[LatencySketch.SKETCH_COUNT]
+				#only sketches of the same relative accuracy merge, latency_graph.py -a changes it
+				key = (row[LatencySketch.SKETCH_TEST_STATUS], row[LatencySketch.SKETCH_SAMPLE_TYPE], sketch.getRelativeAccuracy())
+				market.setdefault(key, LatencySketch.LatencySketch(sketch.getRelativeAccuracy())).merge(sketch)
+				all_markets.setdefault(key, LatencySketch.LatencySketch(sketch.getRelativeAccuracy())).merge(sketch)
+
+		writeLatencyQuantileRows(ws, market_directory.strip('/'), market)
+
+	if len(args.DIRECTORY) > 1:
+		writeLatencyQuantileRows(ws, "All", all_markets)
+	ws.append(['\n'])
+
+def writeLatencyQuantileRows(ws, market_name, sketches):
+	for key in sorted(sketches):
+		sketch = sketches[key]
+		ws.append([market_name] + list(key) + [sketch.getCount()] + sketch.getQuantiles(LATENCY_QUANTILES))
 
 def writeLatency(ws, markets):
 	try:
@@ -375,7 +408,8 @@ def globDir(market_directory, report_type, flag):
 	if "RF" in report_type:
 		glob_path =  market_directory + "*" + report_type + "/*RF#*"
 	elif flag:
-		glob_path = market_directory + "*" + report_type + "*/*.csv"
+		#the bins, not the sketch files
+		glob_path = market_directory + "*" + report_type + "*/*_Data.csv"
 	elif "UL_Latency" in report_type or "DL_Latency" in report_type:
 		glob_path = market_directory + "*" + report_type + "/*.png"
 	else:
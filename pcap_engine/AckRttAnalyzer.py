@@ -0,0 +1,150 @@
+#Author: Conard James Faraon
+
+"""This finds the round trip time of the ACKs of every TCP stream of a pcap file without tshark, like tcp.analysis.ack_rtt.
+The segments of each side of a stream are kept until they are acknowledged, an ACK of exactly the end of a segment gets the time
+since the last transmission of that segment, and every segment it covers is dropped.
+The round trip times are kept in NumPy arrays together with the time of their ACK since the first packet, as tshark io,stat counts it.
+See official documentation for more details."""
+
+import heapq
+import numpy as np
+from pcap_engine import PcapReader
+from pcap_engine import StreamTracker
+
+#indices of the state of one side of a stream
+SIDE_BASE_SEQ = 0
+SIDE_SEGMENTS = 1
+SIDE_NEXT_SEQS = 2
+
+class AckRttAnalyzer:
+
+	def __init__(self, pcap_path, verbose=False):
+		self.__pcap_path = pcap_path
+		self.__verbose = verbose
+		self.__duration = 0.0
+		self.__ack_times = np.zeros(0, dtype=np.float64)
+		self.__ack_rtts = np.zeros(0, dtype=np.float64)
+		self.__streams = np.zeros(0, dtype=np.int64)
+		self.__frame_numbers = np.zeros(0, dtype=np.int64)
+
+	def analyze(self):
+		pcap_reader = PcapReader.PcapReader(self.__pcap_path).open()
+		stream_tracker = StreamTracker.StreamTracker()
+		#(stream, src address, src port) -> [base seq, {relative next seq: time of the last transmission}, heap of the next seqs]
+		sides = {}
+		first_timestamp = None
+		last_timestamp = 0.0
+		ack_times = []
+		ack_rtts = []
+		streams = []
+		frame_numbers = []
+
+		try:
+			buffer = pcap_reader.getBuffer()
+			decodePacket = PcapReader.decodePacket
+			decodeTCP = PcapReader.decodeTCP
+			for packet in pcap_reader.getPackets():
+				timestamp = packet[PcapReader.PACKET_TIMESTAMP]
+				if first_timestamp is None:
+					first_timestamp = timestamp
+					last_timestamp = timestamp
+				#the timestamps of a pcap file can go backwards
+				elif timestamp > last_timestamp:
+					last_timestamp = timestamp
+
+				decoded = decodePacket(buffer, packet[PcapReader.PACKET_LINK_TYPE], packet[PcapReader.PACKET_DATA_START], packet[PcapReader.PACKET_DATA_END])
+				if decoded is None or decoded[PcapReader.DECODED_PROTOCOL] != PcapReader.PROTOCOL_TCP:
+					continue
+
+				protocol, stream = stream_tracker.getStream(buffer, decoded)
+				transport_offset = decoded[PcapReader.DECODED_TRANSPORT_OFFSET]
+				seq, ack, flags, header_length, window = decodeTCP(buffer, transport_offset)
+				src = (stream, decoded[PcapReader.DECODED_SRC], decoded[PcapReader.DECODED_SRC_PORT])
+				dst = (stream, decoded[PcapReader.DECODED_DST], decoded[PcapReader.DECODED_DST_PORT])
+
+				side = sides.get(src)
+				if side is None:
+					side = [seq, {}, []]
+					sides[src] = side
+
+				#SYN and FIN take one sequence number each
+				segment_length = max(0, decoded[PcapReader.DECODED_IP_END] - transport_offset - header_length)
+				if flags & PcapReader.TCP_SYN:
+					segment_length += 1
+				if flags & PcapReader.TCP_FIN:
+					segment_length += 1
+
+				if segment_length > 0:
+					next_seq = ((seq - side[SIDE_BASE_SEQ]) & 0xffffffff) + segment_length
+					if next_seq not in side[SIDE_SEGMENTS]:
+						heapq.heappush(side[SIDE_NEXT_SEQS], next_seq)
+					side[SIDE_SEGMENTS][next_seq] = timestamp
+
+				if not flags & PcapReader.TCP_ACK:
+					continue
+
+				acked_side = sides.get(dst)
+				if acked_side is None:
+					continue
+
+				acked_seq = (ack - acked_side[SIDE_BASE_SEQ]) & 0xffffffff
+				segments = acked_side[SIDE_SEGMENTS]
+				sent_timestamp = segments.get(acked_seq)
+				if sent_timestamp is not None:
+					ack_times.append(timestamp - first_timestamp)
+					ack_rtts.append(timestamp - sent_timestamp)
+					streams.append(stream)
+					frame_numbers.append(packet[PcapReader.PACKET_FRAME_NUMBER])
+
+				next_seqs = acked_side[SIDE_NEXT_SEQS]
+				while next_seqs and next_seqs[0] <= acked_seq:
+					del segments[heapq.heappop(next_seqs)]
+
+		finally:
+			pcap_reader.close()
+
+		if first_timestamp is not None:
+			self.__duration = last_timestamp - first_timestamp
+		#the timestamps are whole nanoseconds at most, tshark subtracts them without the float error
+		self.__ack_times = np.round(np.array(ack_times, dtype=np.float64), 9)
+		self.__ack_rtts = np.round(np.array(ack_rtts, dtype=np.float64), 9)
+		self.__streams = np.array(streams, dtype=np.int64)
+		self.__frame_numbers = np.array(frame_numbers, dtype=np.int64)
+
+		if self.__verbose:
+			print("Found ", len(self.__ack_rtts), " ACK round trip times in ", self.__pcap_path)
+
+		return self
+
+	def getDuration(self):
+		"""Seconds from the first packet to the latest one."""
+		return self.__duration
+
+	def getAckTimes(self):
+		"""Seconds from the first packet to every ACK with a round trip time, negative for an ACK timestamped before the first packet."""
+		return self.__ack_times
+
+	def getAckRtts(self):
+		return self.__ack_rtts
+
+	def getStreams(self):
+		return self.__streams
+
+	def getFrameNumbers(self):
+		return self.__frame_numbers
+
+	def getIntervalAverages(self, interval):
+		"""Average round trip time of the ACKs of every interval from the first to the last packet, 0.0 for an interval without any."""
+		#whole nanoseconds, so an ACK right on the edge of an interval is not put in the one before by the float division
+		interval_ns = int(round(interval * 1e9))
+		num_intervals = int(round(self.__duration * 1e9)) // interval_ns + 1
+		ack_times = np.round(self.__ack_times * 1e9).astype(np.int64)
+		#the ACKs timestamped before the first packet are left out like tshark io,stat leaves them out
+		selected = ack_times >= 0
+		bins = np.minimum(ack_times[selected] // interval_ns, num_intervals - 1)
+		counts = np.bincount(bins, minlength=num_intervals)
+		sums = np.bincount(bins, weights=self.__ack_rtts[selected], minlength=num_intervals)
+
+		averages = np.zeros(num_intervals, dtype=np.float64)
+		np.divide(sums, counts, out=averages, where=counts > 0)
+		return averages
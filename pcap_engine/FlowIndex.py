@@ -0,0 +1,249 @@
+#Author: Conard James Faraon
+
+"""This indexes the TCP and UDP streams of a pcap file into a sidecar file <pcap>.flowidx.
+Every stream keeps its flow key, first and last timestamp, and the file offsets and frame numbers of its packets.
+Later stages seek straight to the packets of a stream instead of dissecting the whole pcap file again.
+See official documentation for more details."""
+
+import os
+import struct
+import ipaddress
+from array import array
+from pcap_engine import PcapReader
+from pcap_engine import StreamTracker
+
+class Flow:
+
+	def __init__(self, protocol, stream, src, dst, src_port, dst_port):
+		self.__protocol = protocol
+		self.__stream = stream
+		self.__src = src
+		self.__dst = dst
+		self.__src_port = src_port
+		self.__dst_port = dst_port
+		self.__first_timestamp = 0.0
+		self.__last_timestamp = 0.0
+		self.__record_offsets = array('Q')
+		self.__frame_numbers = array('Q')
+
+	def addPacket(self, frame_number, timestamp, record_offset):
+		if not self.__record_offsets:
+			self.__first_timestamp = timestamp
+		self.__last_timestamp = timestamp
+		self.__record_offsets.append(record_offset)
+		self.__frame_numbers.append(frame_number)
+
+	def setPackets(self, first_timestamp, last_timestamp, record_offsets, frame_numbers):
+		self.__first_timestamp = first_timestamp
+		self.__last_timestamp = last_timestamp
+		self.__record_offsets = record_offsets
+		self.__frame_numbers = frame_numbers
+
+	def getProtocol(self):
+		"""Either "tcp" or "udp"."""
+		return self.__protocol
+
+	def getStream(self):
+		return self.__stream
+
+	def getKey(self):
+		"""(src address, dst address, src port, dst port) as seen in the first packet of the stream."""
+		return (str(ipaddress.ip_address(self.__src)), str(ipaddress.ip_address(self.__dst)), self.__src_port, self.__dst_port)
+
+	def getRawKey(self):
+		return (self.__src, self.__dst, self.__src_port, self.__dst_port)
+
+	def getFirstTimestamp(self):
+		return self.__first_timestamp
+
+	def getLastTimestamp(self):
+		return self.__last_timestamp
+
+	def getNumPackets(self):
+		return len(self.__record_offsets)
+
+	def getRecordOffsets(self):
+		return self.__record_offsets
+
+	def getFrameNumbers(self):
+		return self.__frame_numbers
+
+class FlowIndex:
+
+	INDEX_EXT = ".flowidx"
+	INDEX_MAGIC = b"FLOWIDX1"
+	PROTOCOLS = {"tcp": PcapReader.PROTOCOL_TCP, "udp": PcapReader.PROTOCOL_UDP}
+
+	def __init__(self, pcap_path, verbose=False):
+		self.__pcap_path = pcap_path
+		self.__index_path = pcap_path + FlowIndex.INDEX_EXT
+		self.__verbose = verbose
+		self.__flows = {}
+		self.__sections = []
+
+	def getIndexPath(self):
+		return self.__index_path
+
+	def load(self):
+		"""Reads the sidecar file, or builds and saves it if it is missing or older than the pcap file."""
+		if not self.__readIndex():
+			self.build()
+			self.__writeIndex()
+
+		if self.__verbose:
+			print("Loaded ", len(self.__flows), " streams from the flow index ", self.__index_path)
+
+		return self
+
+	def build(self):
+		print("Indexing the streams of ", self.__pcap_path)
+		pcap_reader = PcapReader.PcapReader(self.__pcap_path).open()
+		stream_tracker = StreamTracker.StreamTracker()
+		flows = {}
+
+		try:
+			buffer = pcap_reader.getBuffer()
+			decodePacket = PcapReader.decodePacket
+			for packet in pcap_reader.getPackets():
+				decoded = decodePacket(buffer, packet[PcapReader.PACKET_LINK_TYPE], packet[PcapReader.PACKET_DATA_START], packet[PcapReader.PACKET_DATA_END])
+				if decoded is None:
+					continue
+
+				key = stream_tracker.getStream(buffer, decoded)
+				flow = flows.get(key)
+				if flow is None:
+					flow = Flow(key[0], key[1], decoded[PcapReader.DECODED_SRC], decoded[PcapReader.DECODED_DST], decoded[PcapReader.DECODED_SRC_PORT], decoded[PcapReader.DECODED_DST_PORT])
+					flows[key] = flow
+				flow.addPacket(packet[PcapReader.PACKET_FRAME_NUMBER], packet[PcapReader.PACKET_TIMESTAMP], packet[PcapReader.PACKET_RECORD_START])
+
+			self.__sections = pcap_reader.getSections()
+
+		finally:
+			pcap_reader.close()
+
+		self.__flows = flows
+
+	def getFlows(self):
+		"""Every stream in the order tshark numbers them, tcp streams first."""
+		return [self.__flows[key] for key in sorted(self.__flows)]
+
+	def getFlow(self, protocol, stream):
+		return self.__flows.get((protocol, int(stream)))
+
+	def getSections(self):
+		return self.__sections
+
+	def openPcap(self):
+		"""Opens the pcap file for getPacketAt() and getPackets()."""
+		pcap_reader = PcapReader.PcapReader(self.__pcap_path).open()
+		pcap_reader.setSections(self.__sections)
+		return pcap_reader
+
+	def getPackets(self, pcap_reader, flows):
+		"""Packets of the given flows in capture order, in the same form as PcapReader.getPackets()."""
+		records = []
+		for flow in flows:
+			records.extend(zip(flow.getRecordOffsets(), flow.getFrameNumbers()))
+		records.sort()
+
+		previous_offset = -1
+		for record_offset, frame_number in records:
+			if record_offset != previous_offset:
+				yield pcap_reader.getPacketAt(record_offset, frame_number)
+			previous_offset = record_offset
+
+	def __makeKey(self):
+		stat = os.stat(self.__pcap_path)
+		return (stat.st_size, stat.st_mtime_ns)
+
+	def __writeIndex(self):
+		size, mtime = self.__makeKey()
+		#stages running at the same time must never read a partial index
+		tmp_index_path = self.__index_path + "." + str(os.getpid())
+		try:
+			index_file = open(tmp_index_path, 'wb')
+			index_file.write(FlowIndex.INDEX_MAGIC)
+			index_file.write(struct.pack('<QqII', size, mtime, len(self.__sections), len(self.__flows)))
+
+			for start, blocks, interfaces, byte_order in self.__sections:
+				index_file.write(struct.pack('<Q1sI', start, byte_order.encode(), len(blocks)))
+				for block_start, block_end in blocks:
+					index_file.write(struct.pack('<QQ', block_start, block_end))
+				index_file.write(struct.pack('<I', len(interfaces)))
+				for link_type, resolution in interfaces:
+					index_file.write(struct.pack('<Hd', link_type, resolution))
+
+			for flow in self.getFlows():
+				src, dst, src_port, dst_port = flow.getRawKey()
+				index_file.write(struct.pack('<BIB', FlowIndex.PROTOCOLS[flow.getProtocol()], flow.getStream(), len(src)))
+				index_file.write(src + dst)
+				index_file.write(struct.pack('<HHddI', src_port, dst_port, flow.getFirstTimestamp(), flow.getLastTimestamp(), flow.getNumPackets()))
+				flow.getRecordOffsets().tofile(index_file)
+				flow.getFrameNumbers().tofile(index_file)
+
+		finally:
+			index_file.close()
+
+		os.replace(tmp_index_path, self.__index_path)
+
+	def __readIndex(self):
+		if not os.path.exists(self.__index_path):
+			return False
+
+		try:
+			index_file = open(self.__index_path, 'rb')
+			data = index_file.read()
+		finally:
+			index_file.close()
+
+		if data[:len(FlowIndex.INDEX_MAGIC)] != FlowIndex.INDEX_MAGIC:
+			return False
+
+		offset = len(FlowIndex.INDEX_MAGIC)
+		size, mtime, num_sections, num_flows = struct.unpack_from('<QqII', data, offset)
+		offset += struct.calcsize('<QqII')
+		if (size, mtime) != self.__makeKey():
+			return False
+
+		protocol_names = {}
+		for name, protocol in FlowIndex.PROTOCOLS.items():
+			protocol_names[protocol] = name
+
+		self.__sections = []
+		for i in range(num_sections):
+			start, byte_order, num_blocks = struct.unpack_from('<Q1sI', data, offset)
+			offset += struct.calcsize('<Q1sI')
+			blocks = []
+			for j in range(num_blocks):
+				blocks.append(struct.unpack_from('<QQ', data, offset))
+				offset += 16
+			num_interfaces = struct.unpack_from('<I', data, offset)[0]
+			offset += 4
+			interfaces = []
+			for j in range(num_interfaces):
+				interfaces.append(struct.unpack_from('<Hd', data, offset))
+				offset += struct.calcsize('<Hd')
+			self.__sections.append((start, blocks, interfaces, byte_order.decode()))
+
+		self.__flows = {}
+		for i in range(num_flows):
+			protocol, stream, address_length = struct.unpack_from('<BIB', data, offset)
+			offset += struct.calcsize('<BIB')
+			src = data[offset:offset + address_length]
+			dst = data[offset + address_length:offset + 2 * address_length]
+			offset += 2 * address_length
+			src_port, dst_port, first_timestamp, last_timestamp, num_packets = struct.unpack_from('<HHddI', data, offset)
+			offset += struct.calcsize('<HHddI')
+
+			record_offsets = array('Q')
+			record_offsets.frombytes(data[offset:offset + 8 * num_packets])
+			offset += 8 * num_packets
+			frame_numbers = array('Q')
+			frame_numbers.frombytes(data[offset:offset + 8 * num_packets])
+			offset += 8 * num_packets
+
+			flow = Flow(protocol_names[protocol], stream, src, dst, src_port, dst_port)
+			flow.setPackets(first_timestamp, last_timestamp, record_offsets, frame_numbers)
+			self.__flows[(flow.getProtocol(), stream)] = flow
+
+		return True
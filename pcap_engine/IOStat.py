@@ -0,0 +1,203 @@
+#Author: Conard James Faraon
+
+"""This counts the Uplink and Downlink packets and bytes of a pcap file for an IP address in bins of any width without tshark, like tshark io,stat
+with the filters ip.src == address && !(tcp.analysis.flags), ip.dst == address && !(tcp.analysis.flags), ip.src == address and ip.dst == address.
+The packets are read once into NumPy arrays and every bin width is counted from them with numpy.bincount.
+The TCP analysis flags are the ones tshark finds from the sequence numbers of every stream: retransmissions and out of order segments,
+lost segments, keep alives, zero windows, zero window probes, window updates, duplicate ACKs and ACKs of unseen segments.
+See official documentation for more details."""
+
+import socket
+import numpy as np
+from pcap_engine import PcapReader
+from pcap_engine import StreamTracker
+
+#columns of the bins, in the order of the tshark io,stat columns
+UL_PACKETS = 0
+UL_BYTES = 1
+DL_PACKETS = 2
+DL_BYTES = 3
+UL_ALL_PACKETS = 4
+UL_ALL_BYTES = 5
+DL_ALL_PACKETS = 6
+DL_ALL_BYTES = 7
+NUM_COLUMNS = 8
+
+#indices of the state of one side of a stream
+SIDE_NEXT_SEQ = 0
+SIDE_LAST_ACK = 1
+SIDE_WINDOW = 2
+
+SEQ_MASK = 0xffffffff
+SEQ_HALF = 0x80000000
+
+class IOStat:
+
+	def __init__(self, pcap_path, ip_address, verbose=False):
+		self.__pcap_path = pcap_path
+		self.__ip_address = ip_address
+		if ":" in ip_address:
+			self.__address = socket.inet_pton(socket.AF_INET6, ip_address)
+		else:
+			self.__address = socket.inet_pton(socket.AF_INET, ip_address)
+		self.__verbose = verbose
+		self.__duration = 0.0
+		self.__times = np.zeros(0, dtype=np.int64)
+		self.__lengths = np.zeros(0, dtype=np.int64)
+		self.__uplink = np.zeros(0, dtype=bool)
+		self.__downlink = np.zeros(0, dtype=bool)
+		self.__flagged = np.zeros(0, dtype=bool)
+
+	def analyze(self):
+		pcap_reader = PcapReader.PcapReader(self.__pcap_path).open()
+		stream_tracker = StreamTracker.StreamTracker()
+		#(stream, src address, src port) -> [next seq, last ack, window]
+		sides = {}
+		address = self.__address
+		first_timestamp = None
+		last_timestamp = 0.0
+		times = []
+		lengths = []
+		uplink = []
+		downlink = []
+		flagged = []
+
+		try:
+			buffer = pcap_reader.getBuffer()
+			decodeIP = PcapReader.decodeIP
+			decodePacket = PcapReader.decodePacket
+			for packet in pcap_reader.getPackets():
+				timestamp = packet[PcapReader.PACKET_TIMESTAMP]
+				if first_timestamp is None:
+					first_timestamp = timestamp
+					last_timestamp = timestamp
+				#the timestamps of a pcap file can go backwards
+				elif timestamp > last_timestamp:
+					last_timestamp = timestamp
+
+				link_type = packet[PcapReader.PACKET_LINK_TYPE]
+				data_start = packet[PcapReader.PACKET_DATA_START]
+				data_end = packet[PcapReader.PACKET_DATA_END]
+				decoded_ip = decodeIP(buffer, link_type, data_start, data_end)
+				if decoded_ip is None:
+					continue
+
+				isUplink = decoded_ip[PcapReader.IP_SRC] == address
+				isDownlink = decoded_ip[PcapReader.IP_DST] == address
+				if not isUplink and not isDownlink:
+					continue
+
+				isFlagged = False
+				if decoded_ip[PcapReader.IP_PROTOCOL] == PcapReader.PROTOCOL_TCP:
+					decoded = decodePacket(buffer, link_type, data_start, data_end)
+					if decoded is not None:
+						isFlagged = self.__analyzeTCP(buffer, decoded, stream_tracker, sides)
+
+				times.append(timestamp - first_timestamp)
+				lengths.append(packet[PcapReader.PACKET_ORIGINAL_LENGTH])
+				uplink.append(isUplink)
+				downlink.append(isDownlink)
+				flagged.append(isFlagged)
+
+		finally:
+			pcap_reader.close()
+
+		if first_timestamp is not None:
+			self.__duration = last_timestamp - first_timestamp
+		#whole nanoseconds, so a packet right on the edge of a bin is not put in the one before by the float division
+		self.__times = np.round(np.array(times, dtype=np.float64) * 1e9).astype(np.int64)
+		self.__lengths = np.array(lengths, dtype=np.int64)
+		self.__uplink = np.array(uplink, dtype=bool)
+		self.__downlink = np.array(downlink, dtype=bool)
+		self.__flagged = np.array(flagged, dtype=bool)
+
+		if self.__verbose:
+			print("Found ", len(self.__times), " packets of ", self.__ip_address, " in ", self.__pcap_path, ", ", int(self.__flagged.sum()), " with TCP analysis flags")
+
+		return self
+
+	def __analyzeTCP(self, buffer, decoded, stream_tracker, sides):
+		"""Whether tshark gives the TCP segment any tcp.analysis.flags, the state of its side of the stream is updated."""
+		protocol, stream = stream_tracker.getStream(buffer, decoded)
+		transport_offset = decoded[PcapReader.DECODED_TRANSPORT_OFFSET]
+		seq, ack, flags, header_length, window = PcapReader.decodeTCP(buffer, transport_offset)
+		src = (stream, decoded[PcapReader.DECODED_SRC], decoded[PcapReader.DECODED_SRC_PORT])
+		dst = (stream, decoded[PcapReader.DECODED_DST], decoded[PcapReader.DECODED_DST_PORT])
+
+		segment_length = max(0, decoded[PcapReader.DECODED_IP_END] - transport_offset - header_length)
+		control = flags & (PcapReader.TCP_SYN | PcapReader.TCP_FIN | PcapReader.TCP_RST)
+		isAck = flags & PcapReader.TCP_ACK
+
+		side = sides.get(src)
+		if side is None:
+			side = [None, None, None]
+			sides[src] = side
+		reverse_side = sides.get(dst)
+		next_seq = side[SIDE_NEXT_SEQ]
+
+		isFlagged = False
+		if next_seq is not None:
+			#zero window probe
+			if segment_length == 1 and seq == next_seq and reverse_side is not None and reverse_side[SIDE_WINDOW] == 0:
+				isFlagged = True
+			#lost segment, previous segment not captured
+			elif isAfter(seq, next_seq) and not flags & PcapReader.TCP_RST:
+				isFlagged = True
+			#keep alive
+			elif segment_length <= 1 and not control and seq == (next_seq - 1) & SEQ_MASK:
+				isFlagged = True
+			#retransmission or out of order
+			elif (segment_length > 0 or flags & (PcapReader.TCP_SYN | PcapReader.TCP_FIN)) and isAfter(next_seq, seq):
+				isFlagged = True
+			#window update or duplicate ACK
+			elif segment_length == 0 and not control and isAck and seq == next_seq and ack == side[SIDE_LAST_ACK]:
+				isFlagged = True
+
+		#zero window
+		if window == 0 and not control:
+			isFlagged = True
+
+		#ACKed unseen segment
+		if isAck and reverse_side is not None and reverse_side[SIDE_NEXT_SEQ] is not None and isAfter(ack, reverse_side[SIDE_NEXT_SEQ]):
+			isFlagged = True
+
+		#SYN and FIN take one sequence number each
+		end_seq = seq + segment_length
+		if flags & PcapReader.TCP_SYN:
+			end_seq += 1
+		if flags & PcapReader.TCP_FIN:
+			end_seq += 1
+		end_seq &= SEQ_MASK
+		if next_seq is None or isAfter(end_seq, next_seq):
+			side[SIDE_NEXT_SEQ] = end_seq
+		if isAck:
+			side[SIDE_LAST_ACK] = ack
+		side[SIDE_WINDOW] = window
+
+		return isFlagged
+
+	def getDuration(self):
+		"""Seconds from the first packet to the latest one."""
+		return self.__duration
+
+	def getBins(self, interval):
+		"""Packets and bytes of every interval from the first to the last packet, an int64 array of NUM_COLUMNS rows."""
+		interval_ns = int(round(interval * 1e9))
+		num_intervals = int(round(self.__duration * 1e9)) // interval_ns + 1
+		bins = np.minimum(self.__times // interval_ns, num_intervals - 1)
+		#the packets timestamped before the first packet are left out like tshark io,stat leaves them out
+		counted = self.__times >= 0
+
+		io_bins = np.zeros((NUM_COLUMNS, num_intervals), dtype=np.int64)
+		unflagged = ~self.__flagged & counted
+		for packets, selected in [(UL_PACKETS, self.__uplink & unflagged), (DL_PACKETS, self.__downlink & unflagged), (UL_ALL_PACKETS, self.__uplink & counted), (DL_ALL_PACKETS, self.__downlink & counted)]:
+			io_bins[packets] = np.bincount(bins[selected], minlength=num_intervals)
+			#the bytes column follows the packets column
+			io_bins[packets + 1] = np.bincount(bins[selected], weights=self.__lengths[selected], minlength=num_intervals).astype(np.int64)
+
+		return io_bins
+
+def isAfter(seq, other_seq):
+	"""Whether seq comes after other_seq in sequence number space, across the wrap."""
+	difference = (seq - other_seq) & SEQ_MASK
+	return 0 < difference < SEQ_HALF
@@ -0,0 +1,366 @@
+#Author: Conard James Faraon
+
+"""This reads pcap and pcapng files through mmap without tshark.
+See official documentation for more details."""
+
+import os
+import mmap
+import struct
+import bisect
+
+#file formats
+PCAP_MAGIC = 0xa1b2c3d4
+PCAP_MAGIC_NS = 0xa1b23c4d
+PCAPNG_SHB = 0x0a0d0d0a
+PCAPNG_BYTE_ORDER_MAGIC = 0x1a2b3c4d
+PCAPNG_IDB = 0x00000001
+PCAPNG_OPB = 0x00000002
+PCAPNG_SPB = 0x00000003
+PCAPNG_EPB = 0x00000006
+PCAPNG_IF_TSRESOL = 9
+PCAPNG_PACKET_BLOCKS = [PCAPNG_EPB, PCAPNG_OPB, PCAPNG_SPB]
+PCAP_HEADER_LENGTH = 24
+PCAP_RECORD_HEADER_LENGTH = 16
+
+#link types
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LOOP = 108
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+LINKTYPE_LINUX_SLL2 = 276
+RAW_LINKTYPES = [12, 14, LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6]
+
+#ethertypes
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86dd
+ETHERTYPE_VLANS = [0x8100, 0x88a8, 0x9100]
+
+#transport protocols
+PROTOCOL_TCP = 6
+PROTOCOL_UDP = 17
+IPV6_EXTENSION_HEADERS = [0, 43, 60]
+IPV6_FRAGMENT_HEADER = 44
+
+#tcp flags
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_PSH = 0x08
+TCP_ACK = 0x10
+
+#indices of a decoded packet
+DECODED_PROTOCOL = 0
+DECODED_SRC = 1
+DECODED_DST = 2
+DECODED_SRC_PORT = 3
+DECODED_DST_PORT = 4
+DECODED_TRANSPORT_OFFSET = 5
+DECODED_IP_END = 6
+
+#indices of a decoded ip header from decodeIP()
+IP_PROTOCOL = 0
+IP_SRC = 1
+IP_DST = 2
+IP_TRANSPORT_OFFSET = 3
+IP_END = 4
+IP_FRAGMENT = 5
+
+#indices of a packet from getPackets()
+PACKET_FRAME_NUMBER = 0
+PACKET_TIMESTAMP = 1
+PACKET_LINK_TYPE = 2
+PACKET_DATA_START = 3
+PACKET_DATA_END = 4
+PACKET_RECORD_START = 5
+PACKET_RECORD_END = 6
+PACKET_ORIGINAL_LENGTH = 7
+
+#indices of a pcapng section from getSections()
+SECTION_START = 0
+SECTION_BLOCKS = 1
+SECTION_INTERFACES = 2
+SECTION_BYTE_ORDER = 3
+
+class PcapReader:
+
+	def __init__(self, pcap_path):
+		self.__pcap_path = pcap_path
+		self.__file = None
+		self.__buffer = b''
+		self.__isPcapng = False
+		self.__byte_order = '<'
+		self.__sections = []
+
+	def open(self):
+		self.__file = open(self.__pcap_path, 'rb')
+		if os.fstat(self.__file.fileno()).st_size != 0:
+			self.__buffer = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if len(self.__buffer) < 4:
+			raise ValueError("Not a pcap or pcapng file = " + self.__pcap_path)
+
+		magic = struct.unpack_from('<I', self.__buffer, 0)[0]
+		if magic == PCAPNG_SHB:
+			self.__isPcapng = True
+		elif magic in [PCAP_MAGIC, PCAP_MAGIC_NS]:
+			self.__byte_order = '<'
+		elif struct.unpack_from('>I', self.__buffer, 0)[0] in [PCAP_MAGIC, PCAP_MAGIC_NS]:
+			self.__byte_order = '>'
+		else:
+			raise ValueError("Not a pcap or pcapng file = " + self.__pcap_path)
+
+		return self
+
+	def close(self):
+		if isinstance(self.__buffer, mmap.mmap):
+			self.__buffer.close()
+		self.__buffer = b''
+		if self.__file is not None:
+			self.__file.close()
+			self.__file = None
+
+	def getBuffer(self):
+		return self.__buffer
+
+	def isPcapng(self):
+		return self.__isPcapng
+
+	def getPcapHeader(self):
+		"""The global header of a pcap file."""
+		return self.__buffer[:PCAP_HEADER_LENGTH]
+
+	def getSectionNumber(self):
+		"""Counts the pcapng sections read so far."""
+		return len(self.__sections)
+
+	def getSectionBlocks(self):
+		"""(start, end) of the section header and interface blocks of the current pcapng section, in file order."""
+		if not self.__sections:
+			return []
+		return self.__sections[-1][SECTION_BLOCKS]
+
+	def getSections(self):
+		"""(start, blocks, interfaces, byte order) of every pcapng section read so far, interfaces are (link type, timestamp resolution)."""
+		return self.__sections
+
+	def setSections(self, sections):
+		"""Sections saved from an earlier pass, so that getPacketAt() works without reading the file from the start."""
+		self.__sections = sections
+
+	def getPacketAt(self, record_start, frame_number=0):
+		"""The packet of the pcap record or pcapng block at record_start, in the same form as getPackets()."""
+		buffer = self.__buffer
+		if not self.__isPcapng:
+			byte_order = self.__byte_order
+			magic, major, minor, zone, sigfigs, snaplen, link_type = struct.unpack_from(byte_order + 'IHHiIII', buffer, 0)
+			resolution = 1000000000.0 if magic == PCAP_MAGIC_NS else 1000000.0
+			seconds, fraction, captured_length, original_length = struct.unpack_from(byte_order + 'IIII', buffer, record_start)
+			data_start = record_start + PCAP_RECORD_HEADER_LENGTH
+			return (frame_number, seconds + fraction / resolution, link_type & 0x0fffffff, data_start, data_start + captured_length, record_start, data_start + captured_length, original_length)
+
+		section = self.__sections[bisect.bisect_right([section[SECTION_START] for section in self.__sections], record_start) - 1]
+		return self.__parsePacketBlock(buffer, section[SECTION_BYTE_ORDER], record_start, section[SECTION_INTERFACES], frame_number)
+
+	def getPackets(self):
+		"""Yields (frame number, timestamp, link type, data start, data end, record start, record end, original length).
+		Offsets point into getBuffer(), the record spans the whole pcap record or pcapng block."""
+		if self.__isPcapng:
+			return self.__getPcapngPackets()
+		return self.__getPcapPackets()
+
+	def __getPcapPackets(self):
+		buffer = self.__buffer
+		byte_order = self.__byte_order
+		magic, major, minor, zone, sigfigs, snaplen, link_type = struct.unpack_from(byte_order + 'IHHiIII', buffer, 0)
+		resolution = 1000000000.0 if magic == PCAP_MAGIC_NS else 1000000.0
+		link_type &= 0x0fffffff
+		record_header = struct.Struct(byte_order + 'IIII')
+
+		frame_number = 0
+		offset = PCAP_HEADER_LENGTH
+		size = len(buffer)
+		while offset + PCAP_RECORD_HEADER_LENGTH <= size:
+			seconds, fraction, captured_length, original_length = record_header.unpack_from(buffer, offset)
+			data_start = offset + PCAP_RECORD_HEADER_LENGTH
+			data_end = data_start + captured_length
+			if data_end > size:
+				break
+
+			frame_number += 1
+			yield (frame_number, seconds + fraction / resolution, link_type, data_start, data_end, offset, data_end, original_length)
+			offset = data_end
+
+	def __getPcapngPackets(self):
+		buffer = self.__buffer
+		size = len(buffer)
+		byte_order = '<'
+		self.__sections = []
+		interfaces = []
+
+		frame_number = 0
+		offset = 0
+		while offset + 12 <= size:
+			block_type = struct.unpack_from(byte_order + 'I', buffer, offset)[0]
+
+			if block_type == PCAPNG_SHB:
+				if struct.unpack_from('<I', buffer, offset + 8)[0] == PCAPNG_BYTE_ORDER_MAGIC:
+					byte_order = '<'
+				else:
+					byte_order = '>'
+
+			block_length = struct.unpack_from(byte_order + 'I', buffer, offset + 4)[0]
+			if block_length < 12 or offset + block_length > size:
+				break
+
+			if block_type == PCAPNG_SHB:
+				interfaces = []
+				self.__sections.append((offset, [(offset, offset + block_length)], interfaces, byte_order))
+
+			elif block_type == PCAPNG_IDB:
+				link_type = struct.unpack_from(byte_order + 'H', buffer, offset + 8)[0]
+				resolution = self.__getTimestampResolution(buffer, byte_order, offset + 16, offset + block_length - 4)
+				interfaces.append((link_type, resolution))
+				self.__sections[-1][SECTION_BLOCKS].append((offset, offset + block_length))
+
+			elif block_type in PCAPNG_PACKET_BLOCKS:
+				frame_number += 1
+				yield self.__parsePacketBlock(buffer, byte_order, offset, interfaces, frame_number)
+
+			offset += block_length
+
+	def __parsePacketBlock(self, buffer, byte_order, offset, interfaces, frame_number):
+		block_type, block_length = struct.unpack_from(byte_order + 'II', buffer, offset)
+
+		if block_type == PCAPNG_EPB:
+			interface_id, high, low, captured_length, original_length = struct.unpack_from(byte_order + 'IIIII', buffer, offset + 8)
+			data_start = offset + 28
+		elif block_type == PCAPNG_OPB:
+			interface_id, drops, high, low, captured_length, original_length = struct.unpack_from(byte_order + 'HHIIII', buffer, offset + 8)
+			data_start = offset + 28
+		else:
+			interface_id = high = low = 0
+			original_length = struct.unpack_from(byte_order + 'I', buffer, offset + 8)[0]
+			data_start = offset + 12
+			captured_length = min(original_length, block_length - 16)
+
+		link_type, resolution = interfaces[interface_id]
+		return (frame_number, ((high << 32) | low) / resolution, link_type, data_start, data_start + captured_length, offset, offset + block_length, original_length)
+
+	def __getTimestampResolution(self, buffer, byte_order, offset, end):
+		resolution = 1000000.0
+		while offset + 4 <= end:
+			code, length = struct.unpack_from(byte_order + 'HH', buffer, offset)
+			if code == 0:
+				break
+			if code == PCAPNG_IF_TSRESOL and length >= 1:
+				value = buffer[offset + 4]
+				if value & 0x80:
+					resolution = float(2 ** (value & 0x7f))
+				else:
+					resolution = float(10 ** value)
+			offset += 4 + ((length + 3) & ~3)
+
+		return resolution
+
+def decodePacket(buffer, link_type, start, end):
+	"""Finds the TCP or UDP header of a packet.
+	Returns (protocol, src address, dst address, src port, dst port, transport offset, end of ip payload) or None.
+	IP fragments return None, tshark only dissects the transport header of a reassembled packet."""
+	decoded_ip = decodeIP(buffer, link_type, start, end)
+	if decoded_ip is None or decoded_ip[IP_FRAGMENT]:
+		return None
+
+	protocol, src, dst, offset, ip_end, fragment = decoded_ip
+	if protocol == PROTOCOL_TCP:
+		if offset + 20 > end:
+			return None
+	elif protocol == PROTOCOL_UDP:
+		if offset + 8 > end:
+			return None
+	else:
+		return None
+
+	src_port = (buffer[offset] << 8) | buffer[offset + 1]
+	dst_port = (buffer[offset + 2] << 8) | buffer[offset + 3]
+	return (protocol, src, dst, src_port, dst_port, offset, ip_end)
+
+def decodeIP(buffer, link_type, start, end):
+	"""Finds the IP header of a packet.
+	Returns (protocol, src address, dst address, transport offset, end of ip payload, fragment) or None."""
+	if link_type == LINKTYPE_ETHERNET:
+		if end - start < 14:
+			return None
+		offset = start + 12
+		ethertype = (buffer[offset] << 8) | buffer[offset + 1]
+		offset += 2
+		while ethertype in ETHERTYPE_VLANS and offset + 4 <= end:
+			ethertype = (buffer[offset + 2] << 8) | buffer[offset + 3]
+			offset += 4
+
+	elif link_type == LINKTYPE_LINUX_SLL:
+		if end - start < 16:
+			return None
+		ethertype = (buffer[start + 14] << 8) | buffer[start + 15]
+		offset = start + 16
+
+	elif link_type == LINKTYPE_LINUX_SLL2:
+		if end - start < 20:
+			return None
+		ethertype = (buffer[start] << 8) | buffer[start + 1]
+		offset = start + 20
+
+	elif link_type in RAW_LINKTYPES or link_type == LINKTYPE_NULL or link_type == LINKTYPE_LOOP:
+		offset = start
+		if link_type == LINKTYPE_NULL or link_type == LINKTYPE_LOOP:
+			offset += 4
+		if offset >= end:
+			return None
+		version = buffer[offset] >> 4
+		if version == 4:
+			ethertype = ETHERTYPE_IPV4
+		elif version == 6:
+			ethertype = ETHERTYPE_IPV6
+		else:
+			return None
+
+	else:
+		return None
+
+	if ethertype == ETHERTYPE_IPV4:
+		if offset + 20 > end:
+			return None
+		header_length = (buffer[offset] & 0x0f) * 4
+		total_length = (buffer[offset + 2] << 8) | buffer[offset + 3]
+		fragment = (((buffer[offset + 6] & 0x3f) << 8) | buffer[offset + 7]) != 0
+		protocol = buffer[offset + 9]
+		src = bytes(buffer[offset + 12:offset + 16])
+		dst = bytes(buffer[offset + 16:offset + 20])
+		ip_end = min(offset + total_length, end)
+		offset += header_length
+
+	elif ethertype == ETHERTYPE_IPV6:
+		if offset + 40 > end:
+			return None
+		payload_length = (buffer[offset + 4] << 8) | buffer[offset + 5]
+		protocol = buffer[offset + 6]
+		src = bytes(buffer[offset + 8:offset + 24])
+		dst = bytes(buffer[offset + 24:offset + 40])
+		ip_end = min(offset + 40 + payload_length, end)
+		offset += 40
+		while protocol in IPV6_EXTENSION_HEADERS and offset + 8 <= end:
+			protocol = buffer[offset]
+			offset += (buffer[offset + 1] + 1) * 8
+		fragment = protocol == IPV6_FRAGMENT_HEADER
+
+	else:
+		return None
+
+	return (protocol, src, dst, offset, ip_end, fragment)
+
+def decodeTCP(buffer, offset):
+	"""Returns (seq, ack, flags, header length, window) of the TCP header at offset."""
+	seq, ack, data_offset, flags, window = struct.unpack_from('>IIBBH', buffer, offset + 4)
+	return (seq, ack, flags, (data_offset >> 4) * 4, window)
@@ -0,0 +1,85 @@
+#Author: Conard James Faraon
+
+"""This writes the packets of groups of TCP or UDP streams from a large pcap file into smaller pcap files.
+The streams are found through the flow index, so the large pcap file is dissected once no matter how many groups or stream lists use it.
+Every output is then written on its own, the records of its streams are read at their offsets in the flow index instead of scanning the large pcap file again.
+The smaller files keep the format of the large one, pcap or pcapng.
+See official documentation for more details."""
+
+import bisect
+from pcap_engine import PcapReader
+from pcap_engine import FlowIndex
+
+class PcapSplitter:
+
+	def __init__(self, pcap_path, verbose=False):
+		self.__pcap_path = pcap_path
+		self.__verbose = verbose
+		self.__outputs = []
+
+	def addOutput(self, output_path, protocol, streams):
+		"""Packets of the given streams ("tcp" or "udp" stream numbers as in tshark) go to output_path."""
+		self.__outputs.append((output_path, protocol, streams))
+
+	def split(self):
+		"""Returns the number of packets written into each output, in the order they were added."""
+		print("Splitting ", self.__pcap_path, " into ", len(self.__outputs), " pcap files.")
+		flow_index = FlowIndex.FlowIndex(self.__pcap_path, self.__verbose).load()
+		pcap_reader = flow_index.openPcap()
+		num_packets = []
+
+		try:
+			for output_path, protocol, streams in self.__outputs:
+				flows = []
+				for stream in streams:
+					flow = flow_index.getFlow(protocol, stream)
+					if flow is not None and flow not in flows:
+						flows.append(flow)
+
+				num_packets.append(self.__writeOutput(pcap_reader, flow_index, output_path, flows))
+
+				if self.__verbose:
+					print("Wrote ", num_packets[-1], " packets into ", output_path)
+
+		finally:
+			pcap_reader.close()
+
+		return num_packets
+
+	def __writeOutput(self, pcap_reader, flow_index, output_path, flows):
+		buffer = pcap_reader.getBuffer()
+		sections = pcap_reader.getSections()
+		section_starts = [section[PcapReader.SECTION_START] for section in sections]
+		num_packets = 0
+
+		try:
+			output_file = open(output_path, 'wb')
+			if not pcap_reader.isPcapng():
+				output_file.write(pcap_reader.getPcapHeader())
+
+			written_section = -1
+			for packet in flow_index.getPackets(pcap_reader, flows):
+				record_start = packet[PcapReader.PACKET_RECORD_START]
+
+				#pcapng packets need the section and interface blocks they belong to
+				if pcap_reader.isPcapng():
+					section = bisect.bisect_right(section_starts, record_start) - 1
+					if section != written_section:
+						self.__writeSectionBlocks(buffer, output_file, sections[section])
+						written_section = section
+
+				output_file.write(buffer[record_start:packet[PcapReader.PACKET_RECORD_END]])
+				num_packets += 1
+
+			#tshark writes the file header even when nothing matches
+			if pcap_reader.isPcapng() and written_section == -1 and sections:
+				self.__writeSectionBlocks(buffer, output_file, sections[0])
+
+		finally:
+			output_file.close()
+
+		return num_packets
+
+	def __writeSectionBlocks(self, buffer, output_file, section):
+		for start, end in section[PcapReader.SECTION_BLOCKS]:
+			output_file.write(buffer[start:end])
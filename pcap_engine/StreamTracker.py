@@ -0,0 +1,51 @@
+#Author: Conard James Faraon
+
+"""This numbers TCP and UDP conversations in the order tshark assigns tcp.stream and udp.stream.
+See official documentation for more details."""
+
+from pcap_engine import PcapReader
+
+class StreamTracker:
+
+	def __init__(self):
+		self.__tcp_streams = {}
+		self.__udp_streams = {}
+		self.__num_tcp_streams = 0
+		self.__num_udp_streams = 0
+
+	def getStream(self, buffer, decoded):
+		"""Returns (protocol, stream number) of a decoded packet, protocol is "tcp" or "udp"."""
+		protocol = decoded[PcapReader.DECODED_PROTOCOL]
+		src = (decoded[PcapReader.DECODED_SRC], decoded[PcapReader.DECODED_SRC_PORT])
+		dst = (decoded[PcapReader.DECODED_DST], decoded[PcapReader.DECODED_DST_PORT])
+		if src < dst:
+			key = (src, dst)
+		else:
+			key = (dst, src)
+
+		if protocol == PcapReader.PROTOCOL_UDP:
+			stream = self.__udp_streams.get(key)
+			if stream is None:
+				stream = self.__num_udp_streams
+				self.__num_udp_streams += 1
+				self.__udp_streams[key] = stream
+			return ("udp", stream)
+
+		seq, ack, flags, header_length, window = PcapReader.decodeTCP(buffer, decoded[PcapReader.DECODED_TRANSPORT_OFFSET])
+		conversation = self.__tcp_streams.get(key)
+
+		#a new SYN whose sequence number differs from the one already seen from that side reuses the ports for a new stream
+		if conversation is not None and flags & PcapReader.TCP_SYN and not flags & PcapReader.TCP_ACK:
+			base_seq = conversation[1].get(src)
+			if base_seq is not None and base_seq != seq:
+				conversation = None
+
+		if conversation is None:
+			conversation = (self.__num_tcp_streams, {})
+			self.__num_tcp_streams += 1
+			self.__tcp_streams[key] = conversation
+
+		if src not in conversation[1]:
+			conversation[1][src] = seq
+
+		return ("tcp", conversation[0])
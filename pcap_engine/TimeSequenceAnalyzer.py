@@ -0,0 +1,248 @@
+#Author: Conard James Faraon
+
+"""This finds the time sequence graph of both directions of every TCP connection of a pcap file without tcptrace.
+The directions are named like tcptrace names them, a2b and b2a for the first connection, c2d and d2c for the next one and so on,
+a being the side of the first packet of the connection.
+Every direction keeps its data segments, the retransmitted ones marked, the ACK line and the advertised window line of the other side,
+the SACK blocks of the other side and its SYN, FIN and RST packets as NumPy arrays.
+Times are seconds since the first packet of the pcap file and sequence numbers are relative to the first one of the direction, across the wrap.
+See official documentation for more details."""
+
+import numpy as np
+from pcap_engine import PcapReader
+from pcap_engine import StreamTracker
+
+#arrays of a time sequence
+SEGMENT_TIMES = "segment_times"
+SEGMENT_STARTS = "segment_starts"
+SEGMENT_ENDS = "segment_ends"
+SEGMENT_RETRANSMITS = "segment_retransmits"
+ACK_TIMES = "ack_times"
+ACKS = "acks"
+WINDOWS = "windows" #the highest sequence number the other side allows, ack + scaled window
+SACK_TIMES = "sack_times"
+SACK_STARTS = "sack_starts"
+SACK_ENDS = "sack_ends"
+SYN_TIMES = "syn_times"
+SYN_SEQS = "syn_seqs"
+FIN_TIMES = "fin_times"
+FIN_SEQS = "fin_seqs"
+RST_TIMES = "rst_times"
+RST_SEQS = "rst_seqs"
+
+#the arrays of each kind of event, the first one holds the times
+EVENTS = [(SEGMENT_TIMES, SEGMENT_STARTS, SEGMENT_ENDS, SEGMENT_RETRANSMITS), (ACK_TIMES, ACKS, WINDOWS), (SACK_TIMES, SACK_STARTS, SACK_ENDS),
+	(SYN_TIMES, SYN_SEQS), (FIN_TIMES, FIN_SEQS), (RST_TIMES, RST_SEQS)]
+EVENT_SEGMENTS = 0
+EVENT_ACKS = 1
+EVENT_SACKS = 2
+EVENT_SYNS = 3
+EVENT_FINS = 4
+EVENT_RSTS = 5
+
+#indices of the state of one direction
+DIRECTION_NAME = 0
+DIRECTION_TITLE = 1
+DIRECTION_BASE_SEQ = 2
+DIRECTION_HIGHEST_SEQ = 3
+DIRECTION_WINDOW_SCALE = 4
+DIRECTION_EVENTS = 5
+
+#tcp options
+TCP_OPTION_END = 0
+TCP_OPTION_NOP = 1
+TCP_OPTION_WINDOW_SCALE = 3
+TCP_OPTION_SACK = 5
+
+SEQ_MASK = 0xffffffff
+SEQ_HALF = 0x80000000
+
+class TimeSequenceAnalyzer:
+
+	def __init__(self, pcap_path, verbose=False):
+		self.__pcap_path = pcap_path
+		self.__verbose = verbose
+		self.__time_sequences = []
+
+	def analyze(self):
+		pcap_reader = PcapReader.PcapReader(self.__pcap_path).open()
+		stream_tracker = StreamTracker.StreamTracker()
+		#(stream, src address, src port) -> state of the direction, in the order the directions are found
+		directions = {}
+		first_timestamp = None
+
+		try:
+			buffer = pcap_reader.getBuffer()
+			decodePacket = PcapReader.decodePacket
+			for packet in pcap_reader.getPackets():
+				timestamp = packet[PcapReader.PACKET_TIMESTAMP]
+				if first_timestamp is None:
+					first_timestamp = timestamp
+
+				decoded = decodePacket(buffer, packet[PcapReader.PACKET_LINK_TYPE], packet[PcapReader.PACKET_DATA_START], packet[PcapReader.PACKET_DATA_END])
+				if decoded is None or decoded[PcapReader.DECODED_PROTOCOL] != PcapReader.PROTOCOL_TCP:
+					continue
+
+				protocol, stream = stream_tracker.getStream(buffer, decoded)
+				transport_offset = decoded[PcapReader.DECODED_TRANSPORT_OFFSET]
+				seq, ack, flags, header_length, window = PcapReader.decodeTCP(buffer, transport_offset)
+				src = (stream, decoded[PcapReader.DECODED_SRC], decoded[PcapReader.DECODED_SRC_PORT])
+				dst = (stream, decoded[PcapReader.DECODED_DST], decoded[PcapReader.DECODED_DST_PORT])
+
+				if src not in directions:
+					self.__addConnection(directions, stream, decoded, seq)
+				direction = directions[src]
+				reverse_direction = directions[dst]
+				time = round(timestamp - first_timestamp, 9)
+				window_scale, sack_blocks = parseOptions(buffer, transport_offset + 20, min(transport_offset + header_length, decoded[PcapReader.DECODED_IP_END]))
+
+				#the window scale of a side is only used if both SYNs carry one
+				if flags & PcapReader.TCP_SYN:
+					direction[DIRECTION_WINDOW_SCALE] = window_scale
+
+				self.__addSegment(direction, time, seq, flags, max(0, decoded[PcapReader.DECODED_IP_END] - transport_offset - header_length))
+
+				if flags & PcapReader.TCP_ACK and reverse_direction[DIRECTION_BASE_SEQ] is not None:
+					self.__addAck(reverse_direction, direction, time, ack, window, flags, sack_blocks)
+
+		finally:
+			pcap_reader.close()
+
+		self.__time_sequences = []
+		for direction in sorted(directions.values(), key=lambda direction: direction[DIRECTION_NAME][1]):
+			arrays = {}
+			for event, columns in zip(EVENTS, direction[DIRECTION_EVENTS]):
+				for name, column in zip(event, columns):
+					if name == SEGMENT_RETRANSMITS:
+						arrays[name] = np.array(column, dtype=bool)
+					elif name in (SEGMENT_TIMES, ACK_TIMES, SACK_TIMES, SYN_TIMES, FIN_TIMES, RST_TIMES):
+						arrays[name] = np.array(column, dtype=np.float64)
+					else:
+						arrays[name] = np.array(column, dtype=np.int64)
+			self.__time_sequences.append((direction[DIRECTION_NAME][0], direction[DIRECTION_TITLE], arrays))
+
+		if self.__verbose:
+			for name, title, arrays in self.__time_sequences:
+				print(name, title, ": ", len(arrays[SEGMENT_TIMES]), " segments, ", int(arrays[SEGMENT_RETRANSMITS].sum()), " retransmitted, ", len(arrays[ACK_TIMES]), " ACKs, ", len(arrays[SACK_TIMES]), " SACK blocks")
+
+		return self
+
+	def __addConnection(self, directions, stream, decoded, seq):
+		"""Both directions of a new connection, the side of its first packet is a."""
+		a = (decoded[PcapReader.DECODED_SRC], decoded[PcapReader.DECODED_SRC_PORT])
+		b = (decoded[PcapReader.DECODED_DST], decoded[PcapReader.DECODED_DST_PORT])
+		a_name = getHostName(2 * stream)
+		b_name = getHostName(2 * stream + 1)
+		for src, dst, src_name, dst_name, order in [(a, b, a_name, b_name, 2 * stream), (b, a, b_name, a_name, 2 * stream + 1)]:
+			title = formatAddress(src) + "_==>_" + formatAddress(dst) + " (time sequence graph)"
+			events = [[[] for name in event] for event in EVENTS]
+			directions[(stream,) + src] = [(src_name + "2" + dst_name, order), title, None, None, None, events]
+		directions[(stream,) + a][DIRECTION_BASE_SEQ] = seq
+
+	def __addSegment(self, direction, time, seq, flags, segment_length):
+		base_seq = direction[DIRECTION_BASE_SEQ]
+		if base_seq is None:
+			base_seq = seq
+			direction[DIRECTION_BASE_SEQ] = seq
+		start = unwrap(seq, base_seq, direction[DIRECTION_HIGHEST_SEQ])
+		events = direction[DIRECTION_EVENTS]
+
+		if flags & PcapReader.TCP_SYN:
+			events[EVENT_SYNS][0].append(time)
+			events[EVENT_SYNS][1].append(start)
+			start += 1
+		end = start + segment_length
+
+		if segment_length > 0:
+			highest_seq = direction[DIRECTION_HIGHEST_SEQ]
+			events[EVENT_SEGMENTS][0].append(time)
+			events[EVENT_SEGMENTS][1].append(start)
+			events[EVENT_SEGMENTS][2].append(end)
+			events[EVENT_SEGMENTS][3].append(highest_seq is not None and start < highest_seq)
+
+		if flags & PcapReader.TCP_FIN:
+			events[EVENT_FINS][0].append(time)
+			events[EVENT_FINS][1].append(end)
+			end += 1
+		if flags & PcapReader.TCP_RST:
+			events[EVENT_RSTS][0].append(time)
+			events[EVENT_RSTS][1].append(start)
+
+		if direction[DIRECTION_HIGHEST_SEQ] is None or end > direction[DIRECTION_HIGHEST_SEQ]:
+			direction[DIRECTION_HIGHEST_SEQ] = end
+
+	def __addAck(self, acked_direction, direction, time, ack, window, flags, sack_blocks):
+		"""The ACK, window and SACK blocks direction sends about the data of acked_direction."""
+		base_seq = acked_direction[DIRECTION_BASE_SEQ]
+		reference = acked_direction[DIRECTION_HIGHEST_SEQ]
+		acked = unwrap(ack, base_seq, reference)
+		events = acked_direction[DIRECTION_EVENTS]
+
+		#the window of a SYN is never scaled
+		window_scale = 0
+		if not flags & PcapReader.TCP_SYN and direction[DIRECTION_WINDOW_SCALE] is not None and acked_direction[DIRECTION_WINDOW_SCALE] is not None:
+			window_scale = direction[DIRECTION_WINDOW_SCALE]
+
+		events[EVENT_ACKS][0].append(time)
+		events[EVENT_ACKS][1].append(acked)
+		events[EVENT_ACKS][2].append(acked + (window << window_scale))
+
+		for left, right in sack_blocks:
+			events[EVENT_SACKS][0].append(time)
+			events[EVENT_SACKS][1].append(unwrap(left, base_seq, reference))
+			events[EVENT_SACKS][2].append(unwrap(right, base_seq, reference))
+
+	def getTimeSequences(self):
+		"""(name, title, {array name: array}) of every direction of every connection, a2b, b2a, c2d, d2c..."""
+		return self.__time_sequences
+
+def unwrap(seq, base_seq, reference):
+	"""seq relative to base_seq, the one closest to reference across the wrap."""
+	relative = (seq - base_seq) & SEQ_MASK
+	if reference is None:
+		reference = 0
+	#the sequence numbers of a direction stay within half the sequence space of the highest one
+	wraps = (reference - relative + SEQ_HALF) // (SEQ_MASK + 1)
+	return relative + wraps * (SEQ_MASK + 1)
+
+def parseOptions(buffer, offset, end):
+	"""(window scale or None, [(left edge, right edge)] of the SACK blocks) of the TCP options from offset to end."""
+	window_scale = None
+	sack_blocks = []
+	while offset < end:
+		kind = buffer[offset]
+		if kind == TCP_OPTION_END:
+			break
+		if kind == TCP_OPTION_NOP:
+			offset += 1
+			continue
+		if offset + 1 >= end:
+			break
+		length = buffer[offset + 1]
+		if length < 2 or offset + length > end:
+			break
+
+		if kind == TCP_OPTION_WINDOW_SCALE and length == 3:
+			window_scale = min(buffer[offset + 2], 14)
+		elif kind == TCP_OPTION_SACK:
+			for block in range(offset + 2, offset + length - 7, 8):
+				sack_blocks.append(((buffer[block] << 24) | (buffer[block + 1] << 16) | (buffer[block + 2] << 8) | buffer[block + 3],
+					(buffer[block + 4] << 24) | (buffer[block + 5] << 16) | (buffer[block + 6] << 8) | buffer[block + 7]))
+		offset += length
+
+	return window_scale, sack_blocks
+
+def getHostName(index):
+	"""a, b, ..., z, aa, ab, ... like the host names of tcptrace."""
+	name = ""
+	index += 1
+	while index > 0:
+		index, letter = divmod(index - 1, 26)
+		name = chr(ord('a') + letter) + name
+	return name
+
+def formatAddress(address):
+	ip_address, port = address
+	if len(ip_address) == 4:
+		return ".".join([str(byte) for byte in ip_address]) + ":" + str(port)
+	return ":".join([ip_address[i:i + 2].hex() for i in range(0, 16, 2)]) + "." + str(port)
@@ -0,0 +1,84 @@
+#Author: Conard James Faraon
+
+"""This finds the test a stream of a pcap file belongs to from the FAILED and PASSED reports of find_test_results.py.
+Both reports are read once, their start times are converted to unix time and sorted per driver kit, so every lookup is a binary search.
+See official documentation for more details."""
+
+import csv
+import bisect
+from time_engine import UnixTime
+
+#UTC MATCHER indices
+UTC_TIME = 0
+TEST = 1
+TEST_CYCLE_ID = 2
+PATH = 3
+
+class UTCMatcher:
+
+	MAX_TIME_DIFFERENCE = 5
+	REPORT_RESULTS = ["FAILED", "PASSED"]
+	#driver kit id in the test path, driver kit id in the pcap file name
+	DRIVER_KITS = [("A-1", "A_Kit01"), ("A-2", "A_Kit02")]
+
+	def __init__(self, market, verbose=False):
+		self.__market = market
+		self.__verbose = verbose
+		self.__reports = []
+
+	def getReportPath(self, test_result):
+		return self.__market + "_UTC_Matcher/" + self.__market + "_" + test_result + "_Report.csv"
+
+	def load(self):
+		"""Reads the reports in the order they are searched, FAILED first."""
+		self.__reports = []
+		for test_result in UTCMatcher.REPORT_RESULTS:
+			kits = {}
+			for kit_id, pcap_kit_id in UTCMatcher.DRIVER_KITS:
+				kits[kit_id] = []
+
+			try:
+				report_file = open(self.getReportPath(test_result), 'r')
+				rows = [row for row in csv.reader(report_file) if len(row) > PATH]
+			finally:
+				report_file.close()
+
+			#tests are compared to the second
+			unix_times = UnixTime.datesToUnixSeconds([row[UTC_TIME] for row in rows])
+			for order in range(len(rows)):
+				for kit_id, pcap_kit_id in UTCMatcher.DRIVER_KITS:
+					if kit_id in rows[order][PATH]:
+						kits[kit_id].append((float(unix_times[order]), order, rows[order]))
+
+			for kit_id in kits:
+				kits[kit_id].sort(key=lambda test: test[:2])
+				kits[kit_id] = ([test[0] for test in kits[kit_id]], kits[kit_id])
+
+			self.__reports.append((test_result, kits))
+
+			if self.__verbose:
+				print("Loaded ", len(rows), " tests from ", self.getReportPath(test_result))
+
+		return self
+
+	def findTest(self, unix_time, pcap_name):
+		"""Returns (test result, report row, unix time of the test) of the first test of the reports that started less than
+		MAX_TIME_DIFFERENCE seconds from unix_time on the driver kit of pcap_name, or None."""
+		for test_result, kits in self.__reports:
+			found = None
+			for kit_id, pcap_kit_id in UTCMatcher.DRIVER_KITS:
+				if pcap_kit_id not in pcap_name:
+					continue
+
+				times, tests = kits[kit_id]
+				first = bisect.bisect_right(times, unix_time - UTCMatcher.MAX_TIME_DIFFERENCE)
+				last = bisect.bisect_left(times, unix_time + UTCMatcher.MAX_TIME_DIFFERENCE)
+				for test in tests[first:last]:
+					#a report row is found in file order, not in time order
+					if abs(unix_time - test[0]) < UTCMatcher.MAX_TIME_DIFFERENCE and (found is None or test[1] < found[1]):
+						found = test
+
+			if found is not None:
+				return (test_result, found[2], found[0])
+
+		return None
@@ -0,0 +1,111 @@
+#Author: Conard James Faraon
+
+"""This records a fingerprint of the inputs of every step of the data processing, so that a step whose inputs did not change and whose outputs still exist is skipped.
+A fingerprint covers the size, mtime and a hash of every input file (pcap files, root csv file, scripts) and values such as tshark filters.
+The manifest is an append-only csv file, so steps running in different processes can record into it at the same time.
+See official documentation for more details."""
+
+import os
+import io
+import csv
+import hashlib
+
+class BuildManifest:
+
+	HASH_BYTES = 1048576 #hash the first and last MiB of large files
+
+	def __init__(self, manifest_path, verbose=False, force=False):
+		self.__manifest_path = manifest_path
+		self.__verbose = verbose
+		self.__force = force
+		self.__steps = {}
+
+	def load(self):
+		"""The last record of a step wins."""
+		self.__steps = {}
+		if os.path.exists(self.__manifest_path):
+			try:
+				manifest_file = open(self.__manifest_path, 'r')
+				for row in csv.reader(manifest_file):
+					if len(row) >= 2:
+						self.__steps[row[0]] = (row[1], row[2:])
+			finally:
+				manifest_file.close()
+
+		return self
+
+	def compact(self):
+		"""Rewrites the manifest with only the last record of every step.
+		Only call this while no other process records into the manifest."""
+		tmp_manifest_path = self.__manifest_path + "." + str(os.getpid())
+		try:
+			manifest_file = open(tmp_manifest_path, 'w')
+			manifest_writer = csv.writer(manifest_file)
+			for step, (fingerprint, outputs) in self.__steps.items():
+				manifest_writer.writerow([step, fingerprint] + outputs)
+		finally:
+			manifest_file.close()
+
+		os.replace(tmp_manifest_path, self.__manifest_path)
+
+	def makeFingerprint(self, files, values=None):
+		sha1 = hashlib.sha1()
+		for path in files:
+			sha1.update(path.encode())
+			sha1.update(fingerprintFile(path).encode())
+
+		if values is not None:
+			for value in values:
+				sha1.update(str(value).encode())
+				sha1.update(b'\0')
+
+		return sha1.hexdigest()
+
+	def isUpToDate(self, step, fingerprint):
+		if self.__force or step not in self.__steps:
+			return False
+
+		saved_fingerprint, outputs = self.__steps[step]
+		if saved_fingerprint != fingerprint:
+			return False
+
+		for output in outputs:
+			if not os.path.exists(output):
+				return False
+
+		if self.__verbose:
+			print("Up to date, skipping ", step)
+
+		return True
+
+	def record(self, step, fingerprint, outputs):
+		self.__steps[step] = (fingerprint, outputs)
+		try:
+			#one short write per record keeps appends from different processes whole
+			manifest_file = open(self.__manifest_path, 'a')
+			line = io.StringIO()
+			csv.writer(line).writerow([step, fingerprint] + outputs)
+			manifest_file.write(line.getvalue())
+		finally:
+			manifest_file.close()
+
+def fingerprintFile(path):
+	"""size, mtime and the hash of the first and last MiB of a file, or "missing"."""
+	if not os.path.exists(path):
+		return "missing"
+
+	stat = os.stat(path)
+	if os.path.isdir(path):
+		return "dir:" + str(stat.st_mtime_ns)
+
+	sha1 = hashlib.sha1()
+	try:
+		input_file = open(path, 'rb')
+		sha1.update(input_file.read(BuildManifest.HASH_BYTES))
+		if stat.st_size > BuildManifest.HASH_BYTES:
+			input_file.seek(max(BuildManifest.HASH_BYTES, stat.st_size - BuildManifest.HASH_BYTES))
+			sha1.update(input_file.read())
+	finally:
+		input_file.close()
+
+	return str(stat.st_size) + ":" + str(stat.st_mtime_ns) + ":" + sha1.hexdigest()
@@ -0,0 +1,166 @@
+#Author: Conard James Faraon
+
+"""This runs the scripts of the data processing as a graph of stages.
+A stage starts once every stage it depends on has completed, and as many stages run at the same time as the CPU and memory budget allows.
+A stage that lists its inputs and outputs is skipped when the build manifest shows its inputs did not change and none of its dependencies ran.
+See official documentation for more details."""
+
+import os
+import time
+import subprocess
+
+class Stage:
+
+	def __init__(self, name, cmd, dependencies=None, cpus=1, memory=1.0, inputs=None, outputs=None):
+		"""cmd is the argument list of the script, memory is in GB.
+		inputs is a list of paths, or a function returning one when the stage is ready, for inputs made by the stages it depends on.
+		A stage without outputs always runs."""
+		self.__name = name
+		self.__cmd = cmd
+		self.__dependencies = dependencies if dependencies is not None else []
+		self.__cpus = cpus
+		self.__memory = memory
+		self.__inputs = inputs if inputs is not None else []
+		self.__outputs = outputs if outputs is not None else []
+
+	def getName(self):
+		return self.__name
+
+	def getCmd(self):
+		return self.__cmd
+
+	def getDependencies(self):
+		return self.__dependencies
+
+	def getCpus(self):
+		return self.__cpus
+
+	def getMemory(self):
+		return self.__memory
+
+	def getInputs(self):
+		if callable(self.__inputs):
+			return self.__inputs()
+		return self.__inputs
+
+	def getOutputs(self):
+		return self.__outputs
+
+class PipelineScheduler:
+
+	DONE = "done"
+	UP_TO_DATE = "up to date"
+	FAILED = "failed"
+	SKIPPED = "skipped"
+	POLL_INTERVAL = 0.5
+	MEMORY_FRACTION = 0.8
+
+	def __init__(self, cpu_budget=None, memory_budget=None, verbose=False, build_manifest=None):
+		"""The budgets default to every CPU and 80% of the physical memory, memory is in GB."""
+		self.__cpu_budget = cpu_budget if cpu_budget is not None else (os.cpu_count() or 1)
+		self.__memory_budget = memory_budget if memory_budget is not None else getPhysicalMemory() * PipelineScheduler.MEMORY_FRACTION
+		self.__verbose = verbose
+		self.__build_manifest = build_manifest
+		self.__stages = []
+
+	def addStage(self, stage):
+		self.__stages.append(stage)
+
+	def run(self):
+		"""Returns the status of every stage: done, up to date, failed or skipped."""
+		print("Running ", len(self.__stages), " stages with a budget of ", self.__cpu_budget, " CPUs and ", round(self.__memory_budget, 1), " GB.\n")
+		names = [stage.getName() for stage in self.__stages]
+		pending = self.__stages[:]
+		running = []
+		status = {}
+		fingerprints = {}
+		used_cpus = 0
+		used_memory = 0.0
+
+		while pending or running:
+			#a stage whose dependency did not complete cannot run
+			for stage in pending[:]:
+				for dependency in stage.getDependencies():
+					if status.get(dependency) in [PipelineScheduler.FAILED, PipelineScheduler.SKIPPED]:
+						print("Skipping stage ", stage.getName(), " because ", dependency, " did not complete.")
+						status[stage.getName()] = PipelineScheduler.SKIPPED
+						pending.remove(stage)
+						break
+
+			for stage in pending[:]:
+				isReady = True
+				isDependencyRedone = False
+				for dependency in stage.getDependencies():
+					if dependency in names and status.get(dependency) not in [PipelineScheduler.DONE, PipelineScheduler.UP_TO_DATE]:
+						isReady = False
+					if status.get(dependency) == PipelineScheduler.DONE:
+						isDependencyRedone = True
+				if not isReady:
+					continue
+
+				#inputs are fingerprinted once, when the stage is first ready
+				if stage.getName() not in fingerprints:
+					fingerprints[stage.getName()] = self.__makeFingerprint(stage)
+				fingerprint = fingerprints[stage.getName()]
+				if fingerprint is not None and not isDependencyRedone and self.__build_manifest.isUpToDate(stage.getName(), fingerprint):
+					print("Stage ", stage.getName(), " is up to date.")
+					status[stage.getName()] = PipelineScheduler.UP_TO_DATE
+					pending.remove(stage)
+					continue
+
+				#a stage bigger than the whole budget still runs, but alone
+				cpus = min(stage.getCpus(), self.__cpu_budget)
+				memory = min(stage.getMemory(), self.__memory_budget)
+				if running and (used_cpus + cpus > self.__cpu_budget or used_memory + memory > self.__memory_budget):
+					continue
+
+				print("Starting stage ", stage.getName(), ": ", ' '.join(stage.getCmd()))
+				proc = subprocess.Popen(stage.getCmd())
+				running.append((proc, stage, time.time(), cpus, memory, fingerprint))
+				used_cpus += cpus
+				used_memory += memory
+				pending.remove(stage)
+
+			if not running:
+				for stage in pending:
+					print("Skipping stage ", stage.getName(), " because its dependencies can never complete.")
+					status[stage.getName()] = PipelineScheduler.SKIPPED
+				break
+
+			time.sleep(PipelineScheduler.POLL_INTERVAL)
+
+			for job in running[:]:
+				proc, stage, start, cpus, memory, fingerprint = job
+				if proc.poll() is None:
+					continue
+
+				if proc.returncode == 0:
+					status[stage.getName()] = PipelineScheduler.DONE
+					if fingerprint is not None:
+						self.__build_manifest.record(stage.getName(), fingerprint, stage.getOutputs())
+				else:
+					status[stage.getName()] = PipelineScheduler.FAILED
+					print("\n\n==================================================================================================")
+					print("Error in stage ", stage.getName(), ", exit code = ", proc.returncode)
+					print("==================================================================================================\n\n")
+
+				print("Stage ", stage.getName(), " ", status[stage.getName()], " Elapsed Time: ", (time.time() - start), " s")
+				running.remove(job)
+				used_cpus -= cpus
+				used_memory -= memory
+
+		return status
+
+	def __makeFingerprint(self, stage):
+		"""None if the stage always runs."""
+		if self.__build_manifest is None or not stage.getOutputs():
+			return None
+
+		return self.__build_manifest.makeFingerprint(stage.getInputs())
+
+def getPhysicalMemory():
+	"""Physical memory in GB, or infinity where the OS does not tell."""
+	try:
+		return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / (1024.0 ** 3)
+	except (AttributeError, ValueError, OSError):
+		return float("inf")
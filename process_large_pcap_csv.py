@@ -1,4 +1,4 @@
-#usage: python3 process_large_pcap_csv.py <Root file.csv> -v -g -p -d -s -u -i -t 
+#usage: python3 process_large_pcap_csv.py <Root file.csv> -v -g -p -d -s -u -i -t -c -S -P -F -j <number of jobs>
 #Author: Conard James B. Faraon
 
 """Process large pcap files and the main csv file.
@@ -10,6 +10,10 @@ import os
 import time
 import glob
 import csv
+import subprocess
+import multiprocessing
+import threading
+from pipeline_engine import BuildManifest
 
 #parse arguments here
 parser = argparse.ArgumentParser()
@@ -21,16 +25,21 @@ parser.add_argument("-s", "--secure_test", help="Lite Data Secure Test Filter.",
 parser.add_argument("-u", "--udp", help="UDP Echo Test.", action="store_true")
 parser.add_argument("-i", "--iog", help="IO Graph.", action="store_true")
 parser.add_argument("-t", "--tsg", help="Time Sequence Graph.", action="store_true")
+parser.add_argument("-c", "--combined", help="One tshark pass per pcap file for all the selected stream filters.", action="store_true")
+parser.add_argument("-S", "--skip_setup", help="Skips process_root_csv.py and find_test_results.py, their results already exist.", action="store_true")
+parser.add_argument("-P", "--skip_pcaps", help="Skips making stream lists and small pcap files, they already exist.", action="store_true")
+parser.add_argument("-F", "--force", help="Redoes every step, even the ones whose inputs did not change.", action="store_true")
+parser.add_argument("-j", "--jobs", help="Number of pcap files processed at the same time.", type=int, default=1)
 parser.add_argument("root_csv", help="Root Metrics CSV File.")
 args = parser.parse_args()
 
 #constants
 #commands for running other Python scripts
-CSV = "python3 process_root_csv.py -v " + args.root_csv
+CSV = "python3 process_root_csv.py -v -j " + str(args.jobs) + " " + args.root_csv
 RESULT_ARG = "python3 find_test_results.py -v " + args.root_csv[:-4]
 TO_PCAPS = "python3 process_stream_list.py -v "
-IO_GRAPH = "python3 io_graph.py -v "
-TS_GRAPH = "python3 tsg.py -v "
+IO_GRAPH = ["python3", "io_graph.py", "-v", "-j", str(args.jobs)]
+TS_GRAPH = ["python3", "tsg.py", "-v"]
 
 #tshark filters
 GET = "'(http.request.full_uri contains \"speedtestlg.iso\")'"
@@ -39,6 +48,21 @@ DATA_TEST = "'(http.request.uri.path contains \"/downloads/ldr_file.txt\")'"
 SECURE_TEST = "'(ssl.handshake.type == 1) && (ip.version == 4) && (ssl.record.length == 171)'"
 UDP = "'(udp) && (udp.port == 9005)'"
 
+#the same filters evaluated in Python on the fields of the combined tshark pass
+GET_URI = "speedtestlg.iso"
+POST_SEGMENT_DATA = b"POST /legacy_uploads/speedtest/"
+DATA_TEST_URI_PATH = "/downloads/ldr_file.txt"
+SECURE_TEST_HANDSHAKE_TYPE = "1"
+SECURE_TEST_IP_VERSION = "4"
+SECURE_TEST_RECORD_LENGTH = "171"
+UDP_PORT = "9005"
+
+#fields of the combined tshark pass, every stream list takes its own fields from these
+COMBINED_FIELDS = ["frame.number", "_ws.col.Time", "ip.src", "ip.dst", "tcp.srcport", "tcp.dstport", "tcp.stream",
+					"http.request.method", "http.request.uri", "udp.srcport", "udp.dstport", "udp.stream",
+					"http.request.full_uri", "tcp.segment_data", "http.request.uri.path",
+					"ssl.handshake.type", "ip.version", "ssl.record.length"]
+
 #arguments for csv processing
 DO_GET = 0
 DO_POST = 1
@@ -53,8 +77,29 @@ UDP_ECHO_TEST = "UDP_Echo_Test"
 UE = 0
 SERVER = 1
 
+STREAM_LIST_EXT = {DO_GET: "_DLStreamList.csv",
+					DO_POST: "_ULStreamList.csv",
+					DO_DATA_TEST: "_DataStreamList.csv",
+					DO_SECURE_TEST: "_SecureStreamList.csv",
+					DO_UDP: "_UdpStreamList.csv"}
+
+STREAM_LIST_FILTERS = {DO_GET: GET, DO_POST: POST, DO_DATA_TEST: DATA_TEST, DO_SECURE_TEST: SECURE_TEST, DO_UDP: UDP}
+
+TCP_STREAM_FIELDS = ["frame.number", "_ws.col.Time", "ip.src", "ip.dst", "tcp.srcport", "tcp.dstport", "tcp.stream"]
+STREAM_LIST_FIELDS = {DO_GET: TCP_STREAM_FIELDS + ["http.request.method", "http.request.uri"],
+						DO_POST: TCP_STREAM_FIELDS,
+						DO_DATA_TEST: TCP_STREAM_FIELDS + ["http.request.method", "http.request.uri"],
+						DO_SECURE_TEST: TCP_STREAM_FIELDS,
+						DO_UDP: ["frame.number", "_ws.col.Time", "ip.src", "ip.dst", "udp.srcport", "udp.dstport", "udp.stream"]}
+
 #paths
 PCAP_PATH = "pcaps"
+MANIFEST_EXT = "_Manifest.csv"
+UTC_REPORTS = [args.root_csv[:-4] + "_UTC_Matcher/" + args.root_csv[:-4] + "_PASSED_Report.csv",
+				args.root_csv[:-4] + "_UTC_Matcher/" + args.root_csv[:-4] + "_FAILED_Report.csv"]
+
+#fingerprints of the inputs of every step, a step is skipped when its inputs did not change and its outputs exist
+manifest = BuildManifest.BuildManifest(args.root_csv[:-4] + MANIFEST_EXT, args.verbose, args.force).load()
 
 def main():
 	start = time.time()
@@ -69,13 +114,19 @@ def main():
 		print("args.udp = ", args.udp)
 		print("args.iog = ", args.iog)
 		print("args.tsg = ", args.tsg)
+		print("args.combined = ", args.combined)
+		print("args.skip_setup = ", args.skip_setup)
+		print("args.skip_pcaps = ", args.skip_pcaps)
+		print("args.force = ", args.force)
+		print("args.jobs = ", args.jobs)
 		print()
 
-	#extract all different tests from the main csv file
-	setupRootCSV()
+	if not args.skip_setup:
+		#extract all different tests from the main csv file
+		isRootCSVRedone = setupRootCSV()
 
-	#generate reports of all the tests that passed and failed with network types: LTE, & Other
-	setupTestResult()
+		#generate reports of all the tests that passed and failed with network types: LTE, & Other
+		setupTestResult(isRootCSVRedone)
 
 	#generate the market folder
 	marketname = getMarketFolder(args.root_csv)
@@ -83,7 +134,14 @@ def main():
 	#get a list of all pcap files by walking the entire directory
 	pcap_list = getPcapFiles()
 
-	if args.get or args.post or args.data_test or args.secure_test or args.udp:
+	if args.skip_pcaps:
+		if args.verbose:
+			print("Skipping stream lists and small pcap files.\n")
+
+	elif (args.get or args.post or args.data_test or args.secure_test or args.udp) and args.jobs > 1:
+		processPcapFilesInParallel(marketname, pcap_list)
+
+	elif args.get or args.post or args.data_test or args.secure_test or args.udp:
 		for file in pcap_list:
 			if args.verbose:
 				print("\nProcessing the pcap file from the \"pcaps\" folder:")
@@ -92,6 +150,10 @@ def main():
 			#make the directory for the csv stream file
 			makeStreamDir(marketname, file)
 
+			if args.combined:
+				makeCombinedStreamCSV(marketname, file, getSelectedFilterTypes())
+				continue
+
 			#make csv stream file for Downlink Test
 			if args.get:
 				makeStreamCSV(marketname, file, DO_GET)
@@ -128,13 +190,24 @@ def main():
 	end = time.time()
 	print("process_large_pcap_csv.py Elapsed Time: " , (end - start), " s\n")
 
-#executes the script process_root_csv.py
+#executes the script process_root_csv.py, returns True if it ran
 def setupRootCSV():
-	os.system(CSV)
+	isRedone, fingerprint = isStepRedone("setup_root_csv", [args.root_csv, "process_root_csv.py"] + sorted(glob.glob("root_csv_engine/*.py")))
+	if isRedone and os.system(CSV) == 0:
+		manifest.record("setup_root_csv", fingerprint, [args.root_csv[:-4]])
+
+	return isRedone
 
-#executes the script find_test_results.py
-def setupTestResult():
-	os.system(RESULT_ARG)
+#executes the script find_test_results.py, the tests folder it reads has no fingerprint of its own
+def setupTestResult(isRootCSVRedone):
+	isRedone, fingerprint = isStepRedone("setup_test_result", [args.root_csv, "process_root_csv.py", "find_test_results.py"])
+	if (isRedone or isRootCSVRedone) and os.system(RESULT_ARG) == 0:
+		manifest.record("setup_test_result", fingerprint, UTC_REPORTS)
+
+#returns whether the step has to run and the fingerprint of its inputs to record once it succeeded
+def isStepRedone(step, inputs, values=None):
+	fingerprint = manifest.makeFingerprint(inputs, values)
+	return not manifest.isUpToDate(step, fingerprint), fingerprint
 
 def getMarketFolder(marketname):
 	if marketname.endswith('.csv'):
@@ -181,10 +254,148 @@ def makeStreamCSV(marketname, pcap, filter_type):
 			+ "-e frame.number -e _ws.col.Time -e ip.src -e ip.dst -e udp.srcport -e udp.dstport -e udp.stream  > "\
 			+ marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + "_UdpStreamList.csv"
 
+	stream_list_location = marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + STREAM_LIST_EXT[filter_type]
+	isRedone, fingerprint = isStepRedone(stream_list_location, [PCAP_PATH + "/" + pcap], [tshark_cmd])
+	if not isRedone:
+		return
+
 	if args.verbose:
 		print("tshark_cmd = ", tshark_cmd, "\n")
 
-	os.system(tshark_cmd)
+	if os.system(tshark_cmd) == 0:
+		manifest.record(stream_list_location, fingerprint, [stream_list_location])
+
+#every pcap file is handled by its own job, at most args.jobs pcap files are waiting or running at a time
+def processPcapFilesInParallel(marketname, pcap_list):
+	print("Processing ", len(pcap_list), " pcap files with ", args.jobs, " jobs.\n")
+	pending = threading.BoundedSemaphore(args.jobs)
+	results = []
+
+	#the scripts run main() when imported, so the workers have to be forked
+	pool = multiprocessing.get_context("fork").Pool(args.jobs)
+	try:
+		for file in pcap_list:
+			pending.acquire()
+			results.append(pool.apply_async(processPcapFile, (marketname, file), callback=lambda result: pending.release(), error_callback=lambda error: pending.release()))
+
+		for result in results:
+			file, elapsed = result.get()
+			print("Job for ", file, " Elapsed Time: ", elapsed, " s")
+
+	finally:
+		pool.close()
+		pool.join()
+
+def processPcapFile(marketname, file):
+	start = time.time()
+	if args.verbose:
+		print("\nProcessing the pcap file from the \"pcaps\" folder:")
+		print(file, "\n")
+
+	makeStreamDir(marketname, file)
+
+	if args.combined:
+		makeCombinedStreamCSV(marketname, file, getSelectedFilterTypes())
+	else:
+		for filter_type in getSelectedFilterTypes():
+			makeStreamCSV(marketname, file, filter_type)
+
+	processStreamToPcaps(marketname, file)
+
+	return file, time.time() - start
+
+def getSelectedFilterTypes():
+	filter_types = []
+	if args.get:
+		filter_types.append(DO_GET)
+	if args.post:
+		filter_types.append(DO_POST)
+	if args.data_test:
+		filter_types.append(DO_DATA_TEST)
+	if args.secure_test:
+		filter_types.append(DO_SECURE_TEST)
+	if args.udp:
+		filter_types.append(DO_UDP)
+
+	return filter_types
+
+#one tshark pass with the filters OR'd together, the rows are sorted into the stream list files here
+def makeCombinedStreamCSV(marketname, pcap, filter_types):
+	display_filter = " || ".join(["(" + STREAM_LIST_FILTERS[filter_type][1:-1] + ")" for filter_type in filter_types])
+	tshark_cmd = ["tshark", "-t", "ud", "-2", "-nn", "-r", PCAP_PATH + "/" + pcap, "-Y", display_filter, "-T", "fields", "-E", "separator=/t"]
+	for field in COMBINED_FIELDS:
+		tshark_cmd += ["-e", field]
+
+	#the rows are sorted into the stream lists by this script, so it is an input too
+	stream_list_locations = [marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + STREAM_LIST_EXT[filter_type] for filter_type in filter_types]
+	step = marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + "_CombinedStreamList"
+	isRedone, fingerprint = isStepRedone(step, [PCAP_PATH + "/" + pcap, "process_large_pcap_csv.py"], tshark_cmd)
+	if not isRedone:
+		return
+
+	if args.verbose:
+		print("tshark_cmd = ", ' '.join(tshark_cmd), "\n")
+
+	field_index = {}
+	for i in range(len(COMBINED_FIELDS)):
+		field_index[COMBINED_FIELDS[i]] = i
+
+	stream_list_files = {}
+	stream_list_indices = {}
+	try:
+		for filter_type, stream_list_location in zip(filter_types, stream_list_locations):
+			stream_list_files[filter_type] = open(stream_list_location, 'w')
+			stream_list_indices[filter_type] = [field_index[field] for field in STREAM_LIST_FIELDS[filter_type]]
+
+		tshark_proc = subprocess.Popen(tshark_cmd, stdout=subprocess.PIPE, universal_newlines=True)
+		for line in tshark_proc.stdout:
+			fields = line.rstrip('\n').split('\t')
+			if len(fields) != len(COMBINED_FIELDS):
+				continue
+
+			for filter_type in filter_types:
+				if matchesStreamFilter(filter_type, fields, field_index):
+					stream_list_files[filter_type].write(','.join([fields[i] for i in stream_list_indices[filter_type]]) + '\n')
+
+		tshark_proc.wait()
+
+	finally:
+		for stream_list_file in stream_list_files.values():
+			stream_list_file.close()
+
+	if tshark_proc.returncode == 0:
+		manifest.record(step, fingerprint, stream_list_locations)
+
+def matchesStreamFilter(filter_type, fields, field_index):
+	if filter_type == DO_GET:
+		return GET_URI in fields[field_index["http.request.full_uri"]]
+
+	elif filter_type == DO_POST:
+		return containsSegmentData(fields[field_index["tcp.segment_data"]], POST_SEGMENT_DATA)
+
+	elif filter_type == DO_DATA_TEST:
+		return DATA_TEST_URI_PATH in fields[field_index["http.request.uri.path"]]
+
+	elif filter_type == DO_SECURE_TEST:
+		return SECURE_TEST_HANDSHAKE_TYPE in fields[field_index["ssl.handshake.type"]].split(',')\
+			and SECURE_TEST_IP_VERSION in fields[field_index["ip.version"]].split(',')\
+			and SECURE_TEST_RECORD_LENGTH in fields[field_index["ssl.record.length"]].split(',')
+
+	elif filter_type == DO_UDP:
+		return UDP_PORT in fields[field_index["udp.srcport"]].split(',') + fields[field_index["udp.dstport"]].split(',')
+
+	return False
+
+#tshark prints bytes as hex, with or without ':' between them depending on its version
+def containsSegmentData(segment_data, pattern):
+	for hex_data in segment_data.split(','):
+		try:
+			if pattern in bytes.fromhex(hex_data.replace(':', '')):
+				return True
+		except ValueError:
+			pass
+
+	return False
 
 def getPcapFiles():
 	tmp = []
@@ -200,39 +411,61 @@ def processStreamToPcaps(marketname, pcap):
 	if args.post:
 		ul_file = marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + "_ULStreamList.csv"
 		if os.path.exists(ul_file):
-			os.system(TO_PCAPS + ul_file + " -p")
+			splitStreamList(pcap, ul_file, "-p")
 
 	if args.get:
 		dl_file = marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + "_DLStreamList.csv"
 		if os.path.exists(dl_file):
-			os.system(TO_PCAPS + dl_file + " -g")
+			splitStreamList(pcap, dl_file, "-g")
 
 	if args.data_test:
 		dt_file = marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + "_DataStreamList.csv"
 		if os.path.exists(dt_file):
-			os.system(TO_PCAPS + dt_file + " -d")
+			splitStreamList(pcap, dt_file, "-d")
 
 	if args.secure_test:
 		st_file = marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + "_SecureStreamList.csv"
 		if os.path.exists(st_file):
-			os.system(TO_PCAPS + st_file + " -s")
+			splitStreamList(pcap, st_file, "-s")
 
 	if args.udp: #TODO
 		udp_file = marketname + "/" + pcap.strip(".pcap") + "/" + pcap.strip(".pcap") + "_UdpStreamList.csv"
 		if os.path.exists(udp_file): 
 			print("-u to be implemented for UDP Process Stream List")
-			#os.system(TO_PCAPS + udp_file + " -u")
+			#splitStreamList(pcap, udp_file, "-u")
+
+#the small pcap files and their IP logs are listed in the _MATCH.txt log of the stream list
+def splitStreamList(pcap, stream_list, filter_flag):
+	inputs = [stream_list, PCAP_PATH + "/" + pcap, "process_stream_list.py"] + UTC_REPORTS + sorted(glob.glob("pcap_engine/*.py"))
+	isRedone, fingerprint = isStepRedone(stream_list + ":split", inputs, [filter_flag])
+	if not isRedone or os.system(TO_PCAPS + stream_list + " " + filter_flag) != 0:
+		return
+
+	match_log = stream_list[:-4] + "_MATCH.txt"
+	outputs = [match_log, stream_list[:-4] + "_NONE.txt"]
+	try:
+		match_file = open(match_log, 'r')
+		for row in csv.reader(match_file, delimiter='\t'):
+			#the small pcap path is escaped for the shell, the IP log path is not
+			if len(row) > 2:
+				outputs += [row[2].replace('\\ ', ' '), row[2][:-5] + "_IP.txt"]
+	finally:
+		match_file.close()
+
+	manifest.record(stream_list + ":split", fingerprint, outputs)
 
 def makeIoGraph():
+	#the IO Graphs of every test type are drawn by one io_graph.py
+	iog_jobs = []
 	if args.get:
 		test_type = DOWNLINK
 		passed_pcap_paths, failed_pcap_paths = getPCAPPaths(test_type)
-		graphIO(test_type, passed_pcap_paths, failed_pcap_paths)
+		iog_jobs += getIOGJobs(test_type, passed_pcap_paths, failed_pcap_paths)
 
 	if args.post:
 		test_type = UPLINK
 		passed_pcap_paths, failed_pcap_paths = getPCAPPaths(test_type)
-		graphIO(test_type, passed_pcap_paths, failed_pcap_paths)
+		iog_jobs += getIOGJobs(test_type, passed_pcap_paths, failed_pcap_paths)
 
 	if args.data_test: #TODO
 		print("-d to be implemented for IO Graph\n")
@@ -246,6 +479,8 @@ def makeIoGraph():
 		print("-u to be implemented for IO Graph\n")
 		# test_type = UDP_ECHO_TEST
 
+	graphIO(iog_jobs)
+
 def getPCAPPaths(test_type):
 	passed_pcap_glob_path = args.root_csv[:-4] + "/*/*/passed/*/*/*/*" + test_type + "*.pcap"
 	passed_pcap_paths = glob.glob(passed_pcap_glob_path)
@@ -255,21 +490,29 @@ def getPCAPPaths(test_type):
 
 	return passed_pcap_paths, failed_pcap_paths
 
-def graphIO(test_type, passed_pcap_paths, failed_pcap_paths):
+def getIOGJobs(test_type, passed_pcap_paths, failed_pcap_paths):
+	iog_jobs = []
 	print("\nProcessing IOG for passed_pcap_paths:")
 	for path in passed_pcap_paths:
-		doIOG(test_type, path)
-	
+		iog_jobs += getIOGJob(test_type, path)
+
 	print("\nProcessing IOG for failed_pcap_paths:")
 	for path in failed_pcap_paths:
-		doIOG(test_type, path)
+		iog_jobs += getIOGJob(test_type, path)
 
-def doIOG(test_type, path):
+	return iog_jobs
+
+#[(pcap path, ip address, fingerprint)] if the IO Graph of the pcap file has to be redone, [] otherwise
+def getIOGJob(test_type, path):
 	print("test_type = ", test_type)
 	print("Generating IO Graph for path = ", path)
 	ip_path = path[:-5] + "_IP.txt"
 	print("Using IP address from = ", ip_path)
 
+	isRedone, fingerprint = isStepRedone(path + ":iog", [path, ip_path, "io_graph.py", "pcap_engine/IOStat.py", "pcap_engine/PcapReader.py", "pcap_engine/StreamTracker.py"], [test_type])
+	if not isRedone:
+		return []
+
 	ip_index = 0
 	if test_type == UPLINK:
 		ip_index = UE
@@ -285,13 +528,32 @@ def doIOG(test_type, path):
 		for ip in ip_csv_reader:
 			ip_address = ip[ip_index]
 
-		cmd = IO_GRAPH + path + ' ' + ip_address
-		print("IO Graph cmd = ", cmd)
-		os.system(IO_GRAPH + path + ' ' + ip_address)
-
 	finally:
 		ip_file.close()
 
+	return [(path, ip_address, fingerprint)]
+
+def getIOGPicName(path):
+	return path.replace('.pcap','') + "_IO1sbins.pdf"
+
+#io_graph.py draws every IO Graph in one process, only the graphs it saved are recorded
+def graphIO(iog_jobs):
+	if not iog_jobs:
+		return
+
+	#the old graphs are out of date, a graph that exists afterwards was saved by this run
+	for path, ip_address, fingerprint in iog_jobs:
+		if os.path.exists(getIOGPicName(path)):
+			os.remove(getIOGPicName(path))
+
+	cmd = IO_GRAPH + [arg for path, ip_address, fingerprint in iog_jobs for arg in (path, ip_address)]
+	print("IO Graph cmd = ", ' '.join(IO_GRAPH), " with ", len(iog_jobs), " pcap files")
+	subprocess.call(cmd)
+
+	for path, ip_address, fingerprint in iog_jobs:
+		if os.path.exists(getIOGPicName(path)):
+			manifest.record(path + ":iog", fingerprint, [getIOGPicName(path)])
+
 def makeTsg():
 	if args.get:
 		test_type = DOWNLINK
@@ -316,12 +578,56 @@ def makeTsg():
 		# test_type = UDP_ECHO_TEST
 
 def graphTS(passed_pcap_paths, failed_pcap_paths):
+	tsg_jobs = []
 	print("\nProcessing TSG for passed_pcap_paths:")
 	for path in passed_pcap_paths:
-		os.system(TS_GRAPH + path)
+		tsg_jobs += getTSGJob(path)
 	
 	print("\nProcessing TSG for failed_pcap_paths:")
 	for path in failed_pcap_paths:
-		os.system(TS_GRAPH + path)
+		tsg_jobs += getTSGJob(path)
+
+	#the manifest is only written by this process, the jobs just run tsg.py
+	for path, fingerprint, returncode, elapsed in processTSGJobs(tsg_jobs):
+		print("TSG for ", path, " Elapsed Time: ", elapsed, " s")
+		if returncode != 0:
+			continue
+
+		outputs = glob.glob(glob.escape(path[:-5]) + "_*_tsg.pdf")
+		if outputs:
+			manifest.record(path + ":tsg", fingerprint, outputs)
+
+#[(pcap path, fingerprint)] if the TSGs of the pcap file have to be redone, [] otherwise
+def getTSGJob(path):
+	isRedone, fingerprint = isStepRedone(path + ":tsg", [path, "tsg.py", "pcap_engine/TimeSequenceAnalyzer.py", "pcap_engine/PcapReader.py", "pcap_engine/StreamTracker.py", "tsg_engine/TimeSequenceRenderer.py"])
+	if not isRedone:
+		return []
+
+	return [(path, fingerprint)]
+
+#tsg.py works in its own scratch directory, so the TSGs of several pcap files are made at the same time
+def processTSGJobs(tsg_jobs):
+	if args.jobs <= 1 or len(tsg_jobs) <= 1:
+		for tsg_job in tsg_jobs:
+			yield doTSG(tsg_job)
+		return
+
+	print("Processing ", len(tsg_jobs), " TSGs with ", args.jobs, " jobs.\n")
+
+	#the scripts run main() when imported, so the workers have to be forked
+	pool = multiprocessing.get_context("fork").Pool(args.jobs)
+	try:
+		for result in pool.imap_unordered(doTSG, tsg_jobs, 1):
+			yield result
+	finally:
+		pool.close()
+		pool.join()
+
+#tsg.py saves one pdf per direction of every TCP connection, <pcap>_<a2b>_tsg.pdf
+def doTSG(tsg_job):
+	path, fingerprint = tsg_job
+	start = time.time()
+	returncode = subprocess.call(TS_GRAPH + [path])
+	return path, fingerprint, returncode, time.time() - start
 
 main()
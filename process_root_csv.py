@@ -1,4 +1,4 @@
-#usage: python3 process_root_csv.py <Root file.csv> -v
+#usage: python3 process_root_csv.py <Root file.csv> -v -j <number of jobs>
 #Author: Conard James B. Faraon
 
 """This processess different tests from the Root csv file into specific tests that are saved in a structured directory.
@@ -9,10 +9,15 @@ import os
 import sys
 import time
 import csv
+import multiprocessing
+from collections import OrderedDict
+from root_csv_engine import RootCSVCache
+from root_csv_engine import TestSegmentIndex
 
 #parse arguments here
 parser = argparse.ArgumentParser()
 parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
+parser.add_argument("-j", "--jobs", help="Number of processes writing the tests to disk.", type=int, default=1)
 parser.add_argument("csv_file", help="Root Metrics CSV File.")
 args = parser.parse_args()
 
@@ -28,6 +33,11 @@ COLUMNS_ATTR = ["Driver-Kit",
 
 TEST_TYPES = ["Uplink", "Downlink", "Lite Data Test", "Lite Data Secure Test"]
 
+CHUNKS_PER_JOB = 4
+
+#shared with the forked workers of the parallel mode
+root_csv_cache = None
+
 def main():
 	start = time.time()
 
@@ -36,20 +46,19 @@ def main():
 
 	makeMarketDirectory()
 
-	try:
-		csv_file = open(args.csv_file,'r')
-		csv_reader = csv.reader(csv_file)
-		columns_dict, header_buffer = setupColumnsForDict(csv_reader)
-
-		if args.verbose:
-			print("Display indices for attributes:")
-			for k,v in columns_dict.items():
-				print(k, ' ', v)
+	global root_csv_cache
+	root_csv_cache = RootCSVCache.RootCSVCache(args.csv_file, args.verbose).load()
+	columns_dict, header_buffer = setupColumnsForDict(root_csv_cache.getHeader())
 
-		processCSV(csv_reader, columns_dict, header_buffer)
+	if args.verbose:
+		print("Display indices for attributes:")
+		for k,v in columns_dict.items():
+			print(k, ' ', v)
 
-	finally:
-		csv_file.close()
+	if args.jobs > 1:
+		processCSVInParallel(columns_dict, header_buffer)
+	else:
+		processCSV(columns_dict, header_buffer)
 
 	end = time.time()
 	print("Completed process_root_csv_py Elasped Time: ", (end - start), "s\n")
@@ -61,63 +70,68 @@ def makeMarketDirectory():
 	else:
 		sys.exit("Invalid file format! File is not in csv.")
 
-def setupColumnsForDict(csv_reader):
-	first_row = next(csv_reader)
+def setupColumnsForDict(first_row):
 	columns_dict = {}
 	for attr in COLUMNS_ATTR:
 		columns_dict[attr] = first_row.index(attr)
 	return columns_dict, first_row
 
-def processCSV(csv_reader, columns_dict, header_buffer):
-	row_buffer = []
-	data_network_buffer = []
-	lte_eci_buffer = []
-	lte_enodebid_buffer = []
-	current_test_type = ''
-	isGatheringDataForATest = False
+def processCSV(columns_dict, header_buffer):
+	test_segment_index = TestSegmentIndex.TestSegmentIndex(root_csv_cache, TEST_TYPES, args.verbose).load()
+
+	for test_segment in test_segment_index.getCompletedSegments():
+		row_buffer = root_csv_cache.getRowsByIndex(test_segment.getRowIndices())
+		analyzeTest(row_buffer[-1], header_buffer, row_buffer, test_segment.getDataNetworks(), test_segment.getECIs(), test_segment.getENBs(), columns_dict)
 
-	for row in csv_reader:
-		for test in TEST_TYPES:
-			if '' in current_test_type and test in row[columns_dict["Test"]] and "Start" in row[columns_dict["Test"]]:
-				current_test_type = test
-				isGatheringDataForATest = True
-				getData(row, row_buffer, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict)
+def processCSVInParallel(columns_dict, header_buffer):
+	test_segment_index = TestSegmentIndex.TestSegmentIndex(root_csv_cache, TEST_TYPES, args.verbose).load()
 
-			elif test in current_test_type and test in row[columns_dict["Test"]] and "End" in row[columns_dict["Test"]]:
-				getData(row, row_buffer, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict)
+	#a serial run lets a later test overwrite an earlier one saved in the same location, so only the last one is kept
+	tests = OrderedDict()
+	for test_segment in test_segment_index.getCompletedSegments():
+		row = root_csv_cache.getRowsByIndex([test_segment.getEndRow()])[0]
+		test_location = locateTest(row, test_segment.getDataNetworks(), test_segment.getECIs(), test_segment.getENBs(), columns_dict)
+		tests.pop(test_location, None)
+		tests[test_location] = test_segment.getRowIndices()
 
-				if "Complete" in row[columns_dict["Message"]]:
-					analyzeTest(row, header_buffer, row_buffer, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict)
+	tests = list(tests.items())
+	num_chunks = args.jobs * CHUNKS_PER_JOB
+	chunk_size = max(1, -(-len(tests) // num_chunks))
+	chunks = []
+	for i in range(0, len(tests), chunk_size):
+		chunks.append((header_buffer, tests[i:i + chunk_size]))
 
-				del row_buffer[:]
-				del data_network_buffer[:]
-				del lte_eci_buffer[:]
-				del lte_enodebid_buffer[:]
-				isGatheringDataForATest = False
-				current_test_type = ''
+	print("Saving ", len(tests), " tests in ", len(chunks), " chunks with ", args.jobs, " jobs.")
 
-			elif test in current_test_type and isGatheringDataForATest:
-				getData(row, row_buffer, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict)
+	#the scripts run main() when imported, so the workers have to be forked
+	pool = multiprocessing.get_context("fork").Pool(args.jobs)
+	try:
+		saved_chunks = pool.map(writeChunkToDisk, chunks, 1)
+	finally:
+		pool.close()
+		pool.join()
 
-def getData(row, row_buffer, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict):
-	row_buffer.append(row)
-	if row[columns_dict["Data_Network_Type"]] not in data_network_buffer and row[columns_dict["Data_Network_Type"]] != '':
-		data_network_buffer.append(row[columns_dict["Data_Network_Type"]])
+	print("Saved ", sum(saved_chunks), " tests.")
 
-	if row[columns_dict["LTE_eCI"]] not in lte_eci_buffer and row[columns_dict["LTE_eCI"]] != '':
-		lte_eci_buffer.append(row[columns_dict["LTE_eCI"]])
+def writeChunkToDisk(chunk):
+	header_buffer, tests = chunk
+	for test_location, row_indices in tests:
+		row_buffer = root_csv_cache.getRowsByIndex(row_indices)
+		writeToDisk(header_buffer, row_buffer, *test_location)
 
-	if row[columns_dict["LTE_eNB_ID"]] not in lte_enodebid_buffer and row[columns_dict["LTE_eNB_ID"]] != '':
-		lte_enodebid_buffer.append(row[columns_dict["LTE_eNB_ID"]])
+	return len(tests)
 
 def analyzeTest(row, header_buffer, row_buffer, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict):
+	writeToDisk(header_buffer, row_buffer, *locateTest(row, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict))
+
+def locateTest(row, data_network_buffer, lte_eci_buffer, lte_enodebid_buffer, columns_dict):
 	isGoodTest = checkTestSummary(row, columns_dict)
 	hasHO = checkHO(lte_eci_buffer, lte_enodebid_buffer)
 	data_network = checkDataNetwork(data_network_buffer)
 	driver_id = row[columns_dict["Driver-Kit"]].replace('.','_').strip()
 	test_id  = row[columns_dict["Test_Cycle_ID"]].strip()
 	test_type = row[columns_dict["Test"]].replace("End", '').rstrip().replace(' ', '_')
-	writeToDisk(header_buffer, row_buffer, isGoodTest, hasHO, data_network, driver_id, test_id, test_type)
+	return isGoodTest, hasHO, data_network, driver_id, test_id, test_type
 
 def writeToDisk(header_buffer, row_buffer, isGoodTest, hasHO, data_network, driver_id, test_id, test_type):
 	filename = driver_id + "_" + test_id + "_" + test_type + ".csv"
@@ -136,7 +150,7 @@ def writeToDisk(header_buffer, row_buffer, isGoodTest, hasHO, data_network, driv
 	directory_name += test_id + "/" + driver_id + "_" + test_id + "_" + test_type
 
 	if not os.path.exists(directory_name):
-		os.makedirs(directory_name)
+		os.makedirs(directory_name, exist_ok=True)
 
 	file_location = directory_name + "/" + filename
 
@@ -8,7 +8,9 @@ import argparse
 import os
 import time
 import csv
-from datetime import datetime
+from pcap_engine import PcapSplitter
+from pcap_engine import UTCMatcher
+from time_engine import UnixTime
 
 #parse arguments here
 parser = argparse.ArgumentParser()
@@ -18,6 +20,7 @@ parser.add_argument("-p", "--post", help="POST filter.", action="store_true")
 parser.add_argument("-d", "--data_test", help="Lite Data Test filter.", action="store_true")
 parser.add_argument("-s", "--secure_test", help="Lite Data Secure Test filter.", action="store_true")
 parser.add_argument("-u", "--udp", help="UDP Echo Test.", action="store_true")
+parser.add_argument("-T", "--tshark", help="Runs tshark once per group of streams instead of splitting the pcap file through its flow index.", action="store_true")
 parser.add_argument("csv_stream", help="StreamList File.")
 args = parser.parse_args()
 
@@ -28,12 +31,6 @@ IP_SRC = 2
 IP_DST = 3
 STREAM = 6
 
-#UTC MATCHER indices
-UTC_TIME = 0
-TEST = 1
-TEST_CYCLE_ID = 2
-PATH = 3
-
 #summary files
 NONE = args.csv_stream[:-4] + "_NONE.txt"
 MATCHED = args.csv_stream[:-4] + "_MATCH.txt"
@@ -50,7 +47,8 @@ def main():
 		print("args.post = ", args.post)
 		print("args.data_test = ", args.data_test)
 		print("args.secure_test = ", args.secure_test)
-		print("args.udp = ", args.udp, "\n")
+		print("args.udp = ", args.udp)
+		print("args.tshark = ", args.tshark, "\n")
 
 	try:
 		csv_file = open(args.csv_stream, 'r')
@@ -65,8 +63,11 @@ def main():
 		if args.verbose:
 			print("Groups of streams = ", groups, "\n")
 
+		#the UTC reports are read once for every group of streams
+		utc_matcher = UTCMatcher.UTCMatcher(args.csv_stream.split('/')[0], args.verbose).load()
+
 		#start processing small pcaps
-		streamsToPcaps(groups, streams, times, ip_dict)
+		streamsToPcaps(groups, streams, times, ip_dict, utc_matcher)
 
 	finally:
 		csv_file.close()
@@ -146,7 +147,7 @@ def mapStreamToIp(streams, ip_src, ip_dst):
 
 	return temp_dict
 
-def streamsToPcaps(groups, stream_list, time_list, ip_dict):
+def streamsToPcaps(groups, stream_list, time_list, ip_dict, utc_matcher):
 	try:
 		log_no_time_match = open(NONE, 'w')
 		log_none_writer = csv.writer(log_no_time_match, delimiter ='\t')
@@ -160,87 +161,83 @@ def streamsToPcaps(groups, stream_list, time_list, ip_dict):
 		if args.verbose:
 			print("Pulling Streams from the pcap file ", filename, "\n")
 
+		transport = ''
+		if args.udp:
+			transport = "udp"
+		else:
+			transport = "tcp"
+
+		pcap_splitter = PcapSplitter.PcapSplitter(filename, args.verbose)
 		counter = 0
 		for group in groups:
-			tshark_cmd = "tshark -r " + filename + ' -Y "('
-			cmds = ''
-			pathname = ''
 			stream_set = []
-			isFirstRound = True
-			stream_counter = 0
 			for stream in group:
-				stream_counter += 1
 				if stream not in stream_set:
 					stream_set.append(stream)
-					if not isFirstRound:
-						cmds += " || "
-					else:
-						isFirstRound = False
-
-					transport_stream = ''
-					if args.udp:
-						transport_stream = "udp.stream == "
-					else:
-						transport_stream = "tcp.stream == "
-					cmds += transport_stream + stream
-
-				if stream is group[-1] and stream_counter == len(group): #done with the group
-					associatedStream = group[0]
-					pathname = findAssociatedPath(associatedStream, stream_list, time_list)
-
-					#goes to the log file
-					tmp = []
-					tmp.append(filename)
-					tmp.append(group)
-
-					if not pathname == '':
-						path_ext = pathname + "_"
-						tshark_cmd += cmds + ')" -w ' + path_ext
-						counter += 1
-						str_ext = ''
-						if args.get:
-							str_ext = "DL#" + str(counter)
-
-						elif args.post:
-							str_ext = "UL#" + str(counter)
-
-						elif args.data_test:
-							str_ext = "DT#" + str(counter)
-
-						elif args.secure_test:
-							str_ext = "ST#" + str(counter)
-
-						elif args.udp:
-							str_ext = "UDP#" + str(counter)
-
-						tshark_cmd += str_ext + ".pcap"
-						tmp.append(path_ext + str_ext + ".pcap")
-						log_matched_writer.writerow(tmp)
-
-						ip_log_path = path_ext + str_ext + "_IP.txt"
-						try:
-							ip_log = open(ip_log_path, 'w')
-							ip_log_writer = csv.writer(ip_log, delimiter=' ')
-							ip_log_writer.writerow(ip_dict[associatedStream])
-
-						finally:
-							ip_log.close()
-
-						print("IP Log path = ", ip_log_path)
-						print("tshark cmd in stream_list = ", tshark_cmd, '\n')
-						os.system(tshark_cmd)
-						
-					else:
-
-						print("No matching timestamp for stream # ", group[0].rstrip(), ". Check log file for more details.\n")
-						log_none_writer.writerow(tmp)
+
+			associatedStream = group[0]
+			pathname = findAssociatedPath(associatedStream, stream_list, time_list, utc_matcher)
+
+			#goes to the log file
+			tmp = []
+			tmp.append(filename)
+			tmp.append(group)
+
+			if not pathname == '':
+				path_ext = pathname + "_"
+				counter += 1
+				str_ext = ''
+				if args.get:
+					str_ext = "DL#" + str(counter)
+
+				elif args.post:
+					str_ext = "UL#" + str(counter)
+
+				elif args.data_test:
+					str_ext = "DT#" + str(counter)
+
+				elif args.secure_test:
+					str_ext = "ST#" + str(counter)
+
+				elif args.udp:
+					str_ext = "UDP#" + str(counter)
+
+				tmp.append(path_ext + str_ext + ".pcap")
+				log_matched_writer.writerow(tmp)
+
+				ip_log_path = path_ext + str_ext + "_IP.txt"
+				try:
+					ip_log = open(ip_log_path, 'w')
+					ip_log_writer = csv.writer(ip_log, delimiter=' ')
+					ip_log_writer.writerow(ip_dict[associatedStream])
+
+				finally:
+					ip_log.close()
+
+				print("IP Log path = ", ip_log_path)
+
+				if args.tshark:
+					tshark_cmd = "tshark -r " + filename + ' -Y "(' + " || ".join([transport + ".stream == " + stream for stream in stream_set]) + ')" -w ' + path_ext + str_ext + ".pcap"
+					print("tshark cmd in stream_list = ", tshark_cmd, '\n')
+					os.system(tshark_cmd)
+				else:
+					#the path is escaped for the shell
+					pcap_splitter.addOutput((path_ext + str_ext + ".pcap").replace('\\ ', ' '), transport, stream_set)
+
+			else:
+
+				print("No matching timestamp for stream # ", group[0].rstrip(), ". Check log file for more details.\n")
+				log_none_writer.writerow(tmp)
+
+		#every group is written on its own, reading only the records of its streams through the flow index of the large pcap file
+		if not args.tshark and counter != 0:
+			pcap_splitter.split()
 
 	finally:
 		log_no_time_match.close()
 		log_time_match.close()
 
-def findAssociatedPath(associatedStream, stream_list, time_list):
-	tmp = args.csv_stream.split('/')
+def findAssociatedPath(associatedStream, stream_list, time_list, utc_matcher):
 	print("associatedStream = ", associatedStream)
 
 	index = -1
@@ -251,46 +248,16 @@ def findAssociatedPath(associatedStream, stream_list, time_list):
 
 	stream_time = time_list[index]
 	print("stream_time = ", stream_time)
-	unix_time = dateToUnixTime(stream_time)
+	unix_time = UnixTime.dateToUnixSeconds(stream_time)
 	path = ""
 
-	try:
-		failed_report = open(tmp[0] + "_UTC_Matcher/" + tmp[0] + "_FAILED_Report.csv", 'r')
-		passed_report = open(tmp[0] + "_UTC_Matcher/" + tmp[0] + "_PASSED_Report.csv", 'r')
-
-		failed_report_reader = csv.reader(failed_report)
-		passed_report_reader = csv.reader(passed_report)
-
-		isNotFound = True 
-
-		#TODO
-		#refactor into a function
-		#compare kits
-
-		if isNotFound:			
-			for row in failed_report_reader:
-				tmp_time = dateToUnixTime(row[UTC_TIME])
-				same_flag = checkDriverKitID(row[3])
-				if (abs(unix_time - tmp_time) < 5) and checkDriverKitID(row[3]):
-					print("Time from the stream.csv = ", unix_time)
-					print("Time from the failed report = ", tmp_time)
-					path = row[PATH][:-4]
-					isNotFound = False
-					break
-
-		if isNotFound:
-			for row in passed_report_reader:
-				tmp_time = dateToUnixTime(row[UTC_TIME])
-				if (abs(unix_time - tmp_time) < 5) and checkDriverKitID(row[3]):
-					print("Time from the stream.csv = ", unix_time)
-					print("Time from the passed report = ", tmp_time)
-					path = row[PATH][:-4]
-					isNotFound = False
-					break
-
-	finally:
-		failed_report.close()
-		passed_report.close()
+	#the FAILED report is searched before the PASSED report, and only tests of the same driver kit match
+	match = utc_matcher.findTest(unix_time, args.csv_stream)
+	if match is not None:
+		test_result, row, tmp_time = match
+		print("Time from the stream.csv = ", unix_time)
+		print("Time from the " + test_result.lower() + " report = ", tmp_time)
+		path = row[UTCMatcher.PATH][:-4]
 
 	tmp = path.split('/')
 
@@ -300,22 +267,4 @@ def findAssociatedPath(associatedStream, stream_list, time_list):
 	path = str.join('/',tmp)
 	return path
 
-def dateToUnixTime(date_string):
-	date_object = datetime.strptime(date_string,'%Y-%m-%d %H:%M:%S.%f')
-	unix_timestamp = date_object.strftime("%s")
-
-	return float(unix_timestamp)
-
-#check that the driver kit ids are the same
-def checkDriverKitID(filename):
-	same_flag = False
-
-	if "A-1" in filename and "A_Kit01" in args.csv_stream:
-		same_flag = True
-
-	if "A-2" in filename and "A_Kit02" in args.csv_stream:
-		same_flag = True
-
-	return same_flag
-
 main()
\ No newline at end of file
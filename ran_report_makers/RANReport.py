@@ -3,11 +3,11 @@
 """This processes the report on distribution of ran type tests by radio technology.
 See official documentation for more details."""
 
-import threading
 import csv
 import glob
+from root_csv_engine import RootCSVEngine
 
-class RANReport(threading.Thread):
+class RANReport:
 
 	ALL = "ALL"
 	UL = "Uplink"
@@ -23,7 +23,6 @@ class RANReport(threading.Thread):
 
 	def __init__(self, test_type, root_csv, ran_report_directory):
 		print("Constructed RANReport.")
-		threading.Thread.__init__(self, name=test_type)
 		self.__test_type = test_type
 		self.__root_csv = root_csv
 		self.__ran_report_directory = ran_report_directory
@@ -47,51 +46,21 @@ class RANReport(threading.Thread):
 		print("Report's directory is = ", self.__ran_report_directory)
 		print(self.__globList, "\n")
 
-	def run(self):
-		print("Starting thread for RANReport of type = ", self.__test_type, ", using the file ", self.__root_csv)
-		self.__setupTestReport()
-		self.__generateTestReport()
-
-	def __setupTestReport(self):
-		try:
-			root_csv_file = open(self.__root_csv,'r')
-			root_csv_reader = csv.reader(root_csv_file)
-
-			#setup indices
-			self.__setupColumnIndicesForAllTestReport(root_csv_reader)
-
-			data_network_buffer = []
-			isGatheringDataForATest = False
-			current_test_type = ''
+	def getGlobList(self):
+		return self.__globList
 
-			for row in root_csv_reader:
-				for substring in self.__globList:
-					if '' in current_test_type and substring in row[self.__test] and "Start" in row[self.__test]:
-						current_test_type = substring
-						isGatheringDataForATest = True
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
+	def beginReport(self, header):
+		print("Starting RANReport of type = ", self.__test_type, ", using the file ", self.__root_csv)
+		self.__setupColumnIndicesForAllTestReport(header)
 
-					elif substring in current_test_type and substring in row[self.__test] and "End" in row[self.__test]:
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
+	def processTest(self, test_rows):
+		data_network_buffer = RootCSVEngine.getUniqueColumnValues(test_rows, self.__data_network_type)
+		self.__analyzeTest(test_rows[-1], data_network_buffer)
 
-						if "Complete" in row[self.__message]:
-							self.__analyzeTest(row, data_network_buffer)
-
-						del data_network_buffer[:]
-						isGatheringDataForATest = False
-						current_test_type = ''
-
-					elif substring in current_test_type and isGatheringDataForATest:
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-		finally:
-			root_csv_file.close()
+	def endReport(self):
+		self.__generateTestReport()
 
-	def __setupColumnIndicesForAllTestReport(self, root_csv_reader):
-		first_row = next(root_csv_reader)
+	def __setupColumnIndicesForAllTestReport(self, first_row):
 		self.__test = first_row.index("Test")
 		self.__task_summary = first_row.index("Task_Summary")
 		self.__message = first_row.index("Message")
@@ -3,12 +3,12 @@
 """This processes the report summary of RF Performance.
 See official documentation for more details."""
 
-import threading
 import csv
 import decimal
 import sys
+from root_csv_engine import RootCSVEngine
 
-class RFReport1(threading.Thread):
+class RFReport1:
 	UL = "Uplink"
 	DL = "Downlink"
 	DT = "Lite_Data_Test"
@@ -35,7 +35,6 @@ class RFReport1(threading.Thread):
 	SUPPLEMENTARY_ECI_MAP_PATH = "ecgi_maps/ws_eci.csv"
 
 	def __init__(self, test_type, csv_filename, dirname):
-		threading.Thread.__init__(self, name=test_type)
 		self.__test_type = test_type
 		self.__csv_filename = csv_filename
 		self.__dirname = dirname
@@ -74,51 +73,70 @@ class RFReport1(threading.Thread):
 		self.__goodRFCountIfNotFound = 0
 		self.__badRFCountIfNotFound = 0
 
-	def run(self):
-		print("Starting thread for RFReport1 of type = ", self.__test_type, ", using the file ", self.__csv_filename)
+	def getGlobList(self):
+		return self.__globList
+
+	def beginReport(self, header):
+		print("Starting RFReport1 of type = ", self.__test_type, ", using the file ", self.__csv_filename)
+		self.__setupColumnIndices(header)
+
+		#filenames
+		b25_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-25_" + self.__test_type + "_GOOD_RF#1.csv"
+		b26_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-26_" + self.__test_type + "_GOOD_RF#1.csv"
+		b41_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-41_" + self.__test_type + "_GOOD_RF#1.csv"
+		bMixed_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-Mixed_" + self.__test_type + "_GOOD_RF#1.csv"
+		noMapping_goodRF_filename = self.__dirname + "/records/" +self.__csv_filename[:-4] + "_ECI_NOT_FOUND_" + self.__test_type + "_GOOD_RF#1.csv"
+
+		b25_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-25_" + self.__test_type + "_BELOW_RF#1.csv"
+		b26_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-26_" + self.__test_type + "_BELOW_RF#1.csv"
+		b41_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-41_" + self.__test_type + "_BELOW_RF#1.csv"
+		bMixed_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-Mixed_" + self.__test_type + "_BELOW_RF#1.csv"
+		noMapping_badRF_filename = self.__dirname + "/records/" +self.__csv_filename[:-4] + "_ECI_NOT_FOUND_" + self.__test_type + "_BELOW_RF#1.csv"
+
+		#files
+		self.__b25_goodRF_file = open(b25_goodRF_filename,'w')
+		self.__b26_goodRF_file = open(b26_goodRF_filename,'w')
+		self.__b41_goodRF_file = open(b41_goodRF_filename,'w')
+		self.__bMixed_goodRF_file = open(bMixed_goodRF_filename,'w')
+		self.__noMapping_goodRF_file = open(noMapping_goodRF_filename,'w')
+
+		self.__b25_badRF_file = open(b25_badRF_filename,'w')
+		self.__b26_badRF_file = open(b26_badRF_filename,'w')
+		self.__b41_badRF_file = open(b41_badRF_filename,'w')
+		self.__bMixed_badRF_file = open(bMixed_badRF_filename,'w')
+		self.__noMapping_badRF_file = open(noMapping_badRF_filename,'w')
+
+		#writers
+		self.__b25_goodRF_writer = csv.writer(self.__b25_goodRF_file,delimiter=",")
+		self.__b26_goodRF_writer = csv.writer(self.__b26_goodRF_file,delimiter=",")
+		self.__b41_goodRF_writer = csv.writer(self.__b41_goodRF_file,delimiter=",")
+		self.__bMixed_goodRF_writer = csv.writer(self.__bMixed_goodRF_file,delimiter=",")
+		self.__noMapping_goodRF_writer = csv.writer(self.__noMapping_goodRF_file,delimiter=",")
+
+		self.__b25_badRF_writer = csv.writer(self.__b25_badRF_file,delimiter=",")
+		self.__b26_badRF_writer = csv.writer(self.__b26_badRF_file,delimiter=",")
+		self.__b41_badRF_writer = csv.writer(self.__b41_badRF_file,delimiter=",")
+		self.__bMixed_badRF_writer = csv.writer(self.__bMixed_badRF_file,delimiter=",")
+		self.__noMapping_badRF_writer = csv.writer(self.__noMapping_badRF_file,delimiter=",")
+
+		self.__header = header
+		self.__writeLogHeader(header)
+		self.__generateAllBandReportFilename()
+		self.__mapECI()
+
+	def processTest(self, test_rows):
+		row = test_rows[-1]
+		lte_rsrp_buffer = [test_row[self.__lte_rsrp] for test_row in test_rows]
+		lte_rssnr_buffer = [test_row[self.__lte_rssnr] for test_row in test_rows]
+		eci_buffer = [test_row[self.__lte_eci] for test_row in test_rows]
+		data_network_buffer = RootCSVEngine.getUniqueColumnValues(test_rows, self.__data_network_type)
+
+		self.__analyzeBand(row, lte_rsrp_buffer, lte_rssnr_buffer, data_network_buffer)
+		self.__analyzeSpecificBand(row, eci_buffer, data_network_buffer, lte_rsrp_buffer, lte_rssnr_buffer, test_rows)
+
+	def endReport(self):
 		try:
-			#filenames
-			b25_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-25_" + self.__test_type + "_GOOD_RF#1.csv"
-			b26_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-26_" + self.__test_type + "_GOOD_RF#1.csv"
-			b41_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-41_" + self.__test_type + "_GOOD_RF#1.csv"
-			bMixed_goodRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-Mixed_" + self.__test_type + "_GOOD_RF#1.csv"
-			noMapping_goodRF_filename = self.__dirname + "/records/" +self.__csv_filename[:-4] + "_ECI_NOT_FOUND_" + self.__test_type + "_GOOD_RF#1.csv"
-
-			b25_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-25_" + self.__test_type + "_BELOW_RF#1.csv"
-			b26_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-26_" + self.__test_type + "_BELOW_RF#1.csv"
-			b41_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-41_" + self.__test_type + "_BELOW_RF#1.csv"
-			bMixed_badRF_filename = self.__dirname + "/records/" + self.__csv_filename[:-4] + "_B-Mixed_" + self.__test_type + "_BELOW_RF#1.csv"
-			noMapping_badRF_filename = self.__dirname + "/records/" +self.__csv_filename[:-4] + "_ECI_NOT_FOUND_" + self.__test_type + "_BELOW_RF#1.csv"
-
-			#files
-			self.__b25_goodRF_file = open(b25_goodRF_filename,'w')
-			self.__b26_goodRF_file = open(b26_goodRF_filename,'w')
-			self.__b41_goodRF_file = open(b41_goodRF_filename,'w')
-			self.__bMixed_goodRF_file = open(bMixed_goodRF_filename,'w')
-			self.__noMapping_goodRF_file = open(noMapping_goodRF_filename,'w')
-
-			self.__b25_badRF_file = open(b25_badRF_filename,'w')
-			self.__b26_badRF_file = open(b26_badRF_filename,'w')
-			self.__b41_badRF_file = open(b41_badRF_filename,'w')
-			self.__bMixed_badRF_file = open(bMixed_badRF_filename,'w')
-			self.__noMapping_badRF_file = open(noMapping_badRF_filename,'w')
-
-			#writers
-			self.__b25_goodRF_writer = csv.writer(self.__b25_goodRF_file,delimiter=",")
-			self.__b26_goodRF_writer = csv.writer(self.__b26_goodRF_file,delimiter=",")
-			self.__b41_goodRF_writer = csv.writer(self.__b41_goodRF_file,delimiter=",")
-			self.__bMixed_goodRF_writer = csv.writer(self.__bMixed_goodRF_file,delimiter=",")
-			self.__noMapping_goodRF_writer = csv.writer(self.__noMapping_goodRF_file,delimiter=",")
-
-			self.__b25_badRF_writer = csv.writer(self.__b25_badRF_file,delimiter=",")
-			self.__b26_badRF_writer = csv.writer(self.__b26_badRF_file,delimiter=",")
-			self.__b41_badRF_writer = csv.writer(self.__b41_badRF_file,delimiter=",")
-			self.__bMixed_badRF_writer = csv.writer(self.__bMixed_badRF_file,delimiter=",")
-			self.__noMapping_badRF_writer = csv.writer(self.__noMapping_badRF_file,delimiter=",")
-
-			self.__generateAllBandReportFilename()
 			self.__generateAllBandReport()
-			self.__mapECI()
 			self.__generateSpecificBandReport()
 			self.__generateSpecificVariedReportIntoFiles("Varied")
 			print("self.__goodRFCountIfNotFound = ", self.__goodRFCountIfNotFound)
@@ -158,54 +176,11 @@ class RFReport1(threading.Thread):
 	def __generateAllBandReport(self):
 		print("Generating Band Report1 for = ", self.__csv_filename, " ===> with test type = ", self.__test_type)
 		try:
-			root_csv_file = open(self.__csv_filename,'r')
-			root_csv_reader = csv.reader(root_csv_file)
 			report_file_location = self.__dirname + "/" + self.__reportAllBandFilename
 			report_file = open(report_file_location,'w')
 			report_writer = csv.writer(report_file, delimiter=',')
 			RFReport1.__writeHeader(report_writer, None)
 
-			#setup indices
-			self.__setupColumnIndicesForAllBand(root_csv_reader)
-
-			lte_rsrp_buffer = []
-			lte_rssnr_buffer = []
-			data_network_buffer = []
-			isGatheringDataForATest = False
-			current_test_type = ''
-			for row in root_csv_reader:
-				for substring in self.__globList:
-					if '' in current_test_type and substring in row[self.__test] and "Start" in row[self.__test]:
-						current_test_type = substring
-						isGatheringDataForATest = True
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-						lte_rssnr_buffer.append(row[self.__lte_rssnr])
-
-					elif substring in current_test_type and substring in row[self.__test] and "End" in row[self.__test]:
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-						lte_rssnr_buffer.append(row[self.__lte_rssnr])
-
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						if "Complete" in row[self.__message]:
-							self.__analyzeBand(row, lte_rsrp_buffer, lte_rssnr_buffer, data_network_buffer)
-
-						del data_network_buffer[:]
-						del lte_rsrp_buffer[:]
-						del lte_rssnr_buffer[:]
-						isGatheringDataForATest = False
-						current_test_type = ''
-
-					elif substring in current_test_type and isGatheringDataForATest:
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-						lte_rssnr_buffer.append(row[self.__lte_rssnr])
-
 			if self.__numTestWithGoodRF != 0:
 				self.__rootEstTaskSuccessWithGoodRFMean = round(decimal.Decimal(self.__rootEstTaskSuccessWithGoodRF) / decimal.Decimal(self.__numTestWithGoodRF), 2)
 			if self.__numTestWithBadRF != 0:
@@ -226,11 +201,9 @@ class RFReport1(threading.Thread):
 			report_writer.writerow(tmp_buffer)
 
 		finally:
-			root_csv_file.close()
 			report_file.close()
 
-	def __setupColumnIndicesForAllBand(self, root_csv_reader):
-		first_row = next(root_csv_reader)
+	def __setupColumnIndices(self, first_row):
 		self.__test = first_row.index("Test")
 		self.__task_summary = first_row.index("Task_Summary")
 		self.__lte_rsrp = first_row.index("LTE_RSRP")
@@ -340,67 +313,6 @@ class RFReport1(threading.Thread):
 		self.__supp_band = first_row.index("Band")
 
 	def __generateSpecificBandReport(self):
-		try:
-			root_csv_file = open(self.__csv_filename,'r')
-			root_csv_reader = csv.reader(root_csv_file)
-			row_buffer_for_a_single_test = [] 
-			lte_rsrp_buffer = []
-			lte_rssnr_buffer = []
-			eci_buffer = []
-			data_network_buffer = []
-			isGatheringDataForATest = False
-			current_test_type = ''
-			isFirstRound = True
-
-			for row in root_csv_reader:
-				if isFirstRound:
-					self.__header = row
-					self.__writeLogHeader(row)
-					isFirstRound = False
-					continue
-
-				for substring in self.__globList:
-					if '' in current_test_type and substring in row[self.__test] and "Start" in row[self.__test]:
-						row_buffer_for_a_single_test.append(row)
-						current_test_type = substring
-						isGatheringDataForATest = True
-						eci_buffer.append(row[self.__lte_eci])
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-						lte_rssnr_buffer.append(row[self.__lte_rssnr])
-
-					elif substring in current_test_type and substring in row[self.__test] and "End" in row[self.__test]:
-						row_buffer_for_a_single_test.append(row)
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-						lte_rssnr_buffer.append(row[self.__lte_rssnr])
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						eci_buffer.append(row[self.__lte_eci])
-
-						if "Complete" in row[self.__message]:
-							self.__analyzeSpecificBand(row, eci_buffer, data_network_buffer, lte_rsrp_buffer, lte_rssnr_buffer, row_buffer_for_a_single_test)
-
-						isGatheringDataForATest = False
-						current_test_type = ''
-						del eci_buffer[:]
-						del data_network_buffer[:]
-						del lte_rsrp_buffer[:]
-						del lte_rssnr_buffer[:]
-						del row_buffer_for_a_single_test[:]
-
-					elif substring in current_test_type and isGatheringDataForATest:
-						row_buffer_for_a_single_test.append(row)
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-						eci_buffer.append(row[self.__lte_eci])
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-						lte_rssnr_buffer.append(row[self.__lte_rssnr])
-
-		finally:
-			root_csv_file.close()
-
 		if len(self.__enodebid_not_found_list) != 0:
 			try:
 				enodebid_not_in_map_file = open(self.__dirname + "/records/" +self.__csv_filename[:-4] + "_ECI_NOT_FOUND_" + self.__test_type + ".txt",'w')
@@ -3,12 +3,12 @@
 """This processes the report summary of RF Performance bands based on LTE_RSRP.
 See official documentation for more details."""
 
-import threading
 import csv
 import decimal
 import sys
+from root_csv_engine import RootCSVEngine
 
-class RFReport3(threading.Thread):
+class RFReport3:
 	UL = "Uplink"
 	DL = "Downlink"
 	DT = "Lite_Data_Test"
@@ -52,7 +52,6 @@ class RFReport3(threading.Thread):
 	SUPPLEMENTARY_ECI_MAP_PATH = "ecgi_maps/ws_eci.csv"
 
 	def __init__(self, test_type, csv_filename, dirname):
-		threading.Thread.__init__(self, name=test_type)
 		self.__test_type = test_type
 		self.__csv_filename = csv_filename
 		self.__dirname = dirname
@@ -77,13 +76,25 @@ class RFReport3(threading.Thread):
 		print("Report's directory is = ", self.__dirname)
 		print(self.__globList, "\n")
 
-	def run(self):
-		print("Startng a thread for RFReport3 of type  = ", self.__test_type, ", using the file ", self.__csv_filename)
+	def getGlobList(self):
+		return self.__globList
+
+	def beginReport(self, header):
+		print("Starting RFReport3 of type  = ", self.__test_type, ", using the file ", self.__csv_filename)
 		print("Generating Band Report3 for = ", self.__csv_filename, " ===> with test type = ", self.__test_type)
-		self.__setupAllBandReport()
+		self.__setupColumnIndices(header)
 		self.__mapECI()
-		self.__setupSpecificBandReport()
 
+	def processTest(self, test_rows):
+		row = test_rows[-1]
+		lte_rsrp_buffer = [test_row[self.__lte_rsrp] for test_row in test_rows]
+		eci_buffer = [test_row[self.__lte_eci] for test_row in test_rows]
+		data_network_buffer = RootCSVEngine.getUniqueColumnValues(test_rows, self.__data_network_type)
+
+		self.__analyzeTest("ALL", row, lte_rsrp_buffer, data_network_buffer)
+		self.__analyzeSpecificBand(row, eci_buffer, data_network_buffer, lte_rsrp_buffer)
+
+	def endReport(self):
 		for band in RFReport3.BANDWIDTH:
 				self.__generateReport(band)
 
@@ -176,52 +187,7 @@ class RFReport3(threading.Thread):
 		header.append("# Root Estimated Task Success %")
 		report_writer.writerow(header)
 
-	def __setupAllBandReport(self):
-		try:
-			root_csv_file = open(self.__csv_filename,'r')
-			root_csv_reader = csv.reader(root_csv_file)
-
-			#setup indices
-			self.__setupColumnIndicesForAllBand(root_csv_reader)
-			lte_rsrp_buffer = []
-			data_network_buffer = []
-			isGatheringDataForATest = False
-			current_test_type = ''
-
-			for row in root_csv_reader:
-				for substring in self.__globList:
-					if '' in current_test_type and substring in row[self.__test] and "Start" in row[self.__test]:
-						current_test_type = substring
-						isGatheringDataForATest = True
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-
-					elif substring in current_test_type and substring in row[self.__test] and "End" in row[self.__test]:
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						if "Complete" in row[self.__message]:
-							self.__analyzeTest("ALL", row, lte_rsrp_buffer, data_network_buffer)
-
-						del data_network_buffer[:]
-						del lte_rsrp_buffer[:]
-						isGatheringDataForATest = False
-						current_test_type = ''
-
-					elif substring in current_test_type and isGatheringDataForATest:
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-		finally:
-			root_csv_file.close()
-
-	def __setupColumnIndicesForAllBand(self, root_csv_reader):
-		first_row = next(root_csv_reader)
+	def __setupColumnIndices(self, first_row):
 		self.__test = first_row.index("Test")
 		self.__task_summary = first_row.index("Task_Summary")
 		self.__lte_rsrp = first_row.index("LTE_RSRP")
@@ -328,55 +294,6 @@ class RFReport3(threading.Thread):
 		self.__supp_eci = first_row.index("LTE_eCI")
 		self.__supp_band = first_row.index("Band")
 
-	def __setupSpecificBandReport(self):
-		try:
-			root_csv_file = open(self.__csv_filename, 'r')
-			root_csv_reader = csv.reader(root_csv_file)
-			lte_rsrp_buffer = []
-			eci_buffer = []
-			data_network_buffer = []
-			isGatheringDataForATest = False
-			current_test_type = ''
-			isFirstRound = True
-
-			for row in root_csv_reader:
-				if isFirstRound:
-					isFirstRound = False
-					continue
-
-				for substring in self.__globList:
-					if '' in current_test_type and substring in row[self.__test] and "Start" in row[self.__test]:
-						current_test_type = substring
-						isGatheringDataForATest = True
-						eci_buffer.append(row[self.__lte_eci])
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-
-					elif substring in current_test_type and substring in row[self.__test] and "End" in row[self.__test]:
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-						eci_buffer.append(row[self.__lte_eci])
-
-						if "Complete" in row[self.__message]:
-							self.__analyzeSpecificBand(row, eci_buffer, data_network_buffer, lte_rsrp_buffer)
-
-						isGatheringDataForATest = False
-						current_test_type = ''
-						del eci_buffer[:]
-						del data_network_buffer[:]
-						del lte_rsrp_buffer[:]
-
-					elif substring in current_test_type and isGatheringDataForATest:
-						if row[self.__data_network_type] not in data_network_buffer and row[self.__data_network_type] != '':
-							data_network_buffer.append(row[self.__data_network_type])
-						eci_buffer.append(row[self.__lte_eci])
-						lte_rsrp_buffer.append(row[self.__lte_rsrp])
-
-		finally:
-			root_csv_file.close()
-
 	def __analyzeSpecificBand(self, row, eci_buffer, data_network_buffer, lte_rsrp_buffer):
 		eci_buffer = [enode for enode in eci_buffer if enode != '']
 		isMixed, band, isSetOfNoId = self.__checkBand(eci_buffer)
@@ -0,0 +1,289 @@
+#Author: Conard James Faraon
+
+"""This compiles the Root Metrics csv file into a columnar cache and reads it back.
+Every column is dictionary-encoded into a memory-mapped .npy file of int32 codes and a .npy file of its distinct strings.
+See official documentation for more details."""
+
+import os
+import csv
+import glob
+import hashlib
+import numpy as np
+from array import array
+
+class RootCSVCache:
+
+	CACHE_VERSION = "1"
+	CACHE_EXT = "_Cache"
+	KEY_FILE = "key.csv"
+	COLUMNS_FILE = "columns.csv"
+	LENGTHS_FILE = "lengths.npy"
+	CHUNK_ROWS = 100000
+	HASH_BYTES = 1048576 #hash the first and last MiB of the csv file
+
+	def __init__(self, root_csv, verbose=False):
+		self.__root_csv = root_csv
+		self.__verbose = verbose
+		self.__cache_dir = root_csv[:-4] + RootCSVCache.CACHE_EXT
+		self.__header = None
+		self.__num_columns = 0
+		self.__codes = {}
+		self.__strings = {}
+		self.__values = {}
+		self.__lengths = None
+
+	def getCacheDirectory(self):
+		return self.__cache_dir
+
+	def isValid(self):
+		key_path = self.__cache_dir + "/" + RootCSVCache.KEY_FILE
+		if not os.path.exists(key_path):
+			return False
+
+		try:
+			key_file = open(key_path, 'r')
+			key_reader = csv.reader(key_file)
+			saved_key = next(key_reader, None)
+		finally:
+			key_file.close()
+
+		return saved_key == self.__makeKey()
+
+	def load(self):
+		"""Compiles the cache if it is missing or stale, then memory-maps it."""
+		if not self.isValid():
+			self.compile()
+
+		try:
+			columns_file = open(self.__cache_dir + "/" + RootCSVCache.COLUMNS_FILE, 'r')
+			columns_reader = csv.reader(columns_file)
+			self.__header = next(columns_reader)
+			self.__num_columns = int(next(columns_reader)[0])
+		finally:
+			columns_file.close()
+
+		self.__codes = {}
+		self.__strings = {}
+		self.__values = {}
+		self.__lengths = np.load(self.__cache_dir + "/" + RootCSVCache.LENGTHS_FILE, mmap_mode='r')
+
+		if self.__verbose:
+			print("Loaded columnar cache = ", self.__cache_dir, " with ", len(self.__lengths), " rows.")
+
+		return self
+
+	def compile(self):
+		print("Compiling ", self.__root_csv, " into the columnar cache ", self.__cache_dir)
+		if not os.path.exists(self.__cache_dir):
+			os.makedirs(self.__cache_dir)
+
+		#a stale key must never outlive a partial compile
+		key_path = self.__cache_dir + "/" + RootCSVCache.KEY_FILE
+		if os.path.exists(key_path):
+			os.remove(key_path)
+
+		#indices built on top of the old cache are stale too
+		for stale_file in glob.glob(self.__cache_dir + "/*.csv"):
+			os.remove(stale_file)
+
+		dictionaries = []
+		code_buffers = []
+		code_files = []
+		lengths = array('h')
+
+		try:
+			root_csv_file = open(self.__root_csv, 'r')
+			root_csv_reader = csv.reader(root_csv_file)
+			header = next(root_csv_reader, None)
+			if header is None:
+				raise ValueError("No header in the root csv file = " + self.__root_csv)
+
+			num_rows = 0
+			for row in root_csv_reader:
+				while len(dictionaries) < len(row):
+					self.__addColumn(dictionaries, code_buffers, code_files, num_rows)
+
+				for i in range(len(row)):
+					dictionary = dictionaries[i]
+					code = dictionary.get(row[i])
+					if code is None:
+						code = len(dictionary)
+						dictionary[row[i]] = code
+					code_buffers[i].append(code)
+
+				#short rows read back as empty strings and are cut back to their length
+				for i in range(len(row), len(dictionaries)):
+					code_buffers[i].append(self.__getEmptyCode(dictionaries[i]))
+
+				lengths.append(len(row))
+				num_rows += 1
+
+				if num_rows % RootCSVCache.CHUNK_ROWS == 0:
+					self.__flushCodes(code_buffers, code_files)
+					if self.__verbose:
+						print("Compiled ", num_rows, " rows.")
+
+			self.__flushCodes(code_buffers, code_files)
+
+		finally:
+			root_csv_file.close()
+			for code_file in code_files:
+				code_file.close()
+
+		while len(dictionaries) < len(header):
+			self.__addColumn(dictionaries, code_buffers, code_files, num_rows)
+			code_files[-1].close()
+			self.__padCodes(len(dictionaries) - 1, dictionaries[-1], num_rows)
+
+		for i in range(len(dictionaries)):
+			raw_path = self.__getColumnPath(i, "codes.raw")
+			codes = np.fromfile(raw_path, dtype=np.int32)
+			np.save(self.__getColumnPath(i, "codes.npy"), codes)
+			os.remove(raw_path)
+
+			strings = [''] * len(dictionaries[i])
+			for value, code in dictionaries[i].items():
+				strings[code] = value
+			np.save(self.__getColumnPath(i, "strings.npy"), np.array(strings, dtype=str))
+
+		np.save(self.__cache_dir + "/" + RootCSVCache.LENGTHS_FILE, np.frombuffer(lengths, dtype=np.int16))
+
+		try:
+			columns_file = open(self.__cache_dir + "/" + RootCSVCache.COLUMNS_FILE, 'w')
+			columns_writer = csv.writer(columns_file, delimiter=',')
+			columns_writer.writerow(header)
+			columns_writer.writerow([len(dictionaries)])
+		finally:
+			columns_file.close()
+
+		try:
+			key_file = open(key_path, 'w')
+			csv.writer(key_file, delimiter=',').writerow(self.__makeKey())
+		finally:
+			key_file.close()
+
+		print("Compiled ", num_rows, " rows and ", len(dictionaries), " columns into ", self.__cache_dir, "\n")
+
+	def getHeader(self):
+		return self.__header
+
+	def getNumRows(self):
+		return len(self.__lengths)
+
+	def getCodes(self, name):
+		"""int32 codes of a column, one per row."""
+		index = self.__header.index(name)
+		return self.__getCodes(index)
+
+	def getStrings(self, name):
+		"""Distinct strings of a column, indexed by code."""
+		index = self.__header.index(name)
+		return self.__getStrings(index)
+
+	def getColumn(self, name):
+		return self.getStrings(name)[self.getCodes(name)]
+
+	def getValues(self, name):
+		"""float64 values of a column, NaN where the cell is empty or not a number. A trailing % is ignored."""
+		if name not in self.__values:
+			strings = self.getStrings(name)
+			table = np.full(len(strings), np.nan)
+			for code in range(len(strings)):
+				try:
+					table[code] = float(strings[code].strip().strip('%'))
+				except ValueError:
+					pass
+			self.__values[name] = table
+
+		return self.__values[name][self.getCodes(name)]
+
+	def getRows(self, start=0, stop=None):
+		"""Rows as lists of strings, exactly as csv.reader returns them, without the header."""
+		if stop is None or stop > self.getNumRows():
+			stop = self.getNumRows()
+
+		isRectangular = None
+		for chunk_start in range(start, stop, RootCSVCache.CHUNK_ROWS):
+			chunk_stop = min(chunk_start + RootCSVCache.CHUNK_ROWS, stop)
+			columns = []
+			for i in range(self.__num_columns):
+				columns.append(self.__getStrings(i)[self.__getCodes(i)[chunk_start:chunk_stop]].tolist())
+
+			lengths = self.__lengths[chunk_start:chunk_stop]
+			if isRectangular is None:
+				isRectangular = bool((self.__lengths == self.__num_columns).all())
+
+			if isRectangular:
+				for row in zip(*columns):
+					yield list(row)
+			else:
+				for row, length in zip(zip(*columns), lengths.tolist()):
+					yield list(row[:length])
+
+	def getRowsByIndex(self, row_indices):
+		"""Rows at the given positions, in the given order."""
+		row_indices = np.asarray(row_indices, dtype=np.int64)
+		columns = []
+		for i in range(self.__num_columns):
+			columns.append(self.__getStrings(i)[self.__getCodes(i)[row_indices]].tolist())
+
+		rows = []
+		for row, length in zip(zip(*columns), self.__lengths[row_indices].tolist()):
+			rows.append(list(row[:length]))
+		return rows
+
+	def __getCodes(self, index):
+		if index not in self.__codes:
+			self.__codes[index] = np.load(self.__getColumnPath(index, "codes.npy"), mmap_mode='r')
+		return self.__codes[index]
+
+	def __getStrings(self, index):
+		if index not in self.__strings:
+			self.__strings[index] = np.load(self.__getColumnPath(index, "strings.npy"), mmap_mode='r')
+		return self.__strings[index]
+
+	def __getColumnPath(self, index, extension):
+		return self.__cache_dir + "/col_" + str(index).zfill(4) + "_" + extension
+
+	def __addColumn(self, dictionaries, code_buffers, code_files, num_rows):
+		dictionaries.append({})
+		code_buffers.append(array('i'))
+		code_files.append(open(self.__getColumnPath(len(dictionaries) - 1, "codes.raw"), 'wb'))
+
+		#rows before this column existed were short
+		if num_rows != 0:
+			empty_code = self.__getEmptyCode(dictionaries[-1])
+			code_files[-1].write(array('i', [empty_code]) * num_rows)
+
+	def __padCodes(self, index, dictionary, num_rows):
+		try:
+			code_file = open(self.__getColumnPath(index, "codes.raw"), 'wb')
+			code_file.write(array('i', [self.__getEmptyCode(dictionary)]) * num_rows)
+		finally:
+			code_file.close()
+
+	def __getEmptyCode(self, dictionary):
+		code = dictionary.get('')
+		if code is None:
+			code = len(dictionary)
+			dictionary[''] = code
+		return code
+
+	def __flushCodes(self, code_buffers, code_files):
+		for code_buffer, code_file in zip(code_buffers, code_files):
+			code_buffer.tofile(code_file)
+			del code_buffer[:]
+
+	def __makeKey(self):
+		stat = os.stat(self.__root_csv)
+		sha1 = hashlib.sha1()
+		try:
+			root_csv_file = open(self.__root_csv, 'rb')
+			sha1.update(root_csv_file.read(RootCSVCache.HASH_BYTES))
+			if stat.st_size > RootCSVCache.HASH_BYTES:
+				root_csv_file.seek(max(RootCSVCache.HASH_BYTES, stat.st_size - RootCSVCache.HASH_BYTES))
+				sha1.update(root_csv_file.read())
+		finally:
+			root_csv_file.close()
+
+		return [RootCSVCache.CACHE_VERSION, str(stat.st_size), str(stat.st_mtime_ns), sha1.hexdigest()]
@@ -0,0 +1,62 @@
+#Author: Conard James Faraon
+
+"""This finds every completed test of the Root Metrics csv file through the test segment index and fans it out to the report makers.
+See official documentation for more details."""
+
+from root_csv_engine import RootCSVCache
+from root_csv_engine import TestSegmentIndex
+
+class RootCSVEngine:
+	"""A report registered here must provide getGlobList(), beginReport(header), processTest(test_rows) and endReport().
+	The last row of test_rows is the End row of the completed test."""
+
+	def __init__(self, root_csv, verbose=False):
+		self.__root_csv = root_csv
+		self.__verbose = verbose
+		self.__reports = []
+
+	def addReport(self, report):
+		self.__reports.append(report)
+
+	def run(self):
+		print("Feeding the tests of ", self.__root_csv, " to ", len(self.__reports), " reports.\n")
+		root_csv_cache = RootCSVCache.RootCSVCache(self.__root_csv, self.__verbose).load()
+		header = root_csv_cache.getHeader()
+
+		for report in self.__reports:
+			report.beginReport(header)
+
+		#tests are handed out in the order their End rows appear in the csv file
+		completed_tests = []
+		for glob_list, reports in self.__groupReportsByGlobList():
+			test_segment_index = TestSegmentIndex.TestSegmentIndex(root_csv_cache, glob_list, self.__verbose).load()
+			for test_segment in test_segment_index.getCompletedSegments():
+				completed_tests.append((test_segment.getEndRow(), len(completed_tests), test_segment, reports))
+		completed_tests.sort(key=lambda completed_test: completed_test[:2])
+
+		for end_row, order, test_segment, reports in completed_tests:
+			test_rows = root_csv_cache.getRowsByIndex(test_segment.getRowIndices())
+			for report in reports:
+				report.processTest(test_rows)
+
+		for report in self.__reports:
+			report.endReport()
+
+	def __groupReportsByGlobList(self):
+		"""Reports sharing the same list of test names share one test segment index."""
+		groups = {}
+		for report in self.__reports:
+			key = tuple(report.getGlobList())
+			if key not in groups:
+				groups[key] = []
+			groups[key].append(report)
+
+		return [(list(key), reports) for key, reports in groups.items()]
+
+def getUniqueColumnValues(test_rows, index):
+	"""Non-empty values of a column in order of first appearance."""
+	values = []
+	for row in test_rows:
+		if row[index] not in values and row[index] != '':
+			values.append(row[index])
+	return values
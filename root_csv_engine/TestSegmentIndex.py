@@ -0,0 +1,224 @@
+#Author: Conard James Faraon
+
+"""This indexes every test segment of the Root Metrics csv file for one list of test names.
+A segment holds its test type, Test_Cycle_ID, driver kit, first and last row in the columnar cache, completion flag, data networks, eCIs and eNBs.
+The index is saved inside the columnar cache so that later runs seek directly to the tests.
+See official documentation for more details."""
+
+import os
+import csv
+import numpy as np
+
+class TestSegment:
+
+	def __init__(self, test_type, test_cycle_id, driver_kit, start_row, end_row, isCompleted, data_networks, ecis, enbs, repeated_rows):
+		self.__test_type = test_type
+		self.__test_cycle_id = test_cycle_id
+		self.__driver_kit = driver_kit
+		self.__start_row = start_row
+		self.__end_row = end_row
+		self.__isCompleted = isCompleted
+		self.__data_networks = data_networks
+		self.__ecis = ecis
+		self.__enbs = enbs
+		self.__repeated_rows = repeated_rows
+
+	def getTestType(self):
+		return self.__test_type
+
+	def getTestCycleID(self):
+		return self.__test_cycle_id
+
+	def getDriverKit(self):
+		return self.__driver_kit
+
+	def getStartRow(self):
+		return self.__start_row
+
+	def getEndRow(self):
+		return self.__end_row
+
+	def isCompleted(self):
+		return self.__isCompleted
+
+	def getDataNetworks(self):
+		return self.__data_networks
+
+	def getECIs(self):
+		return self.__ecis
+
+	def getENBs(self):
+		return self.__enbs
+
+	def getRepeatedRows(self):
+		return self.__repeated_rows
+
+	def getRowIndices(self):
+		"""Rows in the order the Start/End state machine buffers them.
+		A Start row of another listed test inside a running test is buffered twice, so it is listed twice."""
+		row_indices = []
+		repeated_rows = self.__repeated_rows
+		for row_index in range(self.__start_row, self.__end_row + 1):
+			row_indices.append(row_index)
+			if repeated_rows and row_index in repeated_rows:
+				row_indices.extend([row_index] * repeated_rows.count(row_index))
+		return row_indices
+
+class TestSegmentIndex:
+
+	INDEX_PREFIX = "segments_"
+	INDEX_HEADER = ["Test_Type", "Test_Cycle_ID", "Driver-Kit", "Start_Row", "End_Row", "Completed", "Data_Network_Type", "LTE_eCI", "LTE_eNB_ID", "Repeated_Rows"]
+	SEPARATOR = ';'
+
+	def __init__(self, root_csv_cache, glob_list, verbose=False):
+		self.__root_csv_cache = root_csv_cache
+		self.__globList = list(glob_list)
+		self.__verbose = verbose
+		self.__segments = []
+		self.__index_file_location = root_csv_cache.getCacheDirectory() + "/" + TestSegmentIndex.INDEX_PREFIX + '+'.join(self.__globList).replace(' ', '_') + ".csv"
+
+	def load(self):
+		"""Reads the saved index, or builds and saves it if the columnar cache has none yet."""
+		if os.path.exists(self.__index_file_location):
+			self.__readIndex()
+		else:
+			self.__buildIndex()
+			self.__writeIndex()
+
+		if self.__verbose:
+			print("Loaded ", len(self.__segments), " test segments for = ", self.__globList)
+
+		return self
+
+	def getSegments(self):
+		return self.__segments
+
+	def getCompletedSegments(self):
+		return [segment for segment in self.__segments if segment.isCompleted()]
+
+	def __buildIndex(self):
+		print("Indexing test segments for = ", self.__globList)
+		test_codes = self.__root_csv_cache.getCodes("Test")
+		test_strings = self.__root_csv_cache.getStrings("Test").tolist()
+		message_codes = self.__root_csv_cache.getCodes("Message")
+		message_strings = self.__root_csv_cache.getStrings("Message").tolist()
+
+		#only Start and End rows of the listed tests can change the state, everything in between is buffered as a block
+		isEventCode = np.zeros(len(test_strings), dtype=bool)
+		for code in range(len(test_strings)):
+			test = test_strings[code]
+			if ("Start" in test or "End" in test) and any(substring in test for substring in self.__globList):
+				isEventCode[code] = True
+		event_rows = np.nonzero(isEventCode[test_codes])[0].tolist()
+
+		current_test_type = ''
+		isGatheringDataForATest = False
+		start_row = None
+		repeated_rows = []
+		last_row = -1
+
+		for row_index in event_rows:
+			if isGatheringDataForATest and last_row + 1 < row_index:
+				multiplicity = self.__countTestTypeMatches(current_test_type)
+				for gap_row in range(last_row + 1, row_index):
+					repeated_rows.extend([gap_row] * (multiplicity - 1))
+
+			test = test_strings[test_codes[row_index]]
+			num_appended = 0
+			for substring in self.__globList:
+				if substring in test and "Start" in test:
+					current_test_type = substring
+					isGatheringDataForATest = True
+					if start_row is None:
+						start_row = row_index
+					num_appended += 1
+
+				elif substring in current_test_type and substring in test and "End" in test:
+					num_appended += 1
+					repeated_rows.extend([row_index] * (num_appended - 1))
+					isCompleted = "Complete" in message_strings[message_codes[row_index]]
+					self.__segments.append(self.__makeSegment(current_test_type, start_row, row_index, isCompleted, repeated_rows))
+
+					start_row = None
+					repeated_rows = []
+					num_appended = 0
+					isGatheringDataForATest = False
+					current_test_type = ''
+
+				elif substring in current_test_type and isGatheringDataForATest:
+					num_appended += 1
+
+			if num_appended > 1:
+				repeated_rows.extend([row_index] * (num_appended - 1))
+			last_row = row_index
+
+	def __countTestTypeMatches(self, current_test_type):
+		return len([substring for substring in self.__globList if substring in current_test_type])
+
+	def __makeSegment(self, test_type, start_row, end_row, isCompleted, repeated_rows):
+		test_cycle_id = self.__root_csv_cache.getStrings("Test_Cycle_ID")[self.__root_csv_cache.getCodes("Test_Cycle_ID")[end_row]]
+		driver_kit = self.__root_csv_cache.getStrings("Driver-Kit")[self.__root_csv_cache.getCodes("Driver-Kit")[end_row]]
+		data_networks = self.__getUniqueValues("Data_Network_Type", start_row, end_row)
+		ecis = self.__getUniqueValues("LTE_eCI", start_row, end_row)
+		enbs = self.__getUniqueValues("LTE_eNB_ID", start_row, end_row)
+		return TestSegment(test_type, str(test_cycle_id), str(driver_kit), start_row, end_row, isCompleted, data_networks, ecis, enbs, repeated_rows)
+
+	def __getUniqueValues(self, name, start_row, end_row):
+		"""Non-empty values of a column in order of first appearance."""
+		codes = np.asarray(self.__root_csv_cache.getCodes(name)[start_row:end_row + 1])
+		unique_codes, first_rows = np.unique(codes, return_index=True)
+		strings = self.__root_csv_cache.getStrings(name)
+		values = []
+		for code in unique_codes[np.argsort(first_rows)].tolist():
+			if strings[code] != '':
+				values.append(str(strings[code]))
+		return values
+
+	def __writeIndex(self):
+		#stages running at the same time must never read a partial index
+		tmp_index_file_location = self.__index_file_location + "." + str(os.getpid())
+		try:
+			index_file = open(tmp_index_file_location, 'w')
+			index_writer = csv.writer(index_file, delimiter=',')
+			index_writer.writerow(TestSegmentIndex.INDEX_HEADER)
+
+			for segment in self.__segments:
+				index_writer.writerow([segment.getTestType(),
+										segment.getTestCycleID(),
+										segment.getDriverKit(),
+										segment.getStartRow(),
+										segment.getEndRow(),
+										int(segment.isCompleted()),
+										TestSegmentIndex.SEPARATOR.join(segment.getDataNetworks()),
+										TestSegmentIndex.SEPARATOR.join(segment.getECIs()),
+										TestSegmentIndex.SEPARATOR.join(segment.getENBs()),
+										TestSegmentIndex.SEPARATOR.join([str(row_index) for row_index in segment.getRepeatedRows()])])
+		finally:
+			index_file.close()
+
+		os.replace(tmp_index_file_location, self.__index_file_location)
+
+	def __readIndex(self):
+		try:
+			index_file = open(self.__index_file_location, 'r')
+			index_reader = csv.reader(index_file)
+			next(index_reader)
+
+			for row in index_reader:
+				self.__segments.append(TestSegment(row[0],
+													row[1],
+													row[2],
+													int(row[3]),
+													int(row[4]),
+													row[5] == "1",
+													self.__splitValues(row[6]),
+													self.__splitValues(row[7]),
+													self.__splitValues(row[8]),
+													[int(row_index) for row_index in self.__splitValues(row[9])]))
+		finally:
+			index_file.close()
+
+	def __splitValues(self, value):
+		if value == '':
+			return []
+		return value.split(TestSegmentIndex.SEPARATOR)
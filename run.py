@@ -1,13 +1,15 @@
 #usage: python3 run.py <Root Main csv file> [-flags]
 #Author: Conard James B. Faraon
 
-"""Runs and measures time for Python 3 script "process_large_pcap_csv.py"
+"""Runs and measures time for the data processing scripts, starting with "process_large_pcap_csv.py".
+Stages run in parallel as soon as the stages they depend on are done, stages whose inputs did not change since the last run are skipped.
 See official documentation for more details."""
 
 import argparse
-import os
 import time
-import subprocess
+import glob
+from pipeline_engine import PipelineScheduler
+from pipeline_engine import BuildManifest
 
 #parse arguments here
 parser = argparse.ArgumentParser()
@@ -19,120 +21,102 @@ parser.add_argument("-s", "--secure_test", help="Lite Data Secure Test Filter.",
 parser.add_argument("-u", "--udp", help="UDP Echo Test.", action="store_true")
 parser.add_argument("-i", "--iog", help="IO Graph.", action="store_true")
 parser.add_argument("-t", "--tsg", help="Time Sequence Graph.", action="store_true")
+parser.add_argument("-c", "--combined", help="One tshark pass per pcap file for all the selected stream filters.", action="store_true")
+parser.add_argument("-j", "--jobs", help="Number of pcap files processed at the same time.", type=int, default=1)
 parser.add_argument("-m", "--misc", help="Miscellaneous data processing for dupack3, lte_data_test, and RAN.", action="store_true")
 parser.add_argument("-C", "--centOS", help="Data processing using CentOS", action="store_true")
+parser.add_argument("-F", "--force", help="Redoes every stage, even the ones whose inputs did not change.", action="store_true")
+parser.add_argument("--cpus", help="Number of CPUs the stages may use at the same time, all of them by default.", type=int)
+parser.add_argument("--memory", help="GB of memory the stages may use at the same time, 80%% of the physical memory by default.", type=float)
 parser.add_argument("root_csv", help="Root Metrics CSV File.")
 args = parser.parse_args()
 
-cmd = "python3 process_large_pcap_csv.py " + args.root_csv
+#memory estimates in GB of the stages
+ROOT_CSV_MEMORY = 2.0
+PCAP_JOB_MEMORY = 1.0
+SCRIPT_MEMORY = 1.0
 
-if args.verbose:
-	cmd += " -v"
+python = "python3"
+if args.centOS:
+	python = "python3.6"
+
+market = args.root_csv[:-4]
+jobs = max(1, args.jobs)
 
+filter_flags = []
 if args.get:
-	cmd += " -g"
+	filter_flags.append("-g")
 
 if args.post:
-	cmd += " -p"
+	filter_flags.append("-p")
 
 if args.data_test:
-	cmd += " -d"
+	filter_flags.append("-d")
 
 if args.secure_test:
-	cmd += " -s"
+	filter_flags.append("-s")
 
 if args.udp:
-	cmd += " -u"
+	filter_flags.append("-u")
+
+verbose_flags = []
+if args.verbose:
+	verbose_flags.append("-v")
+
+force_flags = []
+if args.force:
+	force_flags.append("-F")
+
+#stages of process_large_pcap_csv.py record every pcap file, stream list and graph into the same manifest
+build_manifest = BuildManifest.BuildManifest(market + "_Manifest.csv", args.verbose, args.force).load()
+build_manifest.compact()
+
+ROOT_CSV_ENGINE = sorted(glob.glob("root_csv_engine/*.py"))
+REPORT_MAKERS = sorted(glob.glob("rf_report_makers/*.py") + glob.glob("ho_report_makers/*.py") + glob.glob("ran_report_makers/*.py") + glob.glob("ecgi_maps/*.csv"))
+UTC_REPORTS = [market + "_UTC_Matcher/" + market + "_PASSED_Report.csv", market + "_UTC_Matcher/" + market + "_FAILED_Report.csv"]
+REPORT_FOLDERS = [market + extension for extension in ["_RFReport#1", "_RFReport#2", "_RFReport#3", "_HOReport", "_RANReport"]]
+
+def getTestFolders():
+	"""The market and test folders made by the tests stage, listed once it has completed.
+	The driver kit folders <market>/<test>/A-* change the mtime of their test folder, new test folders the mtime of the market folder."""
+	return [market] + sorted(glob.glob(market + "/*/"))
+
+#root csv -> columnar cache -> tests -> UTC matcher -> stream lists & small pcaps -> IOG, TSG, latency, dupack & lite data
+#the RF, HO and RAN reporters read the columnar cache of the root csv, the HO reports also the driver kit folders of the tests
+scheduler = PipelineScheduler.PipelineScheduler(args.cpus, args.memory, args.verbose, build_manifest)
+scheduler.addStage(PipelineScheduler.Stage("cache", [python, "compile_root_csv.py"] + verbose_flags + [args.root_csv], [], 1, ROOT_CSV_MEMORY,
+											[args.root_csv, "compile_root_csv.py", "root_csv_engine/RootCSVCache.py"], [market + "_Cache"]))
+scheduler.addStage(PipelineScheduler.Stage("tests", [python, "process_root_csv.py", "-v", "-j", str(jobs), args.root_csv], ["cache"], jobs, ROOT_CSV_MEMORY,
+											[args.root_csv, "process_root_csv.py"] + ROOT_CSV_ENGINE, [market]))
+scheduler.addStage(PipelineScheduler.Stage("matcher", [python, "find_test_results.py", "-v", market], ["tests"], 1, 1.0,
+											["find_test_results.py"], UTC_REPORTS))
+
+#every pcap file, stream list and small pcap file is checked against the manifest inside process_large_pcap_csv.py
+pcap_cmd = [python, "process_large_pcap_csv.py", args.root_csv, "-S"] + verbose_flags + force_flags + filter_flags
+if filter_flags:
+	combined_flags = ["-c"] if args.combined else []
+	scheduler.addStage(PipelineScheduler.Stage("pcaps", pcap_cmd + combined_flags + ["-j", str(jobs)], ["matcher"], jobs, jobs * PCAP_JOB_MEMORY))
 
 if args.iog:
-	cmd += " -i"
+	scheduler.addStage(PipelineScheduler.Stage("iog", pcap_cmd + ["-P", "-i", "-j", str(jobs)], ["matcher", "pcaps"], jobs, jobs * SCRIPT_MEMORY))
 
 if args.tsg:
-	cmd += " -t"
-
-print("Processing large pcap files and Root Metrics main csv file.")
-print(cmd)
-start = time.time()
-
-os.system(cmd)
+	scheduler.addStage(PipelineScheduler.Stage("tsg", pcap_cmd + ["-P", "-t", "-j", str(jobs)], ["matcher", "pcaps"], jobs, jobs * SCRIPT_MEMORY))
 
 if args.misc:
+	scheduler.addStage(PipelineScheduler.Stage("latency", [python, "latency_graph.py", "-v", "-d", "UL", "DL", "-j", str(jobs), market], ["matcher", "pcaps"], jobs, jobs * SCRIPT_MEMORY))
+	scheduler.addStage(PipelineScheduler.Stage("dupack", [python, "dupack.py", "-v", "-j", str(jobs), market], ["matcher", "pcaps"], jobs, jobs * SCRIPT_MEMORY))
+	scheduler.addStage(PipelineScheduler.Stage("lite_data", [python, "lte_data_test_process.py", "-f", "-p", "-v", market], ["matcher", "pcaps"], 1, SCRIPT_MEMORY))
+	scheduler.addStage(PipelineScheduler.Stage("reporters", [python, "RootReporter.py", "-v", args.root_csv], ["tests"], 1, ROOT_CSV_MEMORY,
+												lambda: [args.root_csv, "RootReporter.py"] + ROOT_CSV_ENGINE + REPORT_MAKERS + getTestFolders(), REPORT_FOLDERS))
 
-	if args.centOS:
-		print("\n\n==================================================================================================")
-		print("CentOS Data processing!")
-		print("==================================================================================================\n\n")
-
-		procs = []
-
-		latency_proc = subprocess.Popen(["python3.6", "ul_latency_graph.py", "-v", args.root_csv[:-4]])
-		procs.append(latency_proc)
-
-		latency_proc = subprocess.Popen(["python3.6", "dl_latency_graph.py", "-v", args.root_csv[:-4]])
-		procs.append(latency_proc)
-
-		dupack_proc = subprocess.Popen(["python3.6", "dupack.py", "-v", args.root_csv[:-4]])
-		procs.append(dupack_proc)
-
-		rf1_proc = subprocess.Popen(["python3.6", "RFReporter1.py", "-v", args.root_csv])
-		procs.append(rf1_proc)
-
-		rf2_proc = subprocess.Popen(["python3.6", "RFReporter2.py", "-v", args.root_csv])
-		procs.append(rf2_proc)
-
-		rf3_proc = subprocess.Popen(["python3.6", "RFReporter3.py", "-v", args.root_csv])
-		procs.append(rf3_proc)
-
-		ho_proc = subprocess.Popen(["python3.6", "HOReporter.py", "-v", args.root_csv])
-		procs.append(ho_proc)
-
-		ran_proc = subprocess.Popen(["python3.6", "RANReporter.py", "-v", args.root_csv])
-		procs.append(ran_proc)
-
-		lite_proc = subprocess.Popen(["python3.6", "lte_data_test_process.py", "-f", "-p", "-v", args.root_csv[:-4]])
-		procs.append(lite_proc)
-
-		count = 1
-		for p in procs:
-			if p.wait() != 0:
-				print("\n\n==================================================================================================")
-				print("Error waiting for process ", count)
-				print("==================================================================================================\n\n")
-			count += 1
-
-	else:
-
-		print("\n==================================================================================================")
-		print("Ubuntu/MacOS Data processing!")
-		print("==================================================================================================\n")
-
-		latency_cmd = "python3 ul_latency_graph.py -v " + args.root_csv[:-4]
-		os.system(latency_cmd)
-
-		latency_cmd = "python3 dl_latency_graph.py -v " + args.root_csv[:-4]
-		os.system(latency_cmd)
-
-		dupack_cmd = "python3 dupack.py -v " + args.root_csv[:-4]
-		os.system(dupack_cmd)
-
-		rf1_cmd = "python3 RFReporter1.py -v " + args.root_csv
-		os.system(rf1_cmd)
-
-		rf2_cmd = "python3 RFReporter2.py -v " + args.root_csv
-		os.system(rf2_cmd)
-
-		rf3_cmd = "python3 RFReporter3.py -v " + args.root_csv
-		os.system(rf3_cmd)
-
-		ho_cmd = "python3 HOReporter.py -v " + args.root_csv
-		os.system(ho_cmd)
-
-		ran_cmd = "python3 RANReporter.py -v " + args.root_csv
-		os.system(ran_cmd)
+print("Processing large pcap files and Root Metrics main csv file.")
+start = time.time()
 
-		lite_cmd = "python3 lte_data_test_process.py -f -p -v " + args.root_csv[:-4]
-		os.system(lite_cmd)
+status = scheduler.run()
 
 end = time.time()
 print("Completed processing large pcap files and Root Metrics main csv file.")
+for name, result in status.items():
+	print(name, " = ", result)
 print("Elapsed Time: ", (end - start), " s\n")
@@ -7,10 +7,10 @@ if [ -d "pcaps" ]; then
 	if [ -f $1 ]; then
 		if [ "$2" = "-C" ]; then
 			echo "Running script in CentOS!"
-			python3.6 run.py $1 -v -g -p -d -s -u -i -t -m -C
+			python3.6 run.py $1 -v -g -p -d -s -u -i -t -c -m -C
 		else
 			echo "Running script in Ubuntu!"
-			python3 run.py $1 -v -g -p -d -s -u -i -t -m
+			python3 run.py $1 -v -g -p -d -s -u -i -t -c -m
 		fi
 	else
 		echo "ERROR: $1 not found!"
@@ -0,0 +1,150 @@
+#Author: Conard James Faraon
+
+"""This converts the timestamps of tshark -t ud and of the UTC_Time column of the Root Metrics csv file, "YYYY-MM-DD HH:MM:SS.ffffff", into unix time.
+The fields are read at their fixed offsets instead of going through strptime, and whole columns are converted at once with NumPy.
+Both timestamps are in UTC, so is the unix time.
+See official documentation for more details."""
+
+import calendar
+from datetime import datetime
+import numpy as np
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+#fixed offsets of the fields
+YEAR = slice(0, 4)
+MONTH = slice(5, 7)
+DAY = slice(8, 10)
+HOUR = slice(11, 13)
+MINUTE = slice(14, 16)
+SECOND = slice(17, 19)
+FRACTION = 20
+DATE_SEPARATORS = {4: '-', 7: '-', 10: ' ', 13: ':', 16: ':'}
+FRACTION_SEPARATOR = '.'
+
+#days of every month of a year that is not a leap year, January is 1
+DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+#a drive test spans a few days, so the unix time of every date is computed once
+day_seconds = {}
+
+def dateToUnixTime(date_string):
+	"""Unix time with the fraction of the second."""
+	seconds, fraction = parseDate(date_string)
+	return seconds + fraction
+
+def dateToUnixSeconds(date_string):
+	"""Unix time truncated to the second."""
+	return float(parseDate(date_string)[0])
+
+def parseDate(date_string):
+	"""Returns (whole seconds, fraction of the second), raises ValueError like strptime for anything else than DATE_FORMAT."""
+	if not isFixedOffsetDate(date_string) or not "01" <= date_string[MONTH] <= "12" or not "01" <= date_string[DAY] <= "31"\
+		or date_string[HOUR] > "23" or date_string[MINUTE] > "59" or date_string[SECOND] > "61":
+		date_object = datetime.strptime(date_string, DATE_FORMAT)
+		return calendar.timegm(date_object.timetuple()), date_object.microsecond / 1000000
+
+	date = date_string[:DAY.stop]
+	seconds = day_seconds.get(date)
+	if seconds is None:
+		year, month, day = int(date_string[YEAR]), int(date_string[MONTH]), int(date_string[DAY])
+		#days past the end of the month, like 2018-02-31, are left to strptime to reject
+		if day > calendar.monthrange(year, month)[1]:
+			datetime.strptime(date_string, DATE_FORMAT)
+		seconds = calendar.timegm((year, month, day, 0, 0, 0))
+		day_seconds[date] = seconds
+
+	seconds += int(date_string[HOUR]) * 3600 + int(date_string[MINUTE]) * 60 + int(date_string[SECOND])
+	digits = date_string[FRACTION:]
+	return seconds, int(digits) / 10 ** len(digits)
+
+def isFixedOffsetDate(date_string):
+	return len(date_string) > FRACTION and date_string[4] == '-' and date_string[7] == '-' and date_string[10] == ' '\
+		and date_string[13] == ':' and date_string[16] == ':' and date_string[19] == FRACTION_SEPARATOR\
+		and date_string[YEAR].isdigit() and date_string[MONTH].isdigit() and date_string[DAY].isdigit() and date_string[HOUR].isdigit()\
+		and date_string[MINUTE].isdigit() and date_string[SECOND].isdigit() and date_string[FRACTION:].isdigit()
+
+def datesToUnixTime(date_strings):
+	"""Unix time with the fraction of the second of every timestamp, as a float64 array."""
+	seconds, fractions = parseDates(date_strings)
+	return seconds + fractions
+
+def datesToUnixSeconds(date_strings):
+	"""Unix time truncated to the second of every timestamp, as a float64 array."""
+	return parseDates(date_strings)[0].astype(np.float64)
+
+def parseDates(date_strings):
+	"""Returns (whole seconds as int64, fractions of the second as float64) arrays, the same values parseDate() gives."""
+	if len(date_strings) == 0:
+		return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+	try:
+		dates = np.asarray(date_strings, dtype='S')
+	except UnicodeEncodeError:
+		dates = None
+
+	if dates is None or dates.ndim != 1 or dates.dtype.itemsize <= FRACTION:
+		return parseDatesOneByOne(date_strings)
+
+	#every character becomes a digit, shorter timestamps are padded with NUL
+	width = dates.dtype.itemsize
+	digits = dates.view(np.uint8).reshape(len(dates), width).astype(np.int64) - ord('0')
+	isDigit = (digits >= 0) & (digits <= 9)
+
+	isFixedOffset = isDigit[:, FRACTION]
+	for offset, separator in list(DATE_SEPARATORS.items()) + [(SECOND.stop, FRACTION_SEPARATOR)]:
+		isFixedOffset &= digits[:, offset] == ord(separator) - ord('0')
+	for field in [YEAR, MONTH, DAY, HOUR, MINUTE, SECOND]:
+		isFixedOffset &= isDigit[:, field].all(axis=1)
+
+	#the fraction is the run of digits after the '.', followed only by padding
+	fraction_digits = isDigit[:, FRACTION:]
+	num_fraction_digits = fraction_digits.sum(axis=1)
+	isFixedOffset &= np.cumprod(fraction_digits, axis=1).sum(axis=1) == num_fraction_digits
+	isFixedOffset &= (dates.view(np.uint8).reshape(len(dates), width)[:, FRACTION:] == 0).sum(axis=1) == width - FRACTION - num_fraction_digits
+	if not isFixedOffset.all():
+		return parseDatesOneByOne(date_strings)
+
+	year, month, day = toNumber(digits[:, YEAR]), toNumber(digits[:, MONTH]), toNumber(digits[:, DAY])
+	hour, minute, second = toNumber(digits[:, HOUR]), toNumber(digits[:, MINUTE]), toNumber(digits[:, SECOND])
+
+	#out of range fields are left to strptime to reject
+	if not ((month >= 1) & (month <= 12) & (day >= 1) & (day <= 31) & (hour <= 23) & (minute <= 59) & (second <= 61)).all():
+		return parseDatesOneByOne(date_strings)
+	isLeapYear = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+	if not (day <= DAYS_IN_MONTH[month] + ((month == 2) & isLeapYear)).all():
+		return parseDatesOneByOne(date_strings)
+
+	seconds = daysFromCivil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+
+	#the fraction is counted in units of the longest fraction, so the division rounds exactly like parseDate()
+	fraction_width = width - FRACTION
+	fractions = toNumber(np.where(fraction_digits, digits[:, FRACTION:], 0)) / float(10 ** fraction_width)
+
+	return seconds, fractions
+
+def parseDatesOneByOne(date_strings):
+	seconds = np.zeros(len(date_strings), dtype=np.int64)
+	fractions = np.zeros(len(date_strings), dtype=np.float64)
+	for i in range(len(date_strings)):
+		seconds[i], fractions[i] = parseDate(date_strings[i])
+
+	return seconds, fractions
+
+def toNumber(digits):
+	"""Decimal value of the rows of a digit matrix."""
+	number = np.zeros(len(digits), dtype=np.int64)
+	for column in range(digits.shape[1]):
+		number = number * 10 + digits[:, column]
+
+	return number
+
+def daysFromCivil(year, month, day):
+	"""Days since 1970-01-01 of proleptic Gregorian dates, for arrays."""
+	year = year - (month <= 2)
+	era = np.floor_divide(year, 400)
+	year_of_era = year - era * 400
+	day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+	day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+
+	return era * 146097 + day_of_era - 719468
@@ -1,53 +1,37 @@
-#usage: python3 tsg.py <pcap file> -v
+#usage: python3 tsg.py <pcap file> -v -X -D -f <pdf or png>
 #Author: Conard James B. Faraon
 
 """Generate a time sequence graph for a small pcap file specific to a test.
-A pdf image is save with the associated test folder.
+Every direction of every TCP connection is read from the pcap file directly, or plotted from the xpl files of tcptrace as before.
+Every colour of a graph is drawn as one collection of lines and markers, decimated to the pixels of the graph with -D.
+A pdf or png image is save with the associated test folder.
 See official documentation for more details."""
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import argparse
 import os
+import shutil
+import subprocess
+import tempfile
 import time
 import datetime
-import matplotlib
-from matplotlib import pyplot, markers
-from matplotlib.lines import Line2D
-from matplotlib.transforms import Affine2D
+from pcap_engine import TimeSequenceAnalyzer
+from tsg_engine import TimeSequenceRenderer
 
 #parse arguments here
 parser = argparse.ArgumentParser()
 parser.add_argument("-v", "--verbose", help="Shows various messages from debugging and processing.", action="store_true")
+parser.add_argument("-X", "--tcptrace", help="Plots the xpl files of tcptrace instead of reading the pcap file directly.", action="store_true")
+parser.add_argument("-D", "--decimate", help="Leaves out the lines and markers that fall on a pixel of the graph already drawn.", action="store_true")
+parser.add_argument("-f", "--format", help="Image format of the graphs, pdf by default.", choices=TimeSequenceRenderer.FORMATS, default="pdf")
 parser.add_argument("pcap_file", help="PCAP File.")
 args = parser.parse_args()
 
 #constants
-COLOURS = {"white":"#1b9e77",
-		   "black": "#666666",
-		   "orange": "#a6761d",
-		   "green": "#66a61e",
-		   "yellow": "#e6ab02",
-		   "red": "#d95f02",
-		   "blue": "#386cb0",
-		   "purple": "#7570b3",
-		   "pink": "#ff1493"}
-
-MARKERS = {'darrow': markers.CARETDOWN,
-		   'uarrow': markers.CARETUP,
-		   'box': 's',
-		   'dot': '.',
-		   'utick': '^',
-		   'dtick': 'v',
-		   'htick': '_',
-		   'diamond': 'D'}
-
+#the xpl files of tcptrace -G that are plotted, the tline, owin, rtt, ssize and tput files are removed with the scratch directory
 #change if necessary
-FILETYPES = {'rm *tline.xpl',
-			 'rm *owin.xpl',
-			 'rm *rtt.xpl',
-			 'rm *ssize.xpl',
-			 'rm *tput.xpl'}
+XPL_SUFFIXES = ['_tsg.xpl']
 
 def main():
 	start = time.time()
@@ -55,158 +39,182 @@ def main():
 	if args.verbose:
 		print("Generating TSG for = ", args.pcap_file)
 
-	generateXpl()
-	xpl_list = getFiles()
+	if args.tcptrace:
+		#every tsg.py has its own scratch directory, so several of them can run at the same time
+		work_dir = tempfile.mkdtemp(prefix="tsg_")
+		try:
+			generateXpl(work_dir)
+			xpl_list = getFiles(work_dir)
 
-	if args.verbose:
-		print(xpl_list)
+			if args.verbose:
+				print(xpl_list)
 
-	for file in xpl_list:
-		plot(file)
+			for file in xpl_list:
+				plot(file)
 
-	cleanUp()
+		finally:
+			cleanUp(work_dir)
+
+	else:
+		time_sequence_analyzer = TimeSequenceAnalyzer.TimeSequenceAnalyzer(args.pcap_file, args.verbose).analyze()
+		for name, title, time_sequence in time_sequence_analyzer.getTimeSequences():
+			plotTimeSequence(name, title, time_sequence)
 
 	end = time.time()
 	print("tsg.py Elapsed Time: ", (end - start), " s\n")
 
-def generateXpl():
+def generateXpl(work_dir):
 	#-n   don't resolve host or service names (much faster)
 	#-C   produce color plot[s]
 	#-G   create ALL graphs
-	tcptrace_cmd = "tcptrace -n -C -G " + args.pcap_file
+	#tcptrace writes the xpl files to its working directory
+	tcptrace_cmd = ["tcptrace", "-n", "-C", "-G", os.path.abspath(args.pcap_file)]
 
 	if args.verbose:
-		print(tcptrace_cmd)
-
-	os.system(tcptrace_cmd)
+		print(' '.join(tcptrace_cmd), " in ", work_dir)
 
-	#remove specific xpl files not needed
-	#edit FILETYPES declarations and assignments aboive if necesary
-	for rm_cmd in FILETYPES:
-		os.system(rm_cmd)
+	subprocess.call(tcptrace_cmd, cwd=work_dir)
 
-def getFiles():
+def getFiles(work_dir):
 	tmp = []
 
-	for file in os.listdir(os.curdir):
-		if file.endswith(".xpl"):
-			tmp.append(file)
+	for file in sorted(os.listdir(work_dir)):
+		if any(file.endswith(suffix) for suffix in XPL_SUFFIXES):
+			tmp.append(os.path.join(work_dir, file))
 
 	return tmp
 
-def cleanUp():
-	os.system("rm *xpl")
+def cleanUp(work_dir):
+	shutil.rmtree(work_dir, ignore_errors=True)
+
+#the colours tcptrace -C gives every part of a time sequence graph
+SEGMENT_COLOUR = "white"
+RETRANSMIT_COLOUR = "red"
+ACK_COLOUR = "green"
+WINDOW_COLOUR = "yellow"
+SACK_COLOUR = "purple"
+SYN_COLOUR = "orange"
+FIN_COLOUR = "orange"
+RST_COLOUR = "red"
+
+def getRenderer():
+	return TimeSequenceRenderer.TimeSequenceRenderer(args.format, args.decimate, args.verbose)
+
+def plotTimeSequence(name, title, time_sequence):
+	if args.verbose:
+		print("Plotting = ", name)
+
+	renderer = getRenderer()
+
+	#the ACK and window lines step up at every ACK
+	ack_times = time_sequence[TimeSequenceAnalyzer.ACK_TIMES]
+	renderer.addSteps(ACK_COLOUR, ack_times, time_sequence[TimeSequenceAnalyzer.ACKS])
+	renderer.addSteps(WINDOW_COLOUR, ack_times, time_sequence[TimeSequenceAnalyzer.WINDOWS])
+
+	#every segment is a vertical line from its first to its last byte, arrows at both ends
+	retransmits = time_sequence[TimeSequenceAnalyzer.SEGMENT_RETRANSMITS]
+	for colour, selected in [(SEGMENT_COLOUR, ~retransmits), (RETRANSMIT_COLOUR, retransmits)]:
+		times = time_sequence[TimeSequenceAnalyzer.SEGMENT_TIMES][selected]
+		if len(times) == 0:
+			continue
+		starts = time_sequence[TimeSequenceAnalyzer.SEGMENT_STARTS][selected]
+		ends = time_sequence[TimeSequenceAnalyzer.SEGMENT_ENDS][selected]
+		renderer.addVerticalLines(colour, times, starts, ends)
+		renderer.addMarkers(colour, TimeSequenceRenderer.MARKERS['uarrow'], times, ends)
+		renderer.addMarkers(colour, TimeSequenceRenderer.MARKERS['darrow'], times, starts)
+
+	sack_times = time_sequence[TimeSequenceAnalyzer.SACK_TIMES]
+	if len(sack_times) > 0:
+		renderer.addVerticalLines(SACK_COLOUR, sack_times, time_sequence[TimeSequenceAnalyzer.SACK_STARTS], time_sequence[TimeSequenceAnalyzer.SACK_ENDS])
+
+	for text, colour, times, seqs in [("SYN", SYN_COLOUR, TimeSequenceAnalyzer.SYN_TIMES, TimeSequenceAnalyzer.SYN_SEQS),
+		("FIN", FIN_COLOUR, TimeSequenceAnalyzer.FIN_TIMES, TimeSequenceAnalyzer.FIN_SEQS), ("RST", RST_COLOUR, TimeSequenceAnalyzer.RST_TIMES, TimeSequenceAnalyzer.RST_SEQS)]:
+		for x, y in zip(time_sequence[times].tolist(), time_sequence[seqs].tolist()):
+			renderer.addText(text, x, y, colour)
+
+	saveFile = args.pcap_file[:-5] + '_' + name + "_tsg." + args.format
+	renderer.render(saveFile, args.pcap_file.split("/")[-1] + '\n' + title, "Time (s)", "Sequence number (B)")
 
 def plot(filename):
 	if args.verbose:
 		print("Plotting = ", filename)
 
-	xpl_file = open(filename, "r")
-
-	fig, ax = pyplot.subplots()
-	ax.get_xaxis().get_major_formatter().set_scientific(False)
-	ax.get_yaxis().get_major_formatter().set_scientific(False)
+	renderer = getRenderer()
+	title = args.pcap_file.split("/")[-1]
+	x_label = ""
+	y_label = ""
 	col = "black"
 
+	#the lines and markers of every colour are drawn together at the end
+	lines = {}
 	markers = {}
-	def addMarker(col, m, parts):
-		if len(parts) == 4 and parts[3] in COLOURS:
-			col = parts[3]
 
-		key = col,m
-		x,y = map(float, parts[1:3])
-
-		if key in markers:
-			markers[key][0].append(x)
-			markers[key][1].append(y)
-		else:
-			markers[key] = ([x],[y])
-
-	lines = {}
-	def addLine(col, parts):
-		x1,y1,x2,y2 = map(float, parts[1:])
-
-		if not col in lines:
-			lines[col] = [([x1,x2],[y1,y2])]
-		else:
-			found = False
-			for l in lines[col][-5:]:
-				if l[0][-1] == x1 and l[1][-1] == y1:
-					l[0].append(x2)
-					l[1].append(y2)
-					found = True
-					break
-			if not found:
-				lines[col].append(([x1,x2],[y1,y2]))
-
-	#actual plotting starts here
-	for line in xpl_file:
-		line = line.strip()
-		parts = line.split()
-
-		if line.startswith("timeval"):
-			pass
-
-		elif line == "title":
-			fig.suptitle(args.pcap_file.split("/")[-1] + '\n' + next(xpl_file).strip(), fontsize=9)
-
-		elif line == "xlabel":
-			ax.set_xlabel(next(xpl_file).strip().replace('t', 'T') + " (s)", fontsize=8)
-
-		elif line == "ylabel":
-			ax.set_ylabel(next(xpl_file).strip().replace('s', 'S') + " (B)", fontsize=8)
-
-		elif line in COLOURS:
-			col = line
-
-		elif parts[0] == "line":
-			x1,y1,x2,y2 = map(float, parts[1:])
-			addLine(col, parts)
-
-		elif parts[0] in ("atext","rtext","ltext"):
-			text = next(xpl_file).strip()
-			x,y = map(float, parts[1:3])
-			kwargs = {'ha': 'center', 'va':'center', 'color': COLOURS[col],'textcoords':'offset points'}
-			theta = 0
-			offset = (0,5)
-
-			if len(parts) == 4 and parts[3] in COLOURS:
-				kwargs['color'] = COLOURS[parts[3]]
-			if parts[0] == "rtext":
-				kwargs['ha'] = 'left'
-				offset = (2,0)
-			elif parts[0] == "ltext":
-				kwargs['ha'] = 'right'
-				offset = (-2,0)
-			t = ax.annotate(text,(x,y),offset,**kwargs,fontsize=5)
-
-		# Markers are specified as 'marker x y'
-		elif parts[0] in MARKERS.keys():
-			addMarker(col,MARKERS[parts[0]],parts)
-
-		# draw
-		elif line == "go":
-			break
-		else:
-			print("Unknown: %s" % line)
-
-	# Draw the lines
-	for c,ll in lines.items():
-		for x,y in ll:
-			#for val in x
-			ax.plot(x,y,lw=1,c=COLOURS[c])
-	# Draw the markers
-	for (c,m),(x,y) in markers.items():
-		ax.plot(x,y,ls="",marker=m,markeredgecolor=COLOURS[c],markerfacecolor='none',markersize=2)
-
-	for tick in ax.xaxis.get_major_ticks():
-				tick.label.set_fontsize(6)
-	for tick in ax.yaxis.get_major_ticks():
-				tick.label.set_fontsize(6)
-
-	ax.get_xaxis().get_major_formatter().set_useOffset(False)
-	ax.get_yaxis().get_major_formatter().set_useOffset(False)
-	saveFile = args.pcap_file[:-5] + '_' + filename[:-4] + ".pdf"
-	fig.savefig(saveFile, format="pdf", bbox_inches="tight")
+	try:
+		xpl_file = open(filename, "r")
+
+		for line in xpl_file:
+			line = line.strip()
+			parts = line.split()
+
+			if line.startswith("timeval"):
+				pass
+
+			elif line == "title":
+				title += '\n' + next(xpl_file).strip()
+
+			elif line == "xlabel":
+				x_label = next(xpl_file).strip().replace('t', 'T') + " (s)"
+
+			elif line == "ylabel":
+				y_label = next(xpl_file).strip().replace('s', 'S') + " (B)"
+
+			elif line in TimeSequenceRenderer.COLOURS:
+				col = line
+
+			elif parts[0] == "line":
+				lines.setdefault(col, []).append([float(part) for part in parts[1:5]])
+
+			elif parts[0] in ("atext","rtext","ltext"):
+				text = next(xpl_file).strip()
+				x,y = map(float, parts[1:3])
+				colour = col
+				alignment = 'center'
+				offset = (0,5)
+
+				if len(parts) == 4 and parts[3] in TimeSequenceRenderer.COLOURS:
+					colour = parts[3]
+				if parts[0] == "rtext":
+					alignment = 'left'
+					offset = (2,0)
+				elif parts[0] == "ltext":
+					alignment = 'right'
+					offset = (-2,0)
+				renderer.addText(text, x, y, colour, alignment, offset)
+
+			# Markers are specified as 'marker x y'
+			elif parts[0] in TimeSequenceRenderer.MARKERS.keys():
+				colour = col
+				if len(parts) == 4 and parts[3] in TimeSequenceRenderer.COLOURS:
+					colour = parts[3]
+				markers.setdefault((colour, TimeSequenceRenderer.MARKERS[parts[0]]), []).append([float(part) for part in parts[1:3]])
+
+			# draw
+			elif line == "go":
+				break
+			else:
+				print("Unknown: %s" % line)
+
+	finally:
+		xpl_file.close()
+
+	for colour, rows in lines.items():
+		x1, y1, x2, y2 = zip(*rows)
+		renderer.addLines(colour, x1, y1, x2, y2)
+	for (colour, marker), rows in markers.items():
+		x, y = zip(*rows)
+		renderer.addMarkers(colour, marker, x, y)
+
+	saveFile = args.pcap_file[:-5] + '_' + os.path.basename(filename)[:-4] + "." + args.format
+	renderer.render(saveFile, title, x_label, y_label)
 
 main()
@@ -0,0 +1,200 @@
+#Author: Conard James Faraon
+
+"""This draws a time sequence graph with one artist per colour instead of one per line, the lines of a colour are a LineCollection,
+the markers of a colour and shape are a PathCollection and the ACK and window lines are one polyline each.
+With decimation, the lines, markers and steps that fall on the same pixel of the axes as one already drawn are left out,
+so a long upload draws about as many lines as the graph has pixels. The graph is saved as a pdf or png image.
+See official documentation for more details."""
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib import markers
+
+COLOURS = {"white":"#1b9e77",
+		   "black": "#666666",
+		   "orange": "#a6761d",
+		   "green": "#66a61e",
+		   "yellow": "#e6ab02",
+		   "red": "#d95f02",
+		   "blue": "#386cb0",
+		   "purple": "#7570b3",
+		   "pink": "#ff1493"}
+
+MARKERS = {'darrow': markers.CARETDOWN,
+		   'uarrow': markers.CARETUP,
+		   'box': 's',
+		   'dot': '.',
+		   'utick': '^',
+		   'dtick': 'v',
+		   'htick': '_',
+		   'diamond': 'D'}
+
+FORMATS = ["pdf", "png"]
+PNG_DPI = 150
+MARKER_SIZE = 2 #points, the markersize of the Line2D markers drawn before
+#decimation keeps one line or marker per cell of a grid this many times finer than the pixels of the axes at PNG_DPI
+DECIMATION_OVERSAMPLING = 2
+
+class TimeSequenceRenderer:
+
+	def __init__(self, output_format="pdf", decimate=False, verbose=False):
+		if output_format not in FORMATS:
+			raise ValueError("The time sequence graphs are saved as " + " or ".join(FORMATS) + ", not " + output_format)
+
+		self.__output_format = output_format
+		self.__decimate = decimate
+		self.__verbose = verbose
+		self.__lines = {} #colour -> [arrays of (x1, y1, x2, y2) rows]
+		self.__markers = {} #(colour, marker) -> [arrays of (x, y) rows]
+		self.__steps = [] #(colour, x array, y array)
+		self.__texts = [] #(text, x, y, colour, horizontal alignment, offset)
+
+	def getOutputFormat(self):
+		return self.__output_format
+
+	def addLines(self, colour, x1, y1, x2, y2):
+		self.__lines.setdefault(colour, []).append(np.column_stack([x1, y1, x2, y2]).astype(np.float64))
+
+	def addVerticalLines(self, colour, x, y1, y2):
+		self.addLines(colour, x, y1, x, y2)
+
+	def addMarkers(self, colour, marker, x, y):
+		self.__markers.setdefault((colour, marker), []).append(np.column_stack([x, y]).astype(np.float64))
+
+	def addSteps(self, colour, x, y):
+		"""A line that steps up or down at every x and stays level until the next one."""
+		if len(x) > 0:
+			self.__steps.append((colour, np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)))
+
+	def addText(self, text, x, y, colour, horizontal_alignment='center', offset=(0, 5)):
+		self.__texts.append((text, x, y, colour, horizontal_alignment, offset))
+
+	def render(self, save_path, title, x_label, y_label):
+		figure = Figure()
+		FigureCanvasAgg(figure)
+		ax = figure.add_subplot(111)
+		ax.get_xaxis().get_major_formatter().set_scientific(False)
+		ax.get_yaxis().get_major_formatter().set_scientific(False)
+		figure.suptitle(title, fontsize=9)
+		ax.set_xlabel(x_label, fontsize=8)
+		ax.set_ylabel(y_label, fontsize=8)
+
+		lines = {colour: np.concatenate(parts) for colour, parts in self.__lines.items()}
+		marker_points = {key: np.concatenate(parts) for key, parts in self.__markers.items()}
+		steps = [(colour, getStepPoints(x, y)) for colour, x, y in self.__steps]
+
+		limits = self.__getLimits(lines, marker_points, steps)
+		if self.__decimate and limits is not None:
+			grid = self.__getGrid(figure, ax, limits)
+			lines = {colour: decimateRows(rows, grid) for colour, rows in lines.items()}
+			marker_points = {key: decimateRows(rows, grid) for key, rows in marker_points.items()}
+			steps = [(colour, decimatePolyline(points, grid)) for colour, points in steps]
+
+		num_artists = 0
+		num_elements = 0
+		for colour, points in steps:
+			ax.plot(points[:, 0], points[:, 1], lw=1, c=COLOURS[colour])
+			num_artists += 1
+			num_elements += len(points)
+
+		for colour, rows in lines.items():
+			ax.add_collection(LineCollection(rows.reshape(-1, 2, 2), linewidths=1, colors=COLOURS[colour]))
+			num_artists += 1
+			num_elements += len(rows)
+
+		for (colour, marker), rows in marker_points.items():
+			#scatter draws the unfilled markers, like the arrows, with their face colour
+			if markers.MarkerStyle(marker).is_filled():
+				ax.scatter(rows[:, 0], rows[:, 1], s=MARKER_SIZE ** 2, marker=marker, facecolors='none', edgecolors=COLOURS[colour], linewidths=1)
+			else:
+				ax.scatter(rows[:, 0], rows[:, 1], s=MARKER_SIZE ** 2, marker=marker, c=COLOURS[colour], linewidths=1)
+			num_artists += 1
+			num_elements += len(rows)
+
+		for text, x, y, colour, horizontal_alignment, offset in self.__texts:
+			ax.annotate(text, (x, y), offset, ha=horizontal_alignment, va='center', color=COLOURS[colour], textcoords='offset points', fontsize=5)
+
+		if limits is not None:
+			setLimits(ax, limits)
+		ax.tick_params(labelsize=6)
+		ax.get_xaxis().get_major_formatter().set_useOffset(False)
+		ax.get_yaxis().get_major_formatter().set_useOffset(False)
+
+		if self.__output_format == "png":
+			figure.savefig(save_path, format="png", dpi=PNG_DPI, bbox_inches="tight")
+		else:
+			figure.savefig(save_path, format="pdf", bbox_inches="tight")
+
+		if self.__verbose:
+			print("Saved ", save_path, " with ", num_artists, " artists of ", num_elements, " lines and markers and ", len(self.__texts), " texts")
+
+		return num_artists, num_elements
+
+	def __getLimits(self, lines, marker_points, steps):
+		"""(x min, x max, y min, y max) of everything drawn, None if nothing is."""
+		xs = [rows[:, [0, 2]].ravel() for rows in lines.values()] + [rows[:, 0] for rows in marker_points.values()] + [points[:, 0] for colour, points in steps]
+		ys = [rows[:, [1, 3]].ravel() for rows in lines.values()] + [rows[:, 1] for rows in marker_points.values()] + [points[:, 1] for colour, points in steps]
+		xs = [x for x in xs if len(x) > 0]
+		ys = [y for y in ys if len(y) > 0]
+		if not xs:
+			return None
+
+		xs = np.concatenate(xs)
+		ys = np.concatenate(ys)
+		return (xs.min(), xs.max(), ys.min(), ys.max())
+
+	def __getGrid(self, figure, ax, limits):
+		"""(x min, x max, y min, y max, columns, rows) of the decimation grid over the axes."""
+		figure.set_dpi(PNG_DPI)
+		extent = ax.get_window_extent()
+		columns = max(1, int(extent.width * DECIMATION_OVERSAMPLING))
+		rows = max(1, int(extent.height * DECIMATION_OVERSAMPLING))
+		return limits + (columns, rows)
+
+def getStepPoints(x, y):
+	"""The corners of a line stepping at every x, like plot(drawstyle='steps-post')."""
+	points = np.empty((2 * len(x) - 1, 2), dtype=np.float64)
+	points[0::2, 0] = x
+	points[0::2, 1] = y
+	points[1::2, 0] = x[1:]
+	points[1::2, 1] = y[:-1]
+	return points
+
+def toCells(values, minimum, maximum, cells):
+	if maximum <= minimum:
+		return np.zeros(len(values), dtype=np.int64)
+	return np.floor((values - minimum) / (maximum - minimum) * cells).astype(np.int64)
+
+def decimateRows(rows, grid):
+	"""The first of the rows of (x, y) or (x1, y1, x2, y2) on the same cells of the grid, in their order."""
+	if len(rows) == 0:
+		return rows
+
+	x_min, x_max, y_min, y_max, columns, grid_rows = grid
+	cells = np.column_stack([toCells(rows[:, i], x_min, x_max, columns) if i % 2 == 0 else toCells(rows[:, i], y_min, y_max, grid_rows) for i in range(rows.shape[1])])
+	unique_cells, first_indices = np.unique(cells, axis=0, return_index=True)
+	return rows[np.sort(first_indices)]
+
+def decimatePolyline(points, grid):
+	"""The points of a polyline that leave the cell of the point before them, the last point is always kept."""
+	if len(points) <= 2:
+		return points
+
+	x_min, x_max, y_min, y_max, columns, rows = grid
+	cells = np.column_stack([toCells(points[:, 0], x_min, x_max, columns), toCells(points[:, 1], y_min, y_max, rows)])
+	keep = np.ones(len(points), dtype=bool)
+	keep[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+	keep[-1] = True
+	return points[keep]
+
+def setLimits(ax, limits):
+	"""The data limits with the margins matplotlib adds around them."""
+	x_min, x_max, y_min, y_max = limits
+	x_margin = (x_max - x_min) * ax.margins()[0]
+	y_margin = (y_max - y_min) * ax.margins()[1]
+	if x_margin > 0:
+		ax.set_xlim(x_min - x_margin, x_max + x_margin)
+	if y_margin > 0:
+		ax.set_ylim(y_min - y_margin, y_max + y_margin)